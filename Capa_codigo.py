@@ -1,27 +1,52 @@
 import math
-import random
-import time
-import tracemalloc
+import os
+import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
-# Variables globales para almacenar la matriz, tamaño y rutas
-matriz_global = None
-n_global = None
-rutas_asignadas_global = None
+from matriz_distancias import (MatrizDistancias, abrir_matriz, crear_matriz_archivo, guardar_matriz, importar_aristas,
+                               leer_coordenadas)
+from caminos_minimos import completar_matriz
+from grafo_disperso import importar_red
+from asignacion_rutas import (TAMANO_PAGINA_CATALOGO, CatalogoRutas, RutaAsignada, demandas_uniformes,
+                              optimizar_asignacion, reparto_paquetes, ruta_catalogo, texto_ruta_catalogo)
+from motor_cvrp import resolver_cvrp
+from motor_rutas import TIEMPO_LIMITE_CONSULTA, resolver_ruta
+from ajuste_complejidad import ajustar_mediciones, comparar_con_linea_base
+from historial_rendimiento import RUTA_HISTORIAL, registrar_ejecucion
+from medicion_rendimiento import medir
+from sesion_rutas import SesionRutas
+
+# Por encima de este tamaño solo se imprime la esquina superior de la matriz
+LIMITE_MOSTRAR_MATRIZ = 30
+
+# Hasta este tamaño se precalculan los caminos mínimos entre todos los pares
+# (O(n³) una vez, O(1) por consulta); por encima se usa Dijkstra/A* por consulta.
+# Floyd-Warshall tarda ~0,8 s con 600 puntos pero ~3 s con 1000 y ~26 s con
+# 2000, demasiado para la primera consulta del menú o tras cada edición.
+LIMITE_FLOYD_WARSHALL = 600
+
+# Línea base con la que se comparan los análisis empíricos (se crea en el primero)
+LINEA_BASE_ANALISIS = "linea_base_rutas.json"
+
+# Arranques aleatorizados en paralelo para las rutas heurísticas (uno por núcleo)
+ARRANQUES_CONSULTA = os.cpu_count() or 1
 
 
 # =============================================================================
 # PARTE I - ALGORITMO PRINCIPAL: ASIGNACIÓN DE RUTAS DE ENTREGA
 # =============================================================================
 def generar_matriz_automatica(n):
-    """Genera una matriz aleatoria de distancias."""
-    return [[random.randint(1, 20) if i != j else 0 for j in range(n)] for i in range(n)]
+    """Genera una matriz aleatoria de distancias (arreglo contiguo, ver MatrizDistancias)."""
+    return MatrizDistancias.aleatoria(n, 1, 20)
 
 
 def mostrar_matriz(matriz):
     n = len(matriz)
     print("\n=== MATRIZ DE DISTANCIAS (Origen -> Destino) ===")
+    if n > LIMITE_MOSTRAR_MATRIZ:
+        print(f"(Matriz de {n} x {n}: se muestran solo los primeros {LIMITE_MOSTRAR_MATRIZ} puntos)")
+        n = LIMITE_MOSTRAR_MATRIZ
     print("      DESTINO")
     print("   De/A |", end="")
     for j in range(n):
@@ -30,12 +55,76 @@ def mostrar_matriz(matriz):
     for i in range(n):
         print(f"     {i} |", end="")
         for j in range(n):
-            print(f" {matriz[i][j]:2}", end="")
+            print(f" {matriz[i, j]:2}", end="")
         print()
 
 
-def editar_matriz(matriz):
-    """Permite editar rutas específicas sin reingresar toda la matriz."""
+def abrir_matriz_archivo(modo):
+    """Pide la ruta de un archivo de matriz y lo abre mapeado en memoria (None si se omite)."""
+    archivo = input("Archivo de matriz de distancias o CSV de aristas (ENTER para omitir): ").strip()
+    if not archivo:
+        return None
+    try:
+        if archivo.lower().endswith((".csv", ".txt")):
+            return importar_matriz_csv(archivo)
+        matriz = abrir_matriz(archivo, modo)
+    except (OSError, ValueError) as e:
+        print(f" No se pudo abrir el archivo: {e}")
+        return None
+    print(f"\n Matriz de {len(matriz)} puntos abierta desde '{archivo}'.")
+    return matriz
+
+
+def importar_matriz_csv(archivo):
+    """Importa un CSV "origen,destino,km" a una matriz nueva, en memoria o en disco."""
+    n = int(input("Número de puntos de la matriz: "))
+    simetrica = input("¿Aplicar cada distancia en ambos sentidos? (S/N): ").strip().lower() == "s"
+    destino = input("Archivo .mat donde guardar la matriz (ENTER para mantenerla en memoria): ").strip()
+    matriz = crear_matriz_archivo(destino, n, simetrica=simetrica) if destino else MatrizDistancias.vacia(n)
+
+    def progreso(filas, segundos):
+        print(f"  {filas} filas leídas ({filas / max(segundos, 1e-9):,.0f} filas/s)")
+
+    importadas, descartadas, segundos = importar_aristas(archivo, matriz, simetrica, progreso=progreso)
+    filas = importadas + descartadas
+    print(f"\n {importadas} distancias importadas desde '{archivo}' en {segundos:.2f} s "
+          f"({filas / max(segundos, 1e-9):,.0f} filas/s).")
+    if descartadas:
+        print(f" {descartadas} filas descartadas por índices o distancias inválidos.")
+
+    # Los pares sin tramo directo quedarían en 0, que las rutas completas tomarían como gratuitos
+    completados = completar_matriz(matriz)
+    if completados:
+        print(f" {completados} pares sin tramo directo completados con su camino mínimo por la red.")
+    return matriz
+
+
+def guardar_matriz_archivo(matriz):
+    """Ofrece guardar una matriz generada en memoria para reutilizarla en otra sesión."""
+    if matriz.en_disco:
+        return
+    opcion = input("\n¿Desea guardar la matriz en un archivo? (S/N): ").strip().lower()
+    if opcion != "s":
+        return
+    archivo = input("Nombre del archivo: ").strip()
+    try:
+        guardar_matriz(matriz, archivo)
+        print(f" Matriz guardada en '{archivo}'.")
+    except OSError as e:
+        print(f" No se pudo guardar la matriz: {e}")
+
+
+def editar_matriz(matriz, al_editar=None):
+    """Permite editar rutas específicas sin reingresar toda la matriz.
+
+    al_editar(i, j, anteriores), si se da, se llama tras cada cambio para
+    reparar los resultados derivados de la matriz.
+    """
+    if not matriz.datos.flags.writeable:
+        print("\n La matriz se abrió desde archivo en modo de solo lectura y no se puede modificar.")
+        print(" Ábrala desde el algoritmo principal (opción 1) para editarla.")
+        return
+
     while True:
         opcion = input("\n¿Desea modificar alguna distancia? (S/N): ").strip().lower()
         if opcion != "s":
@@ -45,30 +134,52 @@ def editar_matriz(matriz):
             i = int(input("Ingrese el punto de origen (índice): "))
             j = int(input("Ingrese el punto de destino (índice): "))
             nuevo_valor = int(input("Ingrese la nueva distancia (km): "))
-
-            if i == j or i < 0 or j < 0 or i >= len(matriz) or j >= len(matriz):
-                print(" Índices inválidos. Intente nuevamente.")
-                continue
-
-            matriz[i][j] = nuevo_valor
-            matriz[j][i] = nuevo_valor  # simétrica
-            print(f" Distancia entre {i} y {j} actualizada a {nuevo_valor} km.")
         except ValueError:
             print(" Entrada inválida. Debe ser un número entero.")
+            continue
+
+        if i == j or i < 0 or j < 0 or i >= len(matriz) or j >= len(matriz):
+            print(" Índices inválidos. Intente nuevamente.")
+            continue
+
+        try:
+            anteriores = matriz.editar(i, j, nuevo_valor)  # simétrica
+        except (OverflowError, ValueError) as e:
+            # El valor no cabe en el tipo entero del archivo (o en int64)
+            print(f" No se pudo guardar la distancia {nuevo_valor}: {e}")
+            continue
+        if al_editar is not None:
+            al_editar(i, j, anteriores)
+        print(f" Distancia entre {i} y {j} actualizada a {nuevo_valor} km.")
 
 
 def mostrar_rutas_disponibles(n):
-    """Muestra las rutas disponibles basadas en las filas de la matriz."""
+    """Muestra la primera página de rutas disponibles, sin construir sus secuencias."""
     print("\n=== RUTAS DISPONIBLES ===")
-    for i in range(n):
-        ruta = list(range(n))
-        ruta.pop(i)
-        print(f"Ruta {i + 1}: 0 → {' → '.join(map(str, ruta))} → 0")
+    for num in range(1, min(n, TAMANO_PAGINA_CATALOGO) + 1):
+        print(f"Ruta {num}: {texto_ruta_catalogo(num, n)}")
+    if n > TAMANO_PAGINA_CATALOGO:
+        print(f"... y {n - TAMANO_PAGINA_CATALOGO} rutas más (Ruta k visita todos los puntos salvo k - 1)")
     print("=" * 40)
 
+
+def mostrar_rutas_catalogo(catalogo, numeros):
+    """Imprime rutas del catálogo con su distancia, página a página.
+
+    Si hay más de una página se pregunta antes de mostrar la siguiente.
+    """
+    for inicio in range(0, len(numeros), TAMANO_PAGINA_CATALOGO):
+        if inicio and input(f"\nENTER para ver las siguientes rutas ({inicio} de {len(numeros)} mostradas), "
+                            "o cualquier texto para terminar: ").strip():
+            break
+        for num, distancia in catalogo.pagina(inicio // TAMANO_PAGINA_CATALOGO, numeros=numeros):
+            print(f"\nRuta {num}:")
+            print(f"  Secuencia: {catalogo.texto(num)}")
+            print(f"  Distancia: {distancia} km")
+
 def asignar_rutas_manual(num_conductores, n):
-    """Permite asignar rutas predefinidas a los conductores."""
-    rutas = {}
+    """Permite asignar rutas predefinidas a los conductores (lista de RutaAsignada)."""
+    rutas = []
     # Solo mostrar tantas rutas como conductores si hay menos conductores que filas
     mostrar_rutas_disponibles(num_conductores if num_conductores < n else n)
     print("\n=== Asignación de Rutas a Conductores ===")
@@ -79,12 +190,9 @@ def asignar_rutas_manual(num_conductores, n):
     for i in range(num_conductores):
         if num_conductores > n:
             ruta_num = (i % n) + 1
-            puntos = list(range(n))
-            punto_inicio = ruta_num - 1
-            puntos.pop(punto_inicio)
-            ruta_completa = [0] + puntos + [0]
+            ruta_completa = ruta_catalogo(ruta_num, n)
             # Almacenar tanto el número de ruta como la secuencia
-            rutas[i + 1] = {"num": ruta_num, "seq": ruta_completa}
+            rutas.append(RutaAsignada(i + 1, ruta_num, ruta_completa))
             rutas_asignadas.append(ruta_num)
             print(f"Conductor {i + 1}: Ruta {ruta_num} asignada automáticamente.")
         else:
@@ -97,11 +205,8 @@ def asignar_rutas_manual(num_conductores, n):
                     if ruta_num in rutas_asignadas:
                         print(" Esta ruta ya fue asignada a otro conductor")
                         continue
-                    puntos = list(range(n))
-                    punto_inicio = ruta_num - 1
-                    puntos.pop(punto_inicio)
-                    ruta_completa = [0] + puntos + [0]
-                    rutas[i + 1] = {"num": ruta_num, "seq": ruta_completa}
+                    ruta_completa = ruta_catalogo(ruta_num, n)
+                    rutas.append(RutaAsignada(i + 1, ruta_num, ruta_completa))
                     rutas_asignadas.append(ruta_num)
                     print(f"Ruta {ruta_num} asignada al Conductor {i + 1}")
                     break
@@ -109,62 +214,85 @@ def asignar_rutas_manual(num_conductores, n):
                     print("Por favor, ingrese un número válido")
     return rutas
 
-def asignar_rutas():
-    global matriz_global, n_global, rutas_asignadas_global
+def asignar_rutas_por_catalogo(sesion, capacidad, total_paquetes):
+    """Reparto original: ceil(total/capacidad) conductores con rutas elegidas del catálogo.
 
+    Devuelve la lista de RutaAsignada de los conductores.
+    """
+    paquetes_por_conductor = reparto_paquetes(capacidad, total_paquetes)
+
+    # Agregamos la asignación manual de rutas
+    rutas = asignar_rutas_manual(len(paquetes_por_conductor), sesion.n)
+    for ruta, paquetes in zip(rutas, paquetes_por_conductor):
+        ruta.paquetes = paquetes
+
+    # Ordenar los puntos de cada ruta con el motor adecuado a su tamaño
+    # (exacto en rutas pequeñas, heurístico en rutas de miles de puntos)
+    return optimizar_asignacion(rutas, sesion.matriz)
+
+
+def leer_demandas(n, total_paquetes):
+    """Pide los paquetes de cada punto; con ENTER reparte el total en partes iguales."""
+    texto = input(f"Paquetes por punto 1..{n - 1} separados por comas (ENTER para repartir {total_paquetes}): ")
+    if texto.strip():
+        try:
+            valores = [int(x) for x in texto.split(",")]
+            if len(valores) == n - 1:
+                return [0] + valores
+            print(f" Se esperaban {n - 1} valores; se reparte el total en partes iguales.")
+        except ValueError:
+            print(" Valores inválidos; se reparte el total en partes iguales.")
+    return demandas_uniformes(n, total_paquetes)
+
+
+def asignar_rutas(sesion):
     print("\n" + "=" * 80)
     print(" ALGORITMO PRINCIPAL: ASIGNACIÓN DE RUTAS DE ENTREGA ")
     print("=" * 80)
 
-    if matriz_global is None:
-        n_global = int(input("Ingrese el número de puntos de entrega: "))
-        matriz_global = generar_matriz_automatica(n_global)
-        print("\n Matriz generada automáticamente.")
+    if sesion.matriz is None:
+        # Las ediciones sobre una matriz abierta desde archivo se guardan en el propio archivo
+        matriz = abrir_matriz_archivo("r+")
+        if matriz is None:
+            n = int(input("Ingrese el número de puntos de entrega: "))
+            matriz = generar_matriz_automatica(n)
+            print("\n Matriz generada automáticamente.")
+        sesion.usar_matriz(matriz)
     else:
         print("\n Usando la matriz previamente generada.")
 
-    mostrar_matriz(matriz_global)
-    editar_matriz(matriz_global)
+    mostrar_matriz(sesion.matriz)
+    editar_matriz(sesion.matriz, sesion.reparar_derivados)
+    guardar_matriz_archivo(sesion.matriz)
 
     capacidad = int(input("\nCapacidad máxima de paquetes por conductor: "))
     total_paquetes = int(input("Cantidad total de paquetes a distribuir: "))
 
-    num_conductores = math.ceil(total_paquetes / capacidad)
-    paquetes_restantes = total_paquetes
+    modo = input("¿Calcular las rutas según la demanda de cada punto (CVRP)? (S/N): ").strip().lower()
+    if modo == "s":
+        demandas = leer_demandas(sesion.n, total_paquetes)
+        try:
+            rutas_conductores, paquetes_por_conductor = resolver_cvrp(sesion.matriz, demandas, capacidad)
+        except ValueError as e:
+            print(f" No se pudieron calcular las rutas: {e}")
+            return
+        # Las rutas del CVRP no corresponden a ninguna "Ruta k" del catálogo
+        rutas = [RutaAsignada(c + 1, None, ruta, paquetes)
+                 for c, (ruta, paquetes) in enumerate(zip(rutas_conductores, paquetes_por_conductor))]
+        print(f"\n Se necesitan {len(rutas)} conductores para cubrir la demanda.")
+    else:
+        rutas = asignar_rutas_por_catalogo(sesion, capacidad, total_paquetes)
 
-    # Agregamos la asignación manual de rutas
-    rutas_asignadas_global = asignar_rutas_manual(num_conductores, n_global)
+    # Calcular la distancia de todas las rutas asignadas en una sola pasada;
+    # queda en caché y se repara con cada edición posterior de la matriz
+    distancias = sesion.asignar(rutas)
 
     print("\n--- RESULTADOS DE ASIGNACIÓN DE RUTAS ---")
-    for c in range(num_conductores):
-        paquetes = capacidad if paquetes_restantes >= capacidad else paquetes_restantes
-        paquetes_restantes -= paquetes
-
-        inicio = 0
-        fin = min(n_global - 1, (c + 1) * paquetes - 1)
-
-        distancia_total = sum(matriz_global[i][i + 1] for i in range(inicio, fin))
-        distancia_total += matriz_global[fin][0]
-
-        ruta_entry = rutas_asignadas_global.get(c + 1, list(range(inicio, fin + 1)) + [0])
-        # Si la entrada es un dict con 'seq', extraemos la secuencia
-        if isinstance(ruta_entry, dict) and 'seq' in ruta_entry:
-            ruta_asignada = ruta_entry['seq']
-        else:
-            ruta_asignada = ruta_entry
-
-        print(f"\nConductor {c + 1}:")
-        print(f"  Paquetes asignados: {paquetes}")
-        print(f"  Ruta: [{' → '.join(map(str, ruta_asignada))}]")
-
-        # Calcular distancia total para la ruta asignada
-        distancia_total = 0
-        for i in range(len(ruta_asignada) - 1):
-            origen = ruta_asignada[i]
-            destino = ruta_asignada[i + 1]
-            distancia_total += matriz_global[origen][destino]
-
-        print(f"  Distancia total recorrida: {distancia_total} km")
+    for ruta, distancia in zip(rutas, distancias):
+        print(f"\nConductor {ruta.conductor}:")
+        print(f"  Paquetes asignados: {ruta.paquetes}")
+        print(f"  Ruta: [{' → '.join(map(str, ruta.seq))}]")
+        print(f"  Distancia total recorrida: {distancia} km")
 
     print("\nAsignación completada correctamente.\n")
 
@@ -172,132 +300,218 @@ def asignar_rutas():
 # =============================================================================
 # CONSULTA DE RUTAS
 # =============================================================================
-def encontrar_mejor_ruta(origen, destino, matriz):
-    """Encuentra la mejor ruta entre dos puntos usando todos los puntos intermedios posibles."""
-    n = len(matriz)
-    puntos_intermedios = [i for i in range(n) if i != origen and i != destino]
-    mejor_ruta = None
-    menor_distancia = float('inf')
-    
-    # Probar todas las posibles combinaciones de puntos intermedios
-    from itertools import permutations
-    for permutacion in permutations(puntos_intermedios):
-        ruta_actual = [origen] + list(permutacion) + [destino]
-        distancia_actual = sum(matriz[ruta_actual[i]][ruta_actual[i+1]] 
-                             for i in range(len(ruta_actual)-1))
-        
-        if distancia_actual < menor_distancia:
-            menor_distancia = distancia_actual
-            mejor_ruta = ruta_actual
-            
+def encontrar_mejor_ruta(origen, destino, matriz, tiempo_limite=TIEMPO_LIMITE_CONSULTA, cache=None):
+    """Encuentra la mejor ruta entre dos puntos pasando por todos los puntos intermedios.
+
+    Hasta LIMITE_HELD_KARP intermedios usa la programación dinámica de
+    Held-Karp; en tamaños medianos, ramificación y acotación limitada a
+    tiempo_limite segundos; con miles de puntos, vecino más cercano mejorado
+    con 2-opt y Or-opt (ver motor_rutas.resolver_ruta). Con cache
+    (cache_rutas.CacheRutas) las consultas repetidas no se recalculan.
+    """
+    def resolver(o, d, m):
+        return resolver_ruta(o, d, m, tiempo_limite)
+
+    if cache is None:
+        mejor_ruta, menor_distancia, _ = resolver(origen, destino, matriz)
+    else:
+        mejor_ruta, menor_distancia, _ = cache.obtener(origen, destino, matriz, resolver, tiempo_limite)
     return mejor_ruta, menor_distancia
 
-def consultar_rutas():
-    if matriz_global is None:
-        print("\n No hay matriz generada. Primero ejecute el algoritmo principal.")
-        return
+
+def resolver_consulta(origen, destino, matriz):
+    return resolver_ruta(origen, destino, matriz, arranques=ARRANQUES_CONSULTA)
+
+def consultar_rutas(sesion):
+    if sesion.matriz is None:
+        print("\n No hay matriz generada. Ejecute el algoritmo principal o abra un archivo de matriz.")
+        matriz = abrir_matriz_archivo("r")
+        if matriz is None:
+            return
+        sesion.usar_matriz(matriz)
+    matriz = sesion.matriz
+    n = sesion.n
         
     print("\n" + "=" * 80)
     print(" CONSULTA DE RUTAS Y DISTANCIAS ")
     print("=" * 80)
     
-    mostrar_matriz(matriz_global)
+    mostrar_matriz(matriz)
     
     while True:
         print("\n=== OPCIONES DE CONSULTA ===")
         print("1) Consultar ruta específica entre dos puntos")
         print("2) Ver todas las rutas y distancias")
-        print("3) Volver al menú principal")
+        print("3) Camino más corto entre dos puntos (sin visitar todos)")
+        print("4) Modificar distancias")
+        print("5) Volver al menú principal")
         
-        opcion = input("\nSeleccione una opción (1-3): ").strip()
+        opcion = input("\nSeleccione una opción (1-5): ").strip()
         
         if opcion == "1":
             try:
                 print("\nConsulta de ruta específica")
-                print("Puntos disponibles:", ", ".join(map(str, range(n_global))))
+                print("Puntos disponibles:", ", ".join(map(str, range(n))))
                 origen = int(input("Ingrese el punto de origen: "))
                 destino = int(input("Ingrese el punto de destino: "))
                 
-                if origen < 0 or destino < 0 or origen >= n_global or destino >= n_global:
-                    print(" Puntos inválidos. Deben estar entre 0 y", n_global-1)
+                if origen < 0 or destino < 0 or origen >= n or destino >= n:
+                    print(" Puntos inválidos. Deben estar entre 0 y", n-1)
                     continue
                     
-                # Encontrar la mejor ruta entre los puntos
-                mejor_ruta, distancia = encontrar_mejor_ruta(origen, destino, matriz_global)
+                # Encontrar la mejor ruta entre los puntos (o reutilizarla si no cambió la matriz)
+                mejor_ruta, distancia, brecha = sesion.cache.obtener(origen, destino, matriz, resolver_consulta,
+                                                                     TIEMPO_LIMITE_CONSULTA)
                 
                 print("\n=== RESULTADO DE LA CONSULTA ===")
                 print(f"Mejor ruta encontrada: {' → '.join(map(str, mejor_ruta))}")
                 print(f"Distancia total: {distancia} km")
+                if brecha is None:
+                    print("Ruta heurística: no se garantiza que sea la óptima")
+                elif brecha > 0:
+                    print(f"Tiempo límite alcanzado: la ruta está a lo sumo un {brecha:.1%} sobre el óptimo")
+                stats = sesion.cache.estadisticas()
+                print(f"Caché de consultas: {stats['aciertos']} aciertos, {stats['fallos']} fallos, "
+                      f"{stats['desalojos']} desalojos, {stats['caducados']} caducados")
                 
                 # Mostrar el desglose de la ruta
                 print("\nDesglose de la ruta:")
                 for i in range(len(mejor_ruta)-1):
                     punto_actual = mejor_ruta[i]
                     punto_siguiente = mejor_ruta[i+1]
-                    distancia_tramo = matriz_global[punto_actual][punto_siguiente]
+                    distancia_tramo = matriz[punto_actual, punto_siguiente]
                     print(f"  {punto_actual} → {punto_siguiente}: {distancia_tramo} km")
                 
             except ValueError:
                 print(" Por favor, ingrese números válidos.")
                 
         elif opcion == "2":
-            if rutas_asignadas_global:
+            if sesion.rutas:
                 print("\n=== RUTAS ASIGNADAS ===")
                 total_km_asignados = 0
-                # Recolectar números de ruta asignados y mostrar detalles
-                rutas_asignadas_nums = []
-                for conductor, entry in rutas_asignadas_global.items():
-                    # extraer secuencia y número si están presentes
-                    if isinstance(entry, dict) and 'seq' in entry:
-                        seq = entry['seq']
-                        num = entry.get('num')
-                    else:
-                        seq = entry
-                        # intentar deducir el número de ruta: es el punto que falta en la secuencia
-                        full = set(range(n_global))
-                        # considerar solo los puntos intermedios (seq sin los ceros inicial/final)
-                        presentes = set(seq[1:-1])
-                        faltantes = list(full - presentes)
-                        num = (faltantes[0] + 1) if len(faltantes) == 1 else None
-
-                    if num is not None:
-                        rutas_asignadas_nums.append(num)
-
-                    distancia = sum(matriz_global[seq[i]][seq[i+1]] for i in range(len(seq)-1))
+                # Números de ruta del catálogo asignados (las rutas del CVRP no tienen número)
+                rutas_asignadas_nums = [ruta.num for ruta in sesion.rutas if ruta.num is not None]
+
+                distancias = sesion.totales_vigentes()
+                for ruta, distancia in zip(sesion.rutas, distancias):
                     total_km_asignados += distancia
-                    print(f"\nConductor {conductor}:")
-                    print(f"  Ruta: {' → '.join(map(str, seq))}")
+                    print(f"\nConductor {ruta.conductor}:")
+                    print(f"  Ruta: {' → '.join(map(str, ruta.seq))}")
                     print(f"  Distancia total: {distancia} km")
 
                 print(f"\nTotal kilómetros en rutas asignadas: {total_km_asignados} km")
 
-                # Determinar rutas realmente no asignadas
-                rutas_no_asignadas = [i for i in range(n_global) if (i+1) not in rutas_asignadas_nums]
-                if rutas_no_asignadas:
+                # Determinar rutas realmente no asignadas (solo aplica a rutas del catálogo;
+                # las rutas calculadas con CVRP no tienen número)
+                rutas_no_asignadas = np.setdiff1d(np.arange(1, n + 1), rutas_asignadas_nums)
+                if rutas_asignadas_nums and len(rutas_no_asignadas):
                     print("\n=== RUTAS NO ASIGNADAS ===")
-                    total_km_no_asignados = 0
-                    for i in rutas_no_asignadas:
-                        puntos = list(range(n_global))
-                        puntos.pop(i)
-                        ruta = [0] + puntos + [0]
-                        distancia = sum(matriz_global[ruta[j]][ruta[j+1]] for j in range(len(ruta)-1))
-                        total_km_no_asignados += distancia
-                        print(f"\nRuta {i + 1}:")
-                        print(f"  Secuencia: {' → '.join(map(str, ruta))}")
-                        print(f"  Distancia: {distancia} km")
+                    # Costo de todas las rutas "sin el punto i" en O(n); las secuencias no se construyen
+                    catalogo = CatalogoRutas(matriz)
+                    total_km_no_asignados = catalogo.total(rutas_no_asignadas)
+                    if len(rutas_no_asignadas) > TAMANO_PAGINA_CATALOGO:
+                        print(f"\n{len(rutas_no_asignadas)} rutas no asignadas. "
+                              f"Las {TAMANO_PAGINA_CATALOGO} más cortas:")
+                        for num, distancia in catalogo.mas_baratas(TAMANO_PAGINA_CATALOGO, rutas_no_asignadas):
+                            print(f"  Ruta {num}: {distancia} km")
+                    mostrar_rutas_catalogo(catalogo, rutas_no_asignadas)
                     print(f"\nTotal kilómetros en rutas no asignadas: {total_km_no_asignados} km")
                     print(f"Total kilómetros global: {total_km_asignados + total_km_no_asignados} km")
-                else:
+                elif rutas_asignadas_nums:
                     print("\nNo hay rutas no asignadas. Todas las rutas han sido asignadas al menos una vez.")
             else:
                 print("\n No hay rutas asignadas todavía.")
-                mostrar_rutas_disponibles(n_global)
+                mostrar_rutas_disponibles(n)
                 
         elif opcion == "3":
+            try:
+                origen = int(input("Ingrese el punto de origen: "))
+                destino = int(input("Ingrese el punto de destino: "))
+                if origen < 0 or destino < 0 or origen >= n or destino >= n:
+                    print(" Puntos inválidos. Deben estar entre 0 y", n-1)
+                    continue
+
+                if n <= LIMITE_FLOYD_WARSHALL:
+                    # Todos los pares precalculados; se recalculan solo si la matriz cambió
+                    caminos = sesion.caminos_vigentes()
+                    camino = caminos.camino(origen, destino)
+                    distancia = caminos.distancia(origen, destino)
+                else:
+                    # El grafo CSR se construye en la primera consulta y tras cada edición
+                    camino, distancia = sesion.grafo_vigente().camino_mas_corto(origen, destino)
+
+                print("\n=== CAMINO MÁS CORTO ===")
+                if camino is None:
+                    print(f" No hay conexión entre {origen} y {destino}.")
+                else:
+                    print(f"Camino: {' → '.join(map(str, camino))}")
+                    print(f"Distancia total: {distancia} km")
+            except ValueError:
+                print(" Por favor, ingrese números válidos.")
+
+        elif opcion == "4":
+            # Los caminos mínimos y los totales de las rutas se reparan tras cada cambio
+            editar_matriz(matriz, sesion.reparar_derivados)
+
+        elif opcion == "5":
             break
             
         else:
-            print("\n Opción inválida. Por favor, seleccione 1, 2 o 3.")
+            print("\n Opción inválida. Por favor, seleccione una opción del 1 al 5.")
+
+def consultar_red_carreteras():
+    """Caminos mínimos sobre una red leída de un CSV de aristas, sin construir la matriz n x n.
+
+    Con un archivo de coordenadas (una línea "x,y" por punto) las consultas
+    usan A*; sin él, Dijkstra.
+    """
+    print("\n" + "=" * 80)
+    print(" CAMINOS MÍNIMOS EN UNA RED DE CARRETERAS ")
+    print("=" * 80)
+    archivo = input("CSV de aristas \"origen,destino,km\": ").strip()
+    try:
+        n = int(input("Número de puntos de la red: "))
+        simetrica = input("¿Las carreteras son de doble sentido? (S/N): ").strip().lower() == "s"
+        archivo_coordenadas = input("CSV de coordenadas \"x,y\" de cada punto (ENTER para usar Dijkstra): ").strip()
+        coordenadas = leer_coordenadas(archivo_coordenadas, n) if archivo_coordenadas else None
+        escala = 1.0
+        if coordenadas is not None:
+            texto = input("Km por unidad de coordenadas, sin superar la de ningún tramo (ENTER = 1): ").strip()
+            escala = float(texto) if texto else 1.0
+
+        def progreso(filas, segundos):
+            print(f"  {filas} filas leídas ({filas / max(segundos, 1e-9):,.0f} filas/s)")
+
+        grafo, importadas, descartadas, segundos = importar_red(archivo, n, simetrica, coordenadas, progreso=progreso)
+    except (OSError, ValueError) as e:
+        print(f" No se pudo cargar la red: {e}")
+        return
+    print(f"\n Red de {len(grafo)} puntos y {grafo.num_aristas} tramos cargada en {segundos:.2f} s.")
+    if descartadas:
+        print(f" {descartadas} filas descartadas por índices o distancias inválidos.")
+    print(f" Consultas con {'A*' if coordenadas is not None else 'Dijkstra'}.")
+
+    while True:
+        texto = input("\nPunto de origen (ENTER para volver): ").strip()
+        if not texto:
+            return
+        try:
+            origen = int(texto)
+            destino = int(input("Punto de destino: "))
+        except ValueError:
+            print(" Por favor, ingrese números válidos.")
+            continue
+        if origen < 0 or destino < 0 or origen >= n or destino >= n:
+            print(" Puntos inválidos. Deben estar entre 0 y", n - 1)
+            continue
+        camino, distancia = grafo.camino_mas_corto(origen, destino, escala)
+        print("\n=== CAMINO MÁS CORTO ===")
+        if camino is None:
+            print(f" No hay conexión entre {origen} y {destino}.")
+        else:
+            print(f"Camino: {' → '.join(map(str, camino))}")
+            print(f"Distancia total: {distancia} km")
+
 
 # =============================================================================
 # PARTE II - ANÁLISIS EMPÍRICO DE COMPLEJIDAD
@@ -315,28 +529,12 @@ def asignar_rutas_automatico(n):
 
         inicio = 0
         fin = min(n - 1, (c + 1) * paquetes - 1)
-        distancia_total = sum(matriz[i][i + 1] for i in range(inicio, fin))
-        distancia_total += matriz[fin][0]
+        distancia_total = matriz.costo_ruta(list(range(inicio, fin + 1)) + [0])
 
     return distancia_total
 
 
-def medir_tiempo_memoria(funcion, *args):
-    tracemalloc.start()
-    inicio = time.time()
-    funcion(*args)
-    fin = time.time()
-    _, memoria_pico = tracemalloc.get_traced_memory()
-    tracemalloc.stop()
-    return (fin - inicio) * 1000, memoria_pico / (1024 * 1024)
-
-
 def analisis_empirico():
-    import time
-    import tracemalloc
-    import math
-    import random
-
     print("\n" + "=" * 80)
     print(" ANÁLISIS EMPÍRICO DE COMPLEJIDAD DEL ALGORITMO DE RUTAS ")
     print("=" * 80)
@@ -344,61 +542,37 @@ def analisis_empirico():
     # Tamaños de entrada que se analizarán
     tamanos = [50, 100, 500, 1000, 2000, 3000]
 
-    # Diccionarios para almacenar los resultados
-    tiempos_por_n = {}
-    memorias_por_n = {}
-
-    # Función automática para medir rendimiento
-    def asignar_rutas_automatico(n):
-        matriz = [[random.randint(1, 20) if i != j else 0 for j in range(n)] for i in range(n)]
-        capacidad = 3
-        total_paquetes = n // 2
-        num_conductores = math.ceil(total_paquetes / capacidad)
-        paquetes_restantes = total_paquetes
-
-        for c in range(num_conductores):
-            if paquetes_restantes >= capacidad:
-                paquetes = capacidad
-            else:
-                paquetes = paquetes_restantes
-            paquetes_restantes -= paquetes
-
-            inicio = 0
-            fin = min(n - 1, (c + 1) * paquetes - 1)
-            distancia_total = 0
-            for i in range(inicio, fin):
-                distancia_total += matriz[i][i + 1]
-            distancia_total += matriz[fin][0]
-        return distancia_total
-
-    # Medición de tiempo y memoria
-    def medir_tiempo_memoria(funcion, *args):
-        tracemalloc.start()
-        inicio = time.time()
-        funcion(*args)
-        fin = time.time()
-        _, memoria_pico = tracemalloc.get_traced_memory()
-        tracemalloc.stop()
-        return (fin - inicio) * 1000, memoria_pico / (1024 * 1024)
+    # Medición de cada tamaño: muestras de tiempo, cuartiles, intervalo de
+    # confianza de la mediana y memoria pico (ver medicion_rendimiento.medir)
+    mediciones = {}
 
     # === Bucle de análisis ===
     for n in tamanos:
-        tiempos_n = []
-        memorias_n = []
-
-        # Ejecuta varias veces para obtener promedios más estables
-        for _ in range(5):
-            tiempo_ms, memoria_mb = medir_tiempo_memoria(asignar_rutas_automatico, n)
-            tiempos_n.append(tiempo_ms)
-            memorias_n.append(memoria_mb)
-
-        tiempos_por_n[n] = tiempos_n
-        memorias_por_n[n] = memorias_n
+        medicion = medir(asignar_rutas_automatico, n)
+        mediciones[n] = medicion
+        print(f"n={n} → Tiempo mediano: {medicion.mediana_ms:.4f} ms ±{medicion.precision:.1%} "
+              f"(IQR {medicion.iqr / 1e6:.4f} ms, {len(medicion.muestras)} muestras, "
+              f"{medicion.atipicos} atípicas) | Memoria pico: {medicion.memoria_mb:.4f} MB")
+    # === Ajuste de complejidad y comparación con la línea base ===
+    por_algoritmo = {"asignar_rutas_automatico": mediciones}
+    ajustes = ajustar_mediciones(por_algoritmo)
+    ajuste_tiempo, ajuste_memoria = ajustes["asignar_rutas_automatico"]
+    print(f"\nComplejidad ajustada → Tiempo: {ajuste_tiempo or 'N/A'} | Memoria: {ajuste_memoria or 'N/A'}")
+    regresiones, hay_linea_base = comparar_con_linea_base(LINEA_BASE_ANALISIS, por_algoritmo, ajustes)
+    if not hay_linea_base:
+        print(f" Línea base guardada en '{LINEA_BASE_ANALISIS}' (bórrela para tomar una nueva).")
+    elif regresiones:
+        print(f" REGRESIONES respecto a '{LINEA_BASE_ANALISIS}':")
+        for _, n, descripcion in regresiones:
+            print(f"   {'modelo' if n is None else f'n={n}'}: {descripcion}")
+    else:
+        print(f" Sin regresiones respecto a '{LINEA_BASE_ANALISIS}'.")
+    ejecucion = registrar_ejecucion("rutas", por_algoritmo)
+    print(f" Ejecución #{ejecucion} registrada en '{RUTA_HISTORIAL}' "
+          f"(compárela con: python historial_rendimiento.py comparar --suite rutas)")
 
-        print(f"n={n} → Tiempo medio: {sum(tiempos_n)/len(tiempos_n):.2f} ms | "
-              f"Memoria media: {sum(memorias_n)/len(memorias_n):.4f} MB")
     # === Generar gráfico interactivo sincronizado ===
-    generar_grafico_interactivo(tamanos, tiempos_por_n, memorias_por_n)
+    generar_grafico_interactivo(tamanos, mediciones, ajuste_tiempo, ajuste_memoria)
 
     print("\n Análisis empírico completado. Archivo HTML generado correctamente.\n")
 
@@ -406,50 +580,67 @@ def analisis_empirico():
 # =============================================================================
 # PARTE III - GRÁFICO INTERACTIVO 
 # =============================================================================
-def generar_grafico_interactivo(tamanos, tiempos_por_n, memorias_por_n):
+def generar_grafico_interactivo(tamanos, mediciones, ajuste_tiempo=None, ajuste_memoria=None):
     import plotly.graph_objects as go
     from plotly.subplots import make_subplots
 
-    colores = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b"]
-
     fig = make_subplots(
         rows=1, cols=2,
         subplot_titles=("Complejidad Temporal", "Complejidad Espacial"),
         horizontal_spacing=0.12
     )
 
-    # === GRÁFICA DE TIEMPO ===
-    for i, n in enumerate(tamanos):
-        fig.add_trace(
-            go.Scatter(
-                x=list(range(1, len(tiempos_por_n[n]) + 1)),
-                y=tiempos_por_n[n],
-                mode="lines+markers",
-                name=f"n={n}",
-                legendgroup=f"grupo{n}",  # grupo común
-                line=dict(color=colores[i % len(colores)], width=3),
-                marker=dict(size=8),
-                hovertemplate="Iteración %{x}<br>Tiempo: %{y:.2f} ms<extra></extra>"
-            ),
-            row=1, col=1
-        )
-
-    # === GRÁFICA DE MEMORIA ===
-    for i, n in enumerate(tamanos):
-        fig.add_trace(
-            go.Scatter(
-                x=list(range(1, len(memorias_por_n[n]) + 1)),
-                y=memorias_por_n[n],
-                mode="lines+markers",
-                name=f"n={n}",
-                legendgroup=f"grupo{n}",  
-                showlegend=False, 
-                line=dict(color=colores[i % len(colores)], width=3),
-                marker=dict(size=8),
-                hovertemplate="Iteración %{x}<br>Memoria: %{y:.4f} MB<extra></extra>"
+    # === GRÁFICA DE TIEMPO: mediana por tamaño, barras de Q1 a Q3 ===
+    medianas = [mediciones[n].mediana_ms for n in tamanos]
+    fig.add_trace(
+        go.Scatter(
+            x=tamanos,
+            y=medianas,
+            mode="lines+markers",
+            name="Tiempo mediano",
+            line=dict(color="#1f77b4", width=3),
+            marker=dict(size=8),
+            error_y=dict(
+                type="data",
+                symmetric=False,
+                array=[mediciones[n].q3 / 1e6 - m for n, m in zip(tamanos, medianas)],
+                arrayminus=[m - mediciones[n].q1 / 1e6 for n, m in zip(tamanos, medianas)]
             ),
-            row=1, col=2
-        )
+            customdata=[[len(mediciones[n].muestras), mediciones[n].precision * 100] for n in tamanos],
+            hovertemplate="n=%{x}<br>Tiempo: %{y:.4f} ms ±%{customdata[1]:.1f}%"
+                          "<br>Muestras: %{customdata[0]}<extra></extra>"
+        ),
+        row=1, col=1
+    )
+
+    # === GRÁFICA DE MEMORIA: pico medido en una pasada aparte ===
+    fig.add_trace(
+        go.Scatter(
+            x=tamanos,
+            y=[mediciones[n].memoria_mb for n in tamanos],
+            mode="lines+markers",
+            name="Memoria pico",
+            line=dict(color="#ff7f0e", width=3),
+            marker=dict(size=8),
+            hovertemplate="n=%{x}<br>Memoria: %{y:.4f} MB<extra></extra>"
+        ),
+        row=1, col=2
+    )
+
+    # === CURVAS AJUSTADAS (ver ajuste_complejidad) ===
+    for ajuste, escala, columna in ((ajuste_tiempo, 1e6, 1), (ajuste_memoria, 1024 * 1024, 2)):
+        if ajuste is not None:
+            fig.add_trace(
+                go.Scatter(
+                    x=tamanos,
+                    y=[ajuste.predecir(n) / escala for n in tamanos],
+                    mode="lines",
+                    name=f"Ajuste {ajuste}",
+                    line=dict(color="#7f7f7f", width=2, dash="dash"),
+                    hoverinfo="skip"
+                ),
+                row=1, col=columna
+            )
 
     # === CONFIGURACIÓN ===
     fig.update_layout(
@@ -462,7 +653,7 @@ def generar_grafico_interactivo(tamanos, tiempos_por_n, memorias_por_n):
         height=700,
         width=1500,
         legend=dict(
-            title="Tamaño n",
+            title="Medida",
             orientation="h",
             yanchor="bottom",
             y=-0.18,
@@ -476,9 +667,9 @@ def generar_grafico_interactivo(tamanos, tiempos_por_n, memorias_por_n):
         margin=dict(l=60, r=60, t=100, b=80)
     )
 
-    fig.update_xaxes(title_text="Iteraciones", row=1, col=1)
+    fig.update_xaxes(title_text="Tamaño de entrada (n)", row=1, col=1)
     fig.update_yaxes(title_text="Tiempo (ms)", row=1, col=1)
-    fig.update_xaxes(title_text="Iteraciones", row=1, col=2)
+    fig.update_xaxes(title_text="Tamaño de entrada (n)", row=1, col=2)
     fig.update_yaxes(title_text="Memoria (MB)", row=1, col=2)
 
     # === Guardar HTML ===
@@ -540,6 +731,8 @@ def generar_grafico_interactivo(tamanos, tiempos_por_n, memorias_por_n):
 # MENÚ PRINCIPAL
 # ===============================================================
 def menu():
+    # Matriz, rutas asignadas y cachés que comparten las opciones del menú
+    sesion = SesionRutas()
     while True:
         print("\n" + "=" * 80)
         print("   PARCIAL II - RUTAS DE ENTREGA CON ANÁLISIS DE COMPLEJIDAD")
@@ -547,17 +740,20 @@ def menu():
         print("1) Ejecutar algoritmo principal")
         print("2) Consultar rutas y distancias")
         print("3) Ejecutar análisis empírico")
-        print("4) Salir")
+        print("4) Caminos mínimos en una red de carreteras (CSV de aristas)")
+        print("5) Salir")
         print("=" * 80)
-        opcion = input("Seleccione una opción (1-4): ").strip()
+        opcion = input("Seleccione una opción (1-5): ").strip()
 
         if opcion == "1":
-            asignar_rutas()
+            asignar_rutas(sesion)
         elif opcion == "2":
-            consultar_rutas()
+            consultar_rutas(sesion)
         elif opcion == "3":
             analisis_empirico()
         elif opcion == "4":
+            consultar_red_carreteras()
+        elif opcion == "5":
             print("\nGracias por usar el programa. ¡Goodbye!\n")
             break
         else:
@@ -0,0 +1,212 @@
+import json
+import math
+import os
+
+# Modelos candidatos, de menor a mayor crecimiento: nombre → log f(n). Se
+# trabaja con logaritmos para que 2ⁿ no desborde con n de miles.
+MODELOS = {
+    "1": lambda n: 0.0,
+    "log n": lambda n: math.log(math.log2(max(n, 2))),
+    "n": lambda n: math.log(n),
+    "n log n": lambda n: math.log(n) + math.log(math.log2(max(n, 2))),
+    "n²": lambda n: 2 * math.log(n),
+    "n³": lambda n: 3 * math.log(n),
+    "2ⁿ": lambda n: n * math.log(2),
+}
+
+# Puntos mínimos para ajustar un modelo con alguna garantía
+MIN_PUNTOS_AJUSTE = 3
+
+# Un tiempo es regresión si supera la línea base en más de esta fracción y los
+# intervalos de confianza de ambas medianas no se solapan (entre ejecuciones
+# distintas el ruido supera al de una sola); la memoria pico es determinista
+# y basta con que supere su propio umbral.
+UMBRAL_REGRESION_TIEMPO = 0.25
+UMBRAL_REGRESION_MEMORIA = 0.10
+
+# Confianza mínima del modelo ajustado para señalar que la complejidad empeoró
+CONFIANZA_CAMBIO_MODELO = 0.9
+
+
+# =============================================================================
+# AJUSTE DE MODELOS DE COMPLEJIDAD
+# =============================================================================
+class AjusteComplejidad:
+    """Mejor modelo t(n) ≈ a + c·f(n) para unas mediciones.
+
+    a ≥ 0 absorbe el costo fijo (llamada, arranque) que en tamaños pequeños
+    tapa el crecimiento. Cada modelo se ajusta por mínimos cuadrados del
+    error relativo (la aproximación de primer orden de los mínimos cuadrados
+    en escala logarítmica, que sí tiene solución cerrada) y se compara por
+    su error cuadrático medio en log. confianza es el peso de Akaike del
+    modelo elegido: la probabilidad relativa de que sea el mejor candidato.
+    """
+
+    __slots__ = ("modelo", "constante", "coeficiente", "confianza", "errores", "puntos")
+
+    def __init__(self, modelo, constante, coeficiente, confianza, errores, puntos):
+        self.modelo = modelo
+        self.constante = constante
+        self.coeficiente = coeficiente
+        self.confianza = confianza
+        self.errores = errores
+        self.puntos = puntos
+
+    def __repr__(self):
+        return f"AjusteComplejidad({self})"
+
+    def __str__(self):
+        return f"O({self.modelo}) (confianza {self.confianza:.0%})"
+
+    def predecir(self, n):
+        try:
+            return self.constante + self.coeficiente * math.exp(MODELOS[self.modelo](n))
+        except OverflowError:
+            return math.inf
+
+
+def _ajustar_modelo(puntos, log_f):
+    """(a, c) ≥ 0 que minimizan Σ((a + c·f(n)) / t - 1)², o None si f(n)/t desborda."""
+    try:
+        u = [1 / t for _, t in puntos]
+        v = [math.exp(log_f(n) - math.log(t)) for n, t in puntos]
+    except OverflowError:
+        return None
+    suu, svv, suv = sum(x * x for x in u), sum(x * x for x in v), sum(x * y for x, y in zip(u, v))
+    su, sv = sum(u), sum(v)
+    determinante = suu * svv - suv * suv
+    if determinante > 1e-12 * suu * svv:
+        a, c = (su * svv - sv * suv) / determinante, (sv * suu - su * suv) / determinante
+        if a >= 0 and c >= 0:
+            return a, c
+    # Óptimo en el borde: solo costo fijo o solo crecimiento
+    candidatos = [(su / suu, 0.0), (0.0, sv / svv)]
+    return min(candidatos, key=lambda ac: sum((ac[0] * x + ac[1] * y - 1) ** 2 for x, y in zip(u, v)))
+
+
+def ajustar_complejidad(tamanos, valores, modelos=MODELOS):
+    """AjusteComplejidad de valores frente a tamanos, o None si hay menos de MIN_PUNTOS_AJUSTE válidos.
+
+    Se ignoran los puntos sin medir (None) o no positivos.
+    """
+    puntos = [(n, v) for n, v in zip(tamanos, valores) if v is not None and v > 0]
+    if len(puntos) < MIN_PUNTOS_AJUSTE:
+        return None
+    k = len(puntos)
+    ajustes, aic = {}, {}
+    for nombre, log_f in modelos.items():
+        ajuste = _ajustar_modelo(puntos, log_f)
+        if ajuste is None:
+            continue
+        a, c = ajuste
+        # c·f(n) se evalúa como exp(log c + log f(n)): f(n) sola desborda (2ⁿ
+        # con n ≈ 1030) aunque el producto sea del orden de las mediciones.
+        try:
+            termino = [math.exp(math.log(c) + log_f(n)) if c > 0 else 0.0 for n, _ in puntos]
+        except OverflowError:
+            continue
+        crecimiento = max(termino)
+        if nombre != "1" and crecimiento <= 1e-6 * (a + crecimiento):
+            continue  # sin crecimiento apreciable es el modelo constante: no compite dos veces
+        error = sum((math.log(a + c_f) - math.log(t)) ** 2 for c_f, (_, t) in zip(termino, puntos)) / k
+        # AIC: el modelo constante tiene un parámetro, el resto dos; el error
+        # se acota (0,1 % de error relativo) para que un ajuste exacto no dé
+        # logaritmo de cero ni distinga entre diferencias de redondeo.
+        ajustes[nombre] = (a, c, error)
+        aic[nombre] = k * math.log(max(error, 1e-6)) + 2 * (1 if nombre == "1" else 2)
+    minimo = min(aic.values())
+    pesos = {nombre: math.exp(-(valor - minimo) / 2) for nombre, valor in aic.items()}
+    mejor = min(aic, key=lambda nombre: (aic[nombre], list(modelos).index(nombre)))
+    a, c, _ = ajustes[mejor]
+    return AjusteComplejidad(mejor, a, c, pesos[mejor] / sum(pesos.values()),
+                             {nombre: error for nombre, (_, _, error) in ajustes.items()}, k)
+
+
+def ajustar_mediciones(mediciones):
+    """{algoritmo: (ajuste de tiempo, ajuste de memoria)} para {algoritmo: {n: Medicion}}."""
+    ajustes = {}
+    for algoritmo, por_n in mediciones.items():
+        tamanos = sorted(n for n, medicion in por_n.items() if medicion is not None)
+        ajustes[algoritmo] = (
+            ajustar_complejidad(tamanos, [por_n[n].mediana for n in tamanos]),
+            ajustar_complejidad(tamanos, [por_n[n].memoria_pico for n in tamanos]),
+        )
+    return ajustes
+
+
+# =============================================================================
+# LÍNEA BASE Y DETECCIÓN DE REGRESIONES
+# =============================================================================
+def linea_base(mediciones, ajustes):
+    """Resumen serializable a JSON de las mediciones y sus modelos, para comparar ejecuciones futuras."""
+    base = {}
+    for algoritmo, por_n in mediciones.items():
+        tiempo, memoria = ajustes.get(algoritmo, (None, None))
+        base[algoritmo] = {
+            "modelo_tiempo": tiempo.modelo if tiempo else None,
+            "modelo_memoria": memoria.modelo if memoria else None,
+            "puntos": {str(n): {"mediana_ns": medicion.mediana, "intervalo_ns": list(medicion.intervalo),
+                                "memoria_pico": medicion.memoria_pico}
+                       for n, medicion in sorted(por_n.items()) if medicion is not None},
+        }
+    return base
+
+
+def guardar_linea_base(ruta, mediciones, ajustes):
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        json.dump(linea_base(mediciones, ajustes), archivo, ensure_ascii=False, indent=2)
+
+
+def cargar_linea_base(ruta):
+    """Línea base guardada con guardar_linea_base, o None si el archivo no existe."""
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta, encoding="utf-8") as archivo:
+        return json.load(archivo)
+
+
+def detectar_regresiones(mediciones, ajustes, base, umbral_tiempo=UMBRAL_REGRESION_TIEMPO,
+                         umbral_memoria=UMBRAL_REGRESION_MEMORIA):
+    """[(algoritmo, n, descripción)] de lo que empeoró respecto a la línea base.
+
+    n es None cuando lo que empeora es el modelo de complejidad ajustado.
+    Solo se comparan los algoritmos y tamaños presentes en ambas.
+    """
+    orden = list(MODELOS)
+    regresiones = []
+    for algoritmo, por_n in mediciones.items():
+        anterior = base.get(algoritmo)
+        if anterior is None:
+            continue
+        for (ajuste, clave, que) in zip(ajustes.get(algoritmo, (None, None)),
+                                        ("modelo_tiempo", "modelo_memoria"), ("tiempo", "memoria")):
+            modelo_base = anterior.get(clave)
+            if (ajuste is not None and ajuste.confianza >= CONFIANZA_CAMBIO_MODELO and modelo_base in orden
+                    and orden.index(ajuste.modelo) > orden.index(modelo_base)):
+                regresiones.append((algoritmo, None, f"{que} pasa de O({modelo_base}) a {ajuste}"))
+
+        for n, medicion in sorted(por_n.items()):
+            punto = anterior["puntos"].get(str(n))
+            if medicion is None or punto is None:
+                continue
+            razon = medicion.mediana / punto["mediana_ns"]
+            if razon > 1 + umbral_tiempo and medicion.intervalo[0] > punto["intervalo_ns"][1]:
+                regresiones.append((algoritmo, n, f"tiempo {razon:.2f}× la línea base "
+                                                  f"({punto['mediana_ns'] / 1e6:.6f} → {medicion.mediana_ms:.6f} ms)"))
+            memoria_base = punto.get("memoria_pico")
+            if memoria_base and medicion.memoria_pico is not None and medicion.memoria_pico > memoria_base * (1 + umbral_memoria):
+                regresiones.append((algoritmo, n, f"memoria {medicion.memoria_pico / memoria_base:.2f}× la línea base "
+                                                  f"({memoria_base / 1024:.2f} → {medicion.memoria_kb:.2f} KB)"))
+    return regresiones
+
+
+def comparar_con_linea_base(ruta, mediciones, ajustes):
+    """Compara con la línea base de ruta; si no existe, guarda estas mediciones como línea base.
+
+    Devuelve (regresiones, hay_linea_base).
+    """
+    base = cargar_linea_base(ruta)
+    if base is None:
+        guardar_linea_base(ruta, mediciones, ajustes)
+        return [], False
+    return detectar_regresiones(mediciones, ajustes, base), True
@@ -0,0 +1,170 @@
+import math
+from itertools import islice
+
+import numpy as np
+
+from matriz_distancias import costos_rutas_sin_punto, tipo_puntos
+from optimizacion_paralela import optimizar_secuencias
+
+# Rutas por página al recorrer el catálogo y puntos que se muestran de cada secuencia
+TAMANO_PAGINA_CATALOGO = 20
+PUNTOS_VISIBLES_RUTA = 12
+
+
+class RutaAsignada:
+    """Ruta de un conductor.
+
+    num es el número de ruta del catálogo (None si la calculó el CVRP), seq
+    la secuencia de puntos y paquetes la carga del conductor. Con __slots__
+    cada registro ocupa un tamaño fijo, sin diccionario por instancia.
+    """
+
+    __slots__ = ("conductor", "num", "seq", "paquetes")
+
+    def __init__(self, conductor, num, seq, paquetes=None):
+        self.conductor = conductor
+        self.num = num
+        self.seq = seq
+        self.paquetes = paquetes
+
+    def __repr__(self):
+        return f"RutaAsignada(conductor={self.conductor}, num={self.num}, paquetes={self.paquetes})"
+
+
+# =============================================================================
+# CATÁLOGO DE RUTAS Y REPARTO DE PAQUETES (SIN ENTRADA INTERACTIVA)
+# =============================================================================
+def ruta_catalogo(num, n):
+    """Ruta num del catálogo (1..n): sale de 0 y visita todos los puntos salvo num - 1.
+
+    Se genera directamente como arreglo compacto (ver matriz_distancias.tipo_puntos).
+    """
+    ruta = np.zeros(n + 1, dtype=tipo_puntos(n))
+    ruta[1:num] = np.arange(num - 1)
+    ruta[num:n] = np.arange(num, n)
+    return ruta
+
+
+def texto_ruta_catalogo(num, n, visibles=PUNTOS_VISIBLES_RUTA):
+    """Secuencia de la ruta num como texto, abreviada a sus primeros y últimos puntos.
+
+    No construye la ruta: los puntos se generan sobre la marcha, así que el
+    costo es O(visibles) aunque la ruta tenga miles de puntos.
+    """
+    omitido = num - 1
+    puntos = (p for p in range(n) if p != omitido)
+    if n + 1 <= visibles:
+        return " → ".join(map(str, [0, *puntos, 0]))
+    ultimo = n - 1 if omitido != n - 1 else n - 2
+    inicio = [0, *islice(puntos, visibles - 3)]
+    return f"{' → '.join(map(str, inicio))} → … → {ultimo} → 0 ({n + 1} puntos, sin el {omitido})"
+
+
+class CatalogoRutas:
+    """Catálogo perezoso de las n rutas "0 → [0..n-1 sin num - 1] → 0".
+
+    No guarda las secuencias: cada ruta se genera al pedirla y su costo sale
+    de matriz_distancias.costos_rutas_sin_punto (O(n) para todo el
+    catálogo, O(1) por ruta), recalculado solo si la matriz cambió. Las
+    consultas reciben opcionalmente un subconjunto de números de ruta.
+    """
+
+    def __init__(self, matriz):
+        self.matriz = matriz
+        self._costos = None
+        self._version = None
+
+    def __len__(self):
+        return len(self.matriz)
+
+    def costos(self):
+        """Costo de todas las rutas (ndarray; la ruta num está en la posición num - 1)."""
+        if self._costos is None or self._version != self.matriz.version:
+            self._costos = np.asarray(costos_rutas_sin_punto(self.matriz), dtype=np.int64)
+            self._version = self.matriz.version
+        return self._costos
+
+    def _numeros(self, numeros):
+        return np.arange(1, len(self) + 1) if numeros is None else np.asarray(numeros, dtype=np.int64)
+
+    def costo(self, num):
+        return int(self.costos()[num - 1])
+
+    def ruta(self, num):
+        return ruta_catalogo(num, len(self))
+
+    def texto(self, num, visibles=PUNTOS_VISIBLES_RUTA):
+        return texto_ruta_catalogo(num, len(self), visibles)
+
+    def total(self, numeros=None):
+        return int(self.costos()[self._numeros(numeros) - 1].sum())
+
+    def pagina(self, pagina, tamano=TAMANO_PAGINA_CATALOGO, numeros=None):
+        """[(num, costo)] de la página indicada (desde 0), en orden de número de ruta."""
+        numeros = self._numeros(numeros)[pagina * tamano:(pagina + 1) * tamano]
+        return list(zip(numeros.tolist(), self.costos()[numeros - 1].tolist()))
+
+    def mas_baratas(self, k, numeros=None):
+        """[(num, costo)] de las k rutas más cortas, de menor a mayor costo (O(n + k log k))."""
+        numeros = self._numeros(numeros)
+        costos = self.costos()[numeros - 1]
+        if k < len(numeros):
+            elegidas = np.argpartition(costos, k)[:k]
+        else:
+            elegidas = np.arange(len(numeros))
+        elegidas = elegidas[np.argsort(costos[elegidas], kind="stable")]
+        return list(zip(numeros[elegidas].tolist(), costos[elegidas].tolist()))
+
+
+def reparto_paquetes(capacidad, total_paquetes):
+    """Paquetes de cada conductor: ceil(total/capacidad) conductores, todos llenos salvo el último."""
+    if capacidad <= 0:
+        raise ValueError("La capacidad debe ser positiva")
+    num_conductores = math.ceil(total_paquetes / capacidad)
+    return [min(capacidad, total_paquetes - c * capacidad) for c in range(num_conductores)]
+
+
+def demandas_uniformes(n, total_paquetes):
+    """Demanda de cada punto (0 en el depósito) repartiendo el total en partes iguales."""
+    base, resto = divmod(total_paquetes, max(n - 1, 1))
+    return [0] + [base + (1 if i < resto else 0) for i in range(n - 1)]
+
+
+def numeros_ruta(num_conductores, n, elegidos=None):
+    """Número de ruta de cada conductor con las reglas de la asignación manual.
+
+    Con más conductores que puntos las rutas se asignan de forma cíclica; si
+    no, cada conductor recibe una ruta distinta entre 1 y num_conductores
+    (elegidos, o en orden si no se indican).
+    """
+    if num_conductores > n:
+        return [(i % n) + 1 for i in range(num_conductores)]
+    if elegidos is None:
+        return list(range(1, num_conductores + 1))
+    if len(elegidos) != num_conductores:
+        raise ValueError(f"Se esperaban {num_conductores} números de ruta, uno por conductor")
+    if any(num < 1 or num > num_conductores for num in elegidos):
+        raise ValueError(f"El número de ruta debe estar entre 1 y {num_conductores}")
+    if len(set(elegidos)) != len(elegidos):
+        raise ValueError("Una ruta no puede asignarse a dos conductores")
+    return list(elegidos)
+
+
+def construir_asignacion(numeros, n, paquetes=None):
+    """Lista de RutaAsignada con la secuencia del catálogo de cada número de ruta."""
+    paquetes = paquetes or [None] * len(numeros)
+    return [RutaAsignada(c + 1, num, ruta_catalogo(num, n), p) for c, (num, p) in enumerate(zip(numeros, paquetes))]
+
+
+def optimizar_asignacion(asignacion, matriz, trabajadores=None):
+    """Ordena los puntos de cada ruta asignada con el motor adecuado a su tamaño.
+
+    Cada ruta distinta del catálogo se optimiza una sola vez (en paralelo,
+    ver optimizacion_paralela.optimizar_secuencias) y se escribe en la
+    asignación.
+    """
+    distintas = {ruta.num: ruta.seq for ruta in asignacion}
+    secuencias_optimizadas = optimizar_secuencias(distintas, matriz, trabajadores=trabajadores)
+    for ruta in asignacion:
+        ruta.seq = secuencias_optimizadas[ruta.num]
+    return asignacion
@@ -0,0 +1,122 @@
+import time
+from collections import OrderedDict
+
+# Consultas de ruta que se recuerdan y segundos que sigue vigente cada resultado
+CAPACIDAD_CACHE_RUTAS = 256
+TTL_CACHE_RUTAS = 600.0
+
+
+# =============================================================================
+# CACHÉ LRU DE CONSULTAS DE RUTA
+# =============================================================================
+class CacheRutas:
+    """Resultados de consultas de ruta con desalojo LRU y caducidad por tiempo.
+
+    La clave es (origen, destino, versión de la matriz): cualquier edición
+    hecha con MatrizDistancias.editar aumenta la versión, de modo que los
+    resultados anteriores dejan de coincidir y se descartan en la siguiente
+    consulta. Cambiar de matriz vacía la caché. Cada resultado recuerda el
+    tiempo límite con el que se calculó: solo se reutiliza para una consulta
+    con un tiempo límite igual o menor, salvo que sea exacto (brecha 0) o
+    heurístico (brecha None), que no dependen del tiempo. Cuenta aciertos,
+    fallos, desalojos (por capacidad) y caducados (por ttl o por edición).
+    """
+
+    def __init__(self, capacidad=CAPACIDAD_CACHE_RUTAS, ttl=TTL_CACHE_RUTAS, reloj=time.monotonic):
+        self.capacidad = capacidad
+        self.ttl = ttl
+        self._reloj = reloj
+        self._entradas = OrderedDict()  # clave → (resultado, instante en que se calculó, tiempo límite)
+        self._matriz = None
+        self._version = None
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self.caducados = 0
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def _sincronizar(self, matriz):
+        """Descarta las entradas de otra matriz o de versiones anteriores."""
+        if self._matriz is not matriz:
+            self.caducados += len(self._entradas)
+            self._entradas.clear()
+            self._matriz = matriz
+        elif self._version != matriz.version:
+            vigentes = OrderedDict((clave, entrada) for clave, entrada in self._entradas.items()
+                                   if clave[2] == matriz.version)
+            self.caducados += len(self._entradas) - len(vigentes)
+            self._entradas = vigentes
+        self._version = matriz.version
+
+    def buscar(self, origen, destino, matriz, tiempo_limite=None):
+        """Resultado en caché de (origen, destino) para la versión actual de matriz, o None.
+
+        Con tiempo_limite, un resultado no exacto calculado con menos tiempo
+        no sirve: cuenta como fallo y se reemplazará al guardar el nuevo.
+        """
+        self._sincronizar(matriz)
+        clave = (origen, destino, matriz.version)
+        entrada = self._entradas.get(clave)
+        if entrada is not None:
+            resultado, instante, calculado_con = entrada
+            if self._reloj() - instante > self.ttl:
+                del self._entradas[clave]
+                self.caducados += 1
+            elif _reutilizable(resultado, calculado_con, tiempo_limite):
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return resultado
+        self.fallos += 1
+        return None
+
+    def guardar(self, origen, destino, matriz, version, resultado, tiempo_limite=None):
+        """Guarda un resultado calculado sobre la versión indicada de matriz con tiempo_limite segundos.
+
+        Si la matriz se editó mientras se calculaba, el resultado ya no es
+        válido y no se guarda.
+        """
+        if self._matriz is not matriz or version != matriz.version:
+            return
+        self._entradas[(origen, destino, version)] = (resultado, self._reloj(), tiempo_limite)
+        self._entradas.move_to_end((origen, destino, version))
+        while len(self._entradas) > self.capacidad:
+            self._entradas.popitem(last=False)
+            self.desalojos += 1
+
+    def obtener(self, origen, destino, matriz, calcular, tiempo_limite=None):
+        """Resultado en caché de (origen, destino) o, si no está, calcular(origen, destino, matriz).
+
+        tiempo_limite es el que usa calcular (ver buscar).
+        """
+        resultado = self.buscar(origen, destino, matriz, tiempo_limite)
+        if resultado is None:
+            version = matriz.version
+            resultado = calcular(origen, destino, matriz)
+            self.guardar(origen, destino, matriz, version, resultado, tiempo_limite)
+        return resultado
+
+    def limpiar(self):
+        self._entradas.clear()
+        self._matriz = self._version = None
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            "entradas": len(self._entradas),
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "desalojos": self.desalojos,
+            "caducados": self.caducados,
+            "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+        }
+
+
+def _reutilizable(resultado, calculado_con, tiempo_limite):
+    """True si un resultado (ruta, distancia, brecha) calculado con calculado_con segundos sirve para tiempo_limite."""
+    if tiempo_limite is None or calculado_con is None or calculado_con >= tiempo_limite:
+        return True
+    # La brecha solo depende del tiempo en la ramificación y acotación
+    brecha = resultado[2]
+    return brecha is None or brecha == 0
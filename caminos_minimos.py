@@ -0,0 +1,194 @@
+import numpy as np
+
+# Distancia "infinita" entera: la suma de dos sigue sin desbordar int64
+SIN_CONEXION = np.iinfo(np.int64).max // 4
+
+
+# =============================================================================
+# CAMINOS MÍNIMOS ENTRE TODOS LOS PARES - FLOYD-WARSHALL VECTORIZADO
+# =============================================================================
+def _peso(valor):
+    """Peso de un tramo: 0 fuera de la diagonal significa "sin conexión"."""
+    return SIN_CONEXION if valor == 0 else valor
+
+
+def _matriz_pesos(matriz):
+    d = np.asarray(matriz)
+    pesos = np.where(d != 0, d.astype(np.int64), SIN_CONEXION)
+    np.fill_diagonal(pesos, 0)
+    return pesos
+
+
+def _dijkstra_denso(pesos, origenes):
+    """Filas de distancias y predecesores con Dijkstra sobre la matriz densa.
+
+    Todas las filas de origenes avanzan a la vez: n pasos en Python de
+    O(len(origenes) · n) cada uno.
+    """
+    n = len(pesos)
+    filas = np.arange(len(origenes))
+    distancias = np.full((len(origenes), n), SIN_CONEXION, dtype=np.int64)
+    previos = np.full((len(origenes), n), -1, dtype=np.int32)
+    cerrado = np.zeros((len(origenes), n), dtype=bool)
+    distancias[filas, origenes] = 0
+    for _ in range(n):
+        u = np.where(cerrado, SIN_CONEXION, distancias).argmin(axis=1)
+        actual = distancias[filas, u]
+        activas = (actual < SIN_CONEXION) & ~cerrado[filas, u]
+        if not activas.any():
+            break
+        cerrado[filas[activas], u[activas]] = True
+        candidatas = actual[:, None] + pesos[u]
+        mejora = (candidatas < distancias) & ~cerrado & activas[:, None]
+        np.copyto(distancias, candidatas, where=mejora)
+        np.copyto(previos, u[:, None].astype(np.int32), where=mejora)
+    return distancias, previos
+
+
+def floyd_warshall(matriz):
+    """Distancias mínimas entre todos los pares y matriz de predecesores.
+
+    Una distancia 0 fuera de la diagonal se interpreta como "sin conexión",
+    igual que en GrafoDisperso.desde_matriz. Cada iteración k es un único
+    mínimo con broadcasting sobre toda la matriz: O(n³) operaciones en total,
+    pero solo n pasos en Python. previos[i, j] es el punto anterior a j en el
+    camino mínimo desde i (-1 si no hay camino).
+    """
+    distancias = _matriz_pesos(matriz)
+    n = len(distancias)
+    previos = np.where(distancias < SIN_CONEXION, np.arange(n)[:, None], -1).astype(np.int32)
+    np.fill_diagonal(previos, -1)
+
+    # Con pesos no negativos la fila y la columna k no cambian en la iteración k,
+    # así que se puede actualizar en el mismo arreglo.
+    for k in range(n):
+        via_k = distancias[:, k, None] + distancias[None, k, :]
+        mejora = via_k < distancias
+        np.copyto(distancias, via_k, where=mejora)
+        np.copyto(previos, previos[None, k, :], where=mejora)
+    return distancias, previos
+
+
+def completar_matriz(matriz):
+    """Rellena los pares sin tramo directo con la distancia de su camino mínimo.
+
+    Tras importar una red de aristas a MatrizDistancias.vacia, los pares que
+    no aparecen quedan en 0: para caminos_minimos son "sin conexión", pero
+    los motores de rutas completas (resolver_ruta, resolver_cvrp) los
+    tomarían como tramos gratuitos. Con la clausura, ir de i a j cuesta lo
+    que cuesta recorrer la red. Devuelve el número de pares rellenados y
+    lanza ValueError, sin modificar la matriz, si la red no es conexa.
+    """
+    faltan = np.asarray(matriz) == 0
+    np.fill_diagonal(faltan, False)
+    if not faltan.any():
+        return 0
+    distancias, _ = floyd_warshall(matriz)
+    origenes, destinos = np.nonzero(faltan)
+    valores = distancias[origenes, destinos]
+    sin_camino = int(np.count_nonzero(valores == SIN_CONEXION))
+    if sin_camino:
+        raise ValueError(f"La red no es conexa: {sin_camino} pares de puntos no tienen ningún camino")
+    matriz.asignar_bloque(origenes, destinos, valores)
+    return len(valores)
+
+
+def caminos_desde(matriz, origenes):
+    """Caminos mínimos de uno a todos para varios orígenes a la vez.
+
+    Devuelve (distancias, previos) con una fila por origen, en el formato de
+    floyd_warshall. Es un único Dijkstra denso que avanza todos los orígenes
+    en paralelo, así que agrupar orígenes cuesta casi lo mismo que uno solo.
+    """
+    return _dijkstra_denso(_matriz_pesos(matriz), np.asarray(origenes, dtype=np.int64))
+
+
+def camino_desde_previos(previos, origen, destino):
+    """Secuencia de puntos de origen a destino con la fila de previos de origen, o None."""
+    if origen == destino:
+        return [origen]
+    if previos.item(destino) == -1:
+        return None
+    camino = [destino]
+    while camino[-1] != origen:
+        camino.append(previos.item(camino[-1]))
+    camino.reverse()
+    return camino
+
+
+class CaminosMinimos:
+    """Caché de floyd_warshall ligada a una versión concreta de la matriz.
+
+    Se recalcula solo cuando la matriz cambia (MatrizDistancias.version); las
+    consultas de distancia entre un par de puntos son O(1).
+    """
+
+    def __init__(self, matriz):
+        self.matriz = matriz
+        self.version = matriz.version
+        self.distancias, self.previos = floyd_warshall(matriz)
+
+    def reparar_arista(self, matriz, i, j, anteriores):
+        """Actualiza la caché tras MatrizDistancias.editar(i, j, ...) sin Floyd-Warshall.
+
+        - Si un tramo baja (o aparece), basta una relajación O(n²) de todos
+          los pares a través de él.
+        - Si un tramo sube (o desaparece), solo cambian las filas (orígenes)
+          con algún camino mínimo que lo usaba; esas filas se recalculan juntas
+          con Dijkstra denso, O(n²) por fila.
+        Las subidas se procesan primero: así las filas no afectadas ya son
+        exactas cuando se relajan las bajadas.
+
+        Solo es válido si la caché estaba al día justo antes de esa edición;
+        devuelve False (sin tocar nada) en caso contrario.
+        """
+        if self.matriz is not matriz or self.version != matriz.version - 1:
+            return False
+        D, P = self.distancias, self.previos
+        cambios = [(i, j, _peso(anteriores[0]), _peso(matriz[i, j])),
+                   (j, i, _peso(anteriores[1]), _peso(matriz[j, i]))]
+
+        afectadas = np.zeros(len(D), dtype=bool)
+        for u, v, anterior, nuevo in cambios:
+            if nuevo > anterior:
+                afectadas |= (D[:, u, None] + anterior + D[None, v, :] == D).any(axis=1)
+        if afectadas.sum() > len(D) // 2:
+            # Con tantas filas afectadas, Floyd-Warshall completo cuesta lo mismo
+            self.distancias, self.previos = floyd_warshall(matriz)
+            self.version = matriz.version
+            return True
+        if afectadas.any():
+            filas = np.flatnonzero(afectadas)
+            D[filas], P[filas] = _dijkstra_denso(_matriz_pesos(matriz), filas)
+
+        for u, v, anterior, nuevo in cambios:
+            if nuevo < anterior:
+                via = D[:, u, None] + nuevo + D[None, v, :]
+                mejora = via < D
+                previo_via = P[v].copy()
+                previo_via[v] = u
+                np.copyto(D, via, where=mejora)
+                np.copyto(P, previo_via[None, :], where=mejora)
+
+        self.version = matriz.version
+        return True
+
+    def vigente(self, matriz):
+        """True si la caché corresponde a esta matriz y a su versión actual."""
+        return self.matriz is matriz and self.version == matriz.version
+
+    def distancia(self, origen, destino):
+        """Distancia mínima entre dos puntos, o None si no están conectados."""
+        valor = self.distancias.item(origen, destino)
+        return None if valor >= SIN_CONEXION else valor
+
+    def camino(self, origen, destino):
+        """Secuencia de puntos del camino mínimo, o None si no están conectados."""
+        return camino_desde_previos(self.previos[origen], origen, destino)
+
+
+def caminos_vigentes(cache, matriz):
+    """Devuelve cache si sigue siendo válida para matriz; si no, recalcula."""
+    if cache is not None and cache.vigente(matriz):
+        return cache
+    return CaminosMinimos(matriz)
@@ -0,0 +1,320 @@
+"""Suite de rendimiento de las operaciones reales del sistema de rutas.
+
+Cada caso mide una operación que el despachador espera en producción
+(generar la matriz, la mejor ruta entre dos puntos, la asignación del
+catálogo, el costeo de las rutas de consultar_rutas, ...) para varios
+tamaños n y distribuciones de distancias. La preparación de los datos no
+se mide: solo la operación.
+
+Uso:
+    python casos_rendimiento.py --listar
+    python casos_rendimiento.py [CASO ...] [-n 100 500] [-d uniforme euclidea] [-p 4] [--en-proceso] [--registrar]
+
+Sin casos se ejecutan todos. Cada (caso, distribución, n) se mide en un
+proceso aislado (ver ejecucion_aislada) salvo con --en-proceso; con
+--registrar la ejecución queda en el historial (suite "casos").
+"""
+import argparse
+import math
+import sys
+
+import numpy as np
+
+from ajuste_complejidad import ajustar_mediciones
+from asignacion_rutas import (TAMANO_PAGINA_CATALOGO, CatalogoRutas, construir_asignacion, demandas_uniformes,
+                              numeros_ruta, optimizar_asignacion, reparto_paquetes)
+from Capa_codigo import encontrar_mejor_ruta
+from caminos_minimos import CaminosMinimos
+from ejecucion_aislada import ejecutar_celdas
+from historial_rendimiento import RUTA_HISTORIAL, registrar_ejecucion
+from matriz_distancias import MatrizDistancias, RutasCompactas, TotalesRutas, tipo_minimo
+from medicion_rendimiento import medir
+from motor_cvrp import resolver_cvrp
+from motor_rutas import LIMITE_HELD_KARP, TIEMPO_LIMITE_CONSULTA
+
+# Semilla de los datos de cada caso: mismas entradas en todas las ejecuciones
+SEMILLA_CASOS = 2025
+
+# Capacidad y paquetes por punto con los que se reparten las asignaciones
+# (los mismos que Capa_codigo.asignar_rutas_automatico)
+CAPACIDAD_CASOS = 3
+PAQUETES_POR_PUNTO = 0.5
+
+# Conductores de los casos que optimizan rutas completas del catálogo
+CONDUCTORES_OPTIMIZACION = 4
+
+# Lado del plano en el que se ubican los puntos de las distribuciones euclídeas
+LADO_PLANO = 1000
+
+
+# =============================================================================
+# DISTRIBUCIONES DE DISTANCIAS
+# =============================================================================
+def _matriz_euclidea(coordenadas):
+    """Distancias euclídeas redondeadas (mínimo 1 fuera de la diagonal), calculadas por bloques de filas."""
+    n = len(coordenadas)
+    datos = np.empty((n, n), dtype=tipo_minimo(0, math.ceil(LADO_PLANO * math.sqrt(2)) + 1))
+    bloque = max(1, 2_000_000 // max(n, 1))
+    for inicio in range(0, n, bloque):
+        filas = coordenadas[inicio:inicio + bloque, None, :] - coordenadas[None, :, :]
+        datos[inicio:inicio + bloque] = np.maximum(np.rint(np.hypot(filas[..., 0], filas[..., 1])), 1)
+    np.fill_diagonal(datos, 0)
+    return MatrizDistancias.desde_arreglo(datos, simetrica=True)
+
+
+def matriz_uniforme(n, semilla=SEMILLA_CASOS):
+    """Distancias independientes en [1, 20] (la matriz que genera el menú)."""
+    return MatrizDistancias.aleatoria(n, 1, 20, semilla)
+
+
+def matriz_euclidea(n, semilla=SEMILLA_CASOS):
+    """Puntos repartidos uniformemente en el plano; distancias simétricas que cumplen la desigualdad triangular."""
+    rng = np.random.default_rng(semilla)
+    return _matriz_euclidea(rng.uniform(0, LADO_PLANO, size=(n, 2)))
+
+
+def matriz_agrupada(n, semilla=SEMILLA_CASOS):
+    """Puntos en √n barrios: tramos cortos dentro de cada barrio y largos entre barrios."""
+    rng = np.random.default_rng(semilla)
+    centros = rng.uniform(0, LADO_PLANO, size=(max(1, math.isqrt(n)), 2))
+    puntos = centros[rng.integers(len(centros), size=n)] + rng.normal(0, LADO_PLANO / 50, size=(n, 2))
+    return _matriz_euclidea(np.clip(puntos, 0, LADO_PLANO))
+
+
+DISTRIBUCIONES = {
+    "uniforme": matriz_uniforme,
+    "euclidea": matriz_euclidea,
+    "agrupada": matriz_agrupada,
+}
+
+
+# =============================================================================
+# REGISTRO DE CASOS
+# =============================================================================
+class CasoRendimiento:
+    """Operación medida por la suite.
+
+    preparar(n, distribucion) construye los datos (sin medir) y devuelve
+    (funcion, args): lo que se mide es funcion(*args).
+    """
+
+    __slots__ = ("nombre", "preparar", "tamanos", "distribuciones", "descripcion")
+
+    def __init__(self, nombre, preparar, tamanos, distribuciones, descripcion):
+        self.nombre = nombre
+        self.preparar = preparar
+        self.tamanos = tuple(tamanos)
+        self.distribuciones = tuple(distribuciones)
+        self.descripcion = descripcion
+
+    def __repr__(self):
+        return f"CasoRendimiento({self.nombre!r}, tamanos={self.tamanos}, distribuciones={self.distribuciones})"
+
+
+CASOS = {}
+
+
+def registrar_caso(nombre, tamanos, distribuciones=tuple(DISTRIBUCIONES)):
+    """Decorador que registra preparar(n, distribucion) como el caso nombre de la suite."""
+    def decorador(preparar):
+        if nombre in CASOS:
+            raise ValueError(f"El caso '{nombre}' ya está registrado")
+        descripcion = (preparar.__doc__ or "").strip().split("\n")[0]
+        CASOS[nombre] = CasoRendimiento(nombre, preparar, tamanos, distribuciones, descripcion)
+        return preparar
+    return decorador
+
+
+def _asignacion_catalogo(n):
+    """Números de ruta y paquetes del reparto por catálogo de n // 2 paquetes."""
+    paquetes = reparto_paquetes(CAPACIDAD_CASOS, max(1, int(n * PAQUETES_POR_PUNTO)))
+    return numeros_ruta(len(paquetes), n), paquetes
+
+
+# =============================================================================
+# CASOS
+# =============================================================================
+@registrar_caso("generar_matriz", tamanos=(100, 500, 1000, 2000, 5000))
+def _generar_matriz(n, distribucion):
+    """Genera la matriz de distancias (opción 1 del menú sin archivo)."""
+    return DISTRIBUCIONES[distribucion], (n,)
+
+
+# Los tamaños de cada caso de mejor ruta caen dentro de un solo motor de
+# motor_rutas.resolver_ruta; el tramo de ramificación y acotación se omite
+# porque su tiempo lo fija TIEMPO_LIMITE_CONSULTA, no el algoritmo.
+@registrar_caso("mejor_ruta_exacta", tamanos=(8, 12, 16, 20, LIMITE_HELD_KARP + 2))
+def _mejor_ruta_exacta(n, distribucion):
+    """Mejor ruta de 0 a n - 1 por todos los puntos con Held-Karp (encontrar_mejor_ruta, sin caché)."""
+    return encontrar_mejor_ruta, (0, n - 1, DISTRIBUCIONES[distribucion](n), TIEMPO_LIMITE_CONSULTA)
+
+
+@registrar_caso("mejor_ruta_heuristica", tamanos=(100, 200, 500, 1000, 3000))
+def _mejor_ruta_heuristica(n, distribucion):
+    """Mejor ruta de 0 a n - 1 por todos los puntos con la heurística (encontrar_mejor_ruta, sin caché)."""
+    return encontrar_mejor_ruta, (0, n - 1, DISTRIBUCIONES[distribucion](n), TIEMPO_LIMITE_CONSULTA)
+
+
+@registrar_caso("asignacion_manual", tamanos=(100, 500, 1000, 2000, 5000))
+def _asignacion_manual(n, distribucion):
+    """Rutas del catálogo para cada conductor (asignar_rutas_manual sin la entrada interactiva)."""
+    numeros, paquetes = _asignacion_catalogo(n)
+    return construir_asignacion, (numeros, n, paquetes)
+
+
+def _construir_y_optimizar(numeros, n, matriz):
+    return optimizar_asignacion(construir_asignacion(numeros, n), matriz, trabajadores=1)
+
+
+@registrar_caso("optimizar_asignacion", tamanos=(100, 200, 500, 1000, 2000))
+def _optimizar_asignacion(n, distribucion):
+    """Ordena los puntos de las rutas asignadas (asignar_rutas_por_catalogo), con 4 conductores.
+
+    Las rutas del catálogo tienen n puntos: todos los tamaños caen en el
+    motor heurístico.
+    """
+    numeros = numeros_ruta(min(CONDUCTORES_OPTIMIZACION, n), n)
+    return _construir_y_optimizar, (numeros, n, DISTRIBUCIONES[distribucion](n))
+
+
+@registrar_caso("costeo_rutas", tamanos=(100, 500, 1000, 2000, 5000))
+def _costeo_rutas(n, distribucion):
+    """Distancia total de cada ruta asignada (opción 2 de consultar_rutas tras editar la matriz)."""
+    numeros, paquetes = _asignacion_catalogo(n)
+    rutas = RutasCompactas.desde_secuencias([ruta.seq for ruta in construir_asignacion(numeros, n, paquetes)], n)
+    return TotalesRutas, (DISTRIBUCIONES[distribucion](n), rutas)
+
+
+def _costear_no_asignadas(matriz, no_asignadas, k):
+    catalogo = CatalogoRutas(matriz)
+    return catalogo.total(no_asignadas), catalogo.mas_baratas(k, no_asignadas)
+
+
+@registrar_caso("catalogo_no_asignadas", tamanos=(100, 1000, 2000, 5000, 10000))
+def _catalogo_no_asignadas(n, distribucion):
+    """Total y rutas más cortas del catálogo no asignado (opción 2 de consultar_rutas)."""
+    numeros, _ = _asignacion_catalogo(n)
+    no_asignadas = np.setdiff1d(np.arange(1, n + 1), numeros)
+    return _costear_no_asignadas, (DISTRIBUCIONES[distribucion](n), no_asignadas, TAMANO_PAGINA_CATALOGO)
+
+
+@registrar_caso("caminos_minimos", tamanos=(50, 100, 200, 500, 1000))
+def _caminos_minimos(n, distribucion):
+    """Caminos mínimos entre todos los pares (opción 3 de consultar_rutas, Floyd-Warshall)."""
+    return CaminosMinimos, (DISTRIBUCIONES[distribucion](n),)
+
+
+@registrar_caso("cvrp", tamanos=(50, 200, 500, 1000, 2000))
+def _cvrp(n, distribucion):
+    """Rutas según la demanda de cada punto (asignar_rutas en modo CVRP)."""
+    demandas = demandas_uniformes(n, max(1, int(n * PAQUETES_POR_PUNTO)))
+    return resolver_cvrp, (DISTRIBUCIONES[distribucion](n), demandas, max(CAPACIDAD_CASOS, max(demandas)))
+
+
+# =============================================================================
+# EJECUCIÓN DE LA SUITE
+# =============================================================================
+def seleccionar_casos(nombres=None):
+    """Casos registrados con esos nombres (todos si nombres está vacío); ValueError si alguno no existe."""
+    if not nombres:
+        return list(CASOS.values())
+    desconocidos = [nombre for nombre in nombres if nombre not in CASOS]
+    if desconocidos:
+        raise ValueError(f"Casos desconocidos: {', '.join(desconocidos)} (disponibles: {', '.join(CASOS)})")
+    return [CASOS[nombre] for nombre in nombres]
+
+
+def medir_caso(nombre, n, distribucion, **opciones):
+    """Prepara el caso para (n, distribucion) y mide su operación con medicion_rendimiento.medir."""
+    funcion, args = CASOS[nombre].preparar(n, distribucion)
+    return medir(funcion, *args, **opciones)
+
+
+def celdas_suite(casos, tamanos=None, distribuciones=None):
+    """[(clave, nombre, (n, distribucion))] de los casos; clave es (nombre, distribucion, n)."""
+    celdas = []
+    for caso in casos:
+        for distribucion in distribuciones or caso.distribuciones:
+            if distribucion not in DISTRIBUCIONES:
+                raise ValueError(f"Distribución desconocida: {distribucion} (disponibles: {', '.join(DISTRIBUCIONES)})")
+            for n in sorted(tamanos or caso.tamanos, reverse=True):
+                celdas.append(((caso.nombre, distribucion, n), caso.nombre, (n, distribucion)))
+    return celdas
+
+
+def ejecutar_suite(nombres=None, tamanos=None, distribuciones=None, aislado=True, procesos=None, progreso=None):
+    """Mide los casos indicados y devuelve {(nombre, distribucion, n): (medicion, error)}.
+
+    Con aislado cada celda se mide en su propio proceso (ver
+    ejecucion_aislada.ejecutar_celdas); si no, una tras otra en este proceso.
+    """
+    celdas = celdas_suite(seleccionar_casos(nombres), tamanos, distribuciones)
+    if aislado:
+        return ejecutar_celdas(celdas, procesos, progreso=progreso, medidor=medir_caso)
+    resultados = {}
+    for clave, nombre, args in celdas:
+        try:
+            resultado = (medir_caso(nombre, *args), None)
+        except MemoryError:
+            resultado = (None, "memoria insuficiente")
+        except Exception as error:
+            resultado = (None, f"{type(error).__name__}: {error}")
+        resultados[clave] = resultado
+        if progreso is not None:
+            progreso(clave, *resultado)
+    return resultados
+
+
+def por_algoritmo(resultados):
+    """{"caso/distribución": {n: Medicion o None}}, el formato de ajuste_complejidad e historial_rendimiento."""
+    agrupadas = {}
+    for (nombre, distribucion, n), (medicion, _) in sorted(resultados.items()):
+        agrupadas.setdefault(f"{nombre}/{distribucion}", {})[n] = medicion
+    return agrupadas
+
+
+def principal(argumentos=None):
+    parser = argparse.ArgumentParser(description="Mide las operaciones reales del sistema de rutas.")
+    parser.add_argument("casos", nargs="*", help="casos a ejecutar (por defecto todos)")
+    parser.add_argument("--listar", action="store_true", help="muestra los casos registrados y termina")
+    parser.add_argument("-n", "--tamanos", nargs="+", type=int, help="tamaños n (por defecto los de cada caso)")
+    parser.add_argument("-d", "--distribuciones", nargs="+", choices=list(DISTRIBUCIONES),
+                        help="distribuciones de distancias (por defecto todas)")
+    parser.add_argument("-p", "--procesos", type=int, default=None,
+                        help="celdas en paralelo (por defecto una por núcleo)")
+    parser.add_argument("--en-proceso", action="store_true", help="mide en este proceso, sin aislar cada celda")
+    parser.add_argument("--registrar", action="store_true",
+                        help=f"guarda la ejecución en el historial ({RUTA_HISTORIAL}, suite \"casos\")")
+    args = parser.parse_args(argumentos)
+
+    if args.listar:
+        for caso in CASOS.values():
+            print(f"{caso.nombre:<24} {caso.descripcion}")
+            print(f"{'':<24} n = {', '.join(map(str, caso.tamanos))} | {', '.join(caso.distribuciones)}")
+        return 0
+    try:
+        seleccionar_casos(args.casos)
+    except ValueError as error:
+        parser.error(str(error))
+
+    def progreso(clave, medicion, error):
+        nombre, distribucion, n = clave
+        estado = medicion.resumen() if medicion is not None else f"sin medir: {error}"
+        print(f"  {nombre:<22} {distribucion:<9} n = {n:<6} → {estado}", flush=True)
+
+    resultados = ejecutar_suite(args.casos, args.tamanos, args.distribuciones, not args.en_proceso,
+                                args.procesos, progreso)
+    agrupadas = por_algoritmo(resultados)
+    print("\nCOMPLEJIDAD AJUSTADA")
+    for algoritmo, (tiempo, memoria) in ajustar_mediciones(agrupadas).items():
+        print(f"  {algoritmo:<34} Tiempo: {str(tiempo or 'N/A'):<28} Memoria: {memoria or 'N/A'}")
+    if args.registrar:
+        errores = {(f"{nombre}/{distribucion}", n): error
+                   for (nombre, distribucion, n), (_, error) in resultados.items() if error is not None}
+        ejecucion = registrar_ejecucion("casos", agrupadas, errores)
+        print(f"\nEjecución #{ejecucion} registrada en '{RUTA_HISTORIAL}'")
+    return 1 if any(error is not None for _, error in resultados.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(principal())
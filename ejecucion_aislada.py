@@ -0,0 +1,139 @@
+import multiprocessing
+import os
+import time
+from multiprocessing.connection import wait
+
+from medicion_rendimiento import medir
+
+try:
+    import resource
+except ImportError:  # Windows: sin límite de memoria por celda
+    resource = None
+
+# Segundos que puede tardar una celda (calentamiento, muestras y pasada de
+# memoria) antes de terminar su proceso y darla por no medida.
+TIEMPO_LIMITE_CELDA = 300.0
+
+
+# =============================================================================
+# NÚCLEOS Y MEMORIA DISPONIBLES
+# =============================================================================
+def nucleos_disponibles():
+    """Núcleos en los que puede ejecutarse este proceso (ordenados)."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def memoria_fisica():
+    """Bytes de memoria física del equipo, o None si no se puede consultar."""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+# =============================================================================
+# PROCESO DE UNA CELDA
+# =============================================================================
+def _contexto():
+    """forkserver donde existe (procesos limpios sin reimportar todo cada vez); spawn en otro caso."""
+    metodo = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(metodo)
+
+
+def _ejecutar_celda(conexion, nucleo, memoria_maxima, medidor, funcion, args, opciones):
+    """Cuerpo del proceso trabajador: se fija a su núcleo, limita su memoria y mide una celda."""
+    try:
+        if nucleo is not None and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, {nucleo})
+        if memoria_maxima is not None and resource is not None:
+            resource.setrlimit(resource.RLIMIT_AS, (memoria_maxima, memoria_maxima))
+        medicion = medidor(funcion, *args, **opciones)
+        medicion.resultado = None  # solo interesa la medición, no el resultado
+        respuesta = (medicion, None)
+    except MemoryError:
+        respuesta = (None, "memoria insuficiente")
+    except Exception as error:
+        respuesta = (None, f"{type(error).__name__}: {error}")
+    # Se responde fuera del except: la traza ya no retiene los datos de la
+    # función y hay memoria para serializar la respuesta.
+    try:
+        conexion.send(respuesta)
+    finally:
+        conexion.close()
+
+
+# =============================================================================
+# EJECUCIÓN DE LAS CELDAS
+# =============================================================================
+def ejecutar_celdas(celdas, procesos=None, tiempo_limite=TIEMPO_LIMITE_CELDA, memoria_maxima=None,
+                    progreso=None, medidor=medir, **opciones):
+    """Mide cada celda (clave, funcion, args) en su propio proceso y devuelve {clave: (medicion, error)}.
+
+    - Aislamiento: un proceso nuevo por celda, de modo que ninguna medición
+      hereda el montículo, las cachés ni la fragmentación de las anteriores.
+    - Paralelismo: hasta procesos celdas a la vez (por defecto una por
+      núcleo disponible), cada una fijada a un núcleo distinto con
+      os.sched_setaffinity donde existe.
+    - Límites: la celda que supera tiempo_limite segundos se termina, y su
+      espacio de direcciones se limita a memoria_maxima bytes (por defecto
+      la memoria física repartida entre los procesos) para que un tamaño
+      desmedido falle solo en lugar de agotar la memoria del equipo.
+    medicion es la Medicion de la celda o None; error explica por qué no se
+    midió. Cada celda se mide con medidor(funcion, *args, **opciones)
+    (medicion_rendimiento.medir, o una función de módulo que prepare sus
+    datos dentro del proceso, como casos_rendimiento.medir_caso) y
+    progreso(clave, medicion, error) se llama al terminar cada celda.
+    """
+    nucleos = nucleos_disponibles()
+    procesos = max(1, min(procesos or len(nucleos), len(nucleos)))
+    if memoria_maxima is None and memoria_fisica() is not None:
+        memoria_maxima = memoria_fisica() // procesos
+    contexto = _contexto()
+    pendientes = list(celdas)[::-1]  # se sacan del final: orden de entrada
+    libres = nucleos[:procesos]
+    en_curso = {}  # conexión → (clave, proceso, núcleo, instante límite)
+    resultados = {}
+    reloj = time.monotonic
+
+    def terminar(conexion, medicion, error):
+        clave, proceso, nucleo, _ = en_curso.pop(conexion)
+        if proceso.is_alive():
+            proceso.terminate()
+        proceso.join()
+        conexion.close()
+        libres.append(nucleo)
+        resultados[clave] = (medicion, error)
+        if progreso is not None:
+            progreso(clave, medicion, error)
+
+    try:
+        while pendientes or en_curso:
+            while pendientes and libres:
+                clave, funcion, args = pendientes.pop()
+                nucleo = libres.pop(0)
+                lectura, escritura = contexto.Pipe(duplex=False)
+                proceso = contexto.Process(target=_ejecutar_celda, daemon=True,
+                                           args=(escritura, nucleo, memoria_maxima, medidor, funcion, args, opciones))
+                proceso.start()
+                escritura.close()
+                en_curso[lectura] = (clave, proceso, nucleo, reloj() + tiempo_limite)
+
+            espera = max(0.0, min(limite for *_, limite in en_curso.values()) - reloj())
+            for conexion in wait(list(en_curso), timeout=espera):
+                try:
+                    medicion, error = conexion.recv()
+                except EOFError:  # el proceso murió sin responder
+                    proceso = en_curso[conexion][1]
+                    proceso.join(1)
+                    medicion, error = None, f"el proceso terminó sin resultado (código {proceso.exitcode})"
+                terminar(conexion, medicion, error)
+            ahora = reloj()
+            for conexion in [c for c, (*_, limite) in en_curso.items() if limite <= ahora]:
+                terminar(conexion, None, f"tiempo límite ({tiempo_limite:g} s)")
+    finally:
+        for conexion in list(en_curso):
+            terminar(conexion, None, "interrumpida")
+    return resultados
+
@@ -0,0 +1,187 @@
+import heapq
+import math
+import time
+
+import numpy as np
+
+from matriz_distancias import TAMANO_BLOQUE_IMPORTACION, leer_aristas
+
+
+# =============================================================================
+# GRAFO DISPERSO EN FORMATO CSR
+# =============================================================================
+class GrafoDisperso:
+    """Lista de adyacencia comprimida por filas (CSR) de una red de carreteras.
+
+    Las aristas que salen de u están en indices[indptr[u]:indptr[u + 1]] con
+    sus pesos en la misma posición de pesos. Opcionalmente guarda las
+    coordenadas (x, y) de cada punto para la heurística de A*.
+    """
+
+    def __init__(self, indptr, indices, pesos, coordenadas=None):
+        self.indptr = indptr
+        self.indices = indices
+        self.pesos = pesos
+        self.coordenadas = coordenadas
+        self._listas = None
+        self._coordenadas_listas = None
+
+    @classmethod
+    def desde_aristas(cls, n, origenes, destinos, pesos, simetrico=False, coordenadas=None):
+        """Construye el grafo a partir de arreglos paralelos de aristas (origen, destino, peso)."""
+        origenes = np.asarray(origenes, dtype=np.int64)
+        destinos = np.asarray(destinos, dtype=np.int64)
+        pesos = np.asarray(pesos)
+        if simetrico:
+            origenes, destinos = np.concatenate((origenes, destinos)), np.concatenate((destinos, origenes))
+            pesos = np.concatenate((pesos, pesos))
+        if len(origenes) and (origenes.min() < 0 or origenes.max() >= n
+                              or destinos.min() < 0 or destinos.max() >= n):
+            raise ValueError("Hay aristas con puntos fuera del rango 0..n-1")
+        if len(pesos) and pesos.min() < 0:
+            raise ValueError("Dijkstra y A* requieren distancias no negativas")
+
+        orden = np.argsort(origenes, kind="stable")
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(origenes, minlength=n), out=indptr[1:])
+        if coordenadas is not None:
+            coordenadas = np.asarray(coordenadas, dtype=np.float64)
+        return cls(indptr, destinos[orden], pesos[orden], coordenadas)
+
+    @classmethod
+    def desde_matriz(cls, matriz, coordenadas=None):
+        """Grafo de la matriz densa; una distancia 0 fuera de la diagonal significa "sin conexión"."""
+        d = np.asarray(matriz)
+        origenes, destinos = np.nonzero(d)
+        return cls.desde_aristas(len(d), origenes, destinos, d[origenes, destinos], coordenadas=coordenadas)
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    @property
+    def num_aristas(self):
+        return len(self.indices)
+
+    def _como_listas(self):
+        """Copias en listas de Python: el bucle de Dijkstra las recorre mucho más rápido que un ndarray."""
+        if self._listas is None:
+            self._listas = (self.indptr.tolist(), self.indices.tolist(), self.pesos.tolist())
+        return self._listas
+
+    # -------------------------------------------------------------------------
+    # CONSULTAS DE CAMINO MÍNIMO
+    # -------------------------------------------------------------------------
+    def dijkstra(self, origen, destino=None):
+        """Dijkstra con montículo binario desde origen.
+
+        Si se indica destino la búsqueda se detiene al extraerlo del montículo.
+        Devuelve (distancias, previos): listas de n elementos con inf / -1
+        para los puntos no alcanzados.
+        """
+        indptr, indices, pesos = self._como_listas()
+        distancias = [math.inf] * len(self)
+        previos = [-1] * len(self)
+        distancias[origen] = 0
+        monticulo = [(0, origen)]
+        while monticulo:
+            d, u = heapq.heappop(monticulo)
+            if d > distancias[u]:
+                continue
+            if u == destino:
+                break
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                nueva = d + pesos[k]
+                if nueva < distancias[v]:
+                    distancias[v] = nueva
+                    previos[v] = u
+                    heapq.heappush(monticulo, (nueva, v))
+        return distancias, previos
+
+    def a_estrella(self, origen, destino, escala=1.0):
+        """A* con la distancia euclídea entre coordenadas como heurística.
+
+        escala convierte unidades de coordenadas a km; la heurística es
+        admisible (y el camino óptimo) mientras ningún tramo sea más corto que
+        escala por la distancia en línea recta entre sus extremos.
+        Devuelve (distancias, previos) como dijkstra.
+        """
+        if self.coordenadas is None:
+            raise ValueError("A* necesita las coordenadas de los puntos")
+        indptr, indices, pesos = self._como_listas()
+        if self._coordenadas_listas is None:
+            self._coordenadas_listas = (self.coordenadas[:, 0].tolist(), self.coordenadas[:, 1].tolist())
+        xs, ys = self._coordenadas_listas
+        xd, yd = xs[destino], ys[destino]
+
+        distancias = [math.inf] * len(self)
+        previos = [-1] * len(self)
+        distancias[origen] = 0
+        monticulo = [(escala * math.hypot(xs[origen] - xd, ys[origen] - yd), 0, origen)]
+        while monticulo:
+            _, d, u = heapq.heappop(monticulo)
+            if d > distancias[u]:
+                continue
+            if u == destino:
+                break
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                nueva = d + pesos[k]
+                if nueva < distancias[v]:
+                    distancias[v] = nueva
+                    previos[v] = u
+                    estimada = nueva + escala * math.hypot(xs[v] - xd, ys[v] - yd)
+                    heapq.heappush(monticulo, (estimada, nueva, v))
+        return distancias, previos
+
+    def camino_mas_corto(self, origen, destino, escala=1.0):
+        """Camino mínimo punto a punto: A* si hay coordenadas, Dijkstra si no.
+
+        Devuelve (ruta, distancia) o (None, inf) si destino no es alcanzable.
+        """
+        if self.coordenadas is not None:
+            distancias, previos = self.a_estrella(origen, destino, escala)
+        else:
+            distancias, previos = self.dijkstra(origen, destino)
+        return reconstruir_camino(previos, origen, destino), distancias[destino]
+
+
+def importar_red(ruta_archivo, n, simetrica=False, coordenadas=None, separador=",",
+                 tamano_bloque=TAMANO_BLOQUE_IMPORTACION, progreso=None):
+    """GrafoDisperso leído directamente de un CSV "origen,destino,km", sin pasar por una matriz n x n.
+
+    Las aristas se leen y validan por bloques con
+    matriz_distancias.leer_aristas, así que una red de cientos de miles de
+    puntos ocupa memoria proporcional a sus aristas. coordenadas (arreglo
+    n x 2, ver matriz_distancias.leer_coordenadas) activa A*. progreso se
+    llama tras cada bloque con (filas_leidas, segundos).
+    Devuelve (grafo, filas_importadas, filas_descartadas, segundos).
+    """
+    inicio = time.perf_counter()
+    bloques = []
+    importadas = descartadas = 0
+    for origenes, destinos, valores, descartadas_bloque in leer_aristas(ruta_archivo, n, separador, tamano_bloque):
+        bloques.append((origenes, destinos, valores))
+        importadas += len(valores)
+        descartadas += descartadas_bloque
+        if progreso is not None:
+            progreso(importadas + descartadas, time.perf_counter() - inicio)
+    if bloques:
+        origenes, destinos, valores = (np.concatenate(partes) for partes in zip(*bloques))
+    else:
+        origenes = destinos = valores = np.zeros(0, dtype=np.int64)
+    grafo = GrafoDisperso.desde_aristas(n, origenes, destinos, valores, simetrica, coordenadas)
+    return grafo, importadas, descartadas, time.perf_counter() - inicio
+
+
+def reconstruir_camino(previos, origen, destino):
+    """Recorre la lista de previos desde destino hasta origen."""
+    if origen == destino:
+        return [origen]
+    if previos[destino] == -1:
+        return None
+    camino = [destino]
+    while camino[-1] != origen:
+        camino.append(previos[camino[-1]])
+    camino.reverse()
+    return camino
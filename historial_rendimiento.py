@@ -0,0 +1,294 @@
+"""Historial persistente de los análisis empíricos y comparación entre ejecuciones.
+
+Cada análisis empírico (Capa_codigo, lab7) registra su ejecución en un
+archivo SQLite con sus metadatos (commit de git, versión de Python, CPU) y
+las muestras crudas de cada (algoritmo, n). Desde la línea de comandos:
+
+    python historial_rendimiento.py listar [--suite lab7]
+    python historial_rendimiento.py comparar [BASE NUEVA] [--suite lab7] [--alfa 0.05] [--cambio-minimo 0.05]
+
+comparar sin ejecuciones compara las dos últimas (de la suite indicada).
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from medicion_rendimiento import CONFIANZA_MEDICION, Medicion
+
+# Archivo del historial, relativo al directorio de trabajo como los HTML generados
+RUTA_HISTORIAL = "historial_rendimiento.sqlite"
+
+# Nivel de significación de la prueba de Mann-Whitney al comparar ejecuciones y
+# cambio relativo mínimo de la mediana para considerarlo (con muchas muestras
+# la prueba detecta diferencias del 1 % que no importan en la práctica).
+ALFA_COMPARACION = 0.05
+CAMBIO_MINIMO = 0.05
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS ejecuciones (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fecha TEXT NOT NULL,
+    suite TEXT NOT NULL,
+    git_commit TEXT,
+    python TEXT,
+    plataforma TEXT,
+    cpu TEXT,
+    nucleos INTEGER,
+    tamanos TEXT
+);
+CREATE TABLE IF NOT EXISTS mediciones (
+    ejecucion INTEGER NOT NULL REFERENCES ejecuciones(id),
+    algoritmo TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    mediana_ns REAL,
+    q1_ns REAL,
+    q3_ns REAL,
+    memoria_pico INTEGER,
+    llamadas_por_muestra INTEGER,
+    confianza REAL,
+    muestras TEXT,
+    error TEXT,
+    PRIMARY KEY (ejecucion, algoritmo, n)
+);
+"""
+
+
+# =============================================================================
+# METADATOS DE LA EJECUCIÓN
+# =============================================================================
+def commit_actual():
+    """Commit de git del código medido (con "+cambios" si hay cambios sin confirmar), o None."""
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=directorio, capture_output=True,
+                                text=True, timeout=10, check=True).stdout.strip()
+        cambios = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=directorio,
+                                 capture_output=True, text=True, timeout=10, check=True).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return commit + ("+cambios" if cambios else "")
+
+
+def nombre_cpu():
+    """Modelo de la CPU (de /proc/cpuinfo en Linux; platform.processor() en otro caso)."""
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as archivo:
+            for linea in archivo:
+                if linea.startswith("model name"):
+                    return linea.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def metadatos():
+    return {
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": commit_actual(),
+        "python": f"{platform.python_implementation()} {platform.python_version()}",
+        "plataforma": platform.platform(),
+        "cpu": nombre_cpu(),
+        "nucleos": os.cpu_count(),
+    }
+
+
+# =============================================================================
+# REGISTRO Y LECTURA
+# =============================================================================
+def abrir_historial(ruta=RUTA_HISTORIAL):
+    conexion = sqlite3.connect(ruta)
+    conexion.row_factory = sqlite3.Row
+    conexion.executescript(_ESQUEMA)
+    return conexion
+
+
+def registrar_ejecucion(suite, mediciones, errores=None, ruta=RUTA_HISTORIAL):
+    """Guarda una ejecución {algoritmo: {n: Medicion o None}} y devuelve su id.
+
+    errores es {(algoritmo, n): motivo} de las celdas que no se midieron.
+    """
+    errores = errores or {}
+    datos = metadatos()
+    tamanos = sorted({n for por_n in mediciones.values() for n in por_n})
+    conexion = abrir_historial(ruta)
+    try:
+        with conexion:
+            cursor = conexion.execute(
+                "INSERT INTO ejecuciones (fecha, suite, git_commit, python, plataforma, cpu, nucleos, tamanos) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (datos["fecha"], suite, datos["git_commit"], datos["python"], datos["plataforma"], datos["cpu"],
+                 datos["nucleos"], json.dumps(tamanos)))
+            ejecucion = cursor.lastrowid
+            filas = []
+            for algoritmo, por_n in mediciones.items():
+                for n, m in sorted(por_n.items()):
+                    if m is None:
+                        filas.append((ejecucion, algoritmo, n, None, None, None, None, None, None, None,
+                                      errores.get((algoritmo, n), "sin medir")))
+                    else:
+                        filas.append((ejecucion, algoritmo, n, m.mediana, m.q1, m.q3, m.memoria_pico,
+                                      m.llamadas_por_muestra, m.confianza, json.dumps(m.muestras), None))
+            conexion.executemany("INSERT INTO mediciones VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", filas)
+    finally:
+        conexion.close()
+    return ejecucion
+
+
+def listar_ejecuciones(suite=None, ruta=RUTA_HISTORIAL):
+    """Filas de las ejecuciones registradas (de la suite indicada), de la más antigua a la más reciente."""
+    conexion = abrir_historial(ruta)
+    try:
+        if suite is None:
+            return [dict(fila) for fila in conexion.execute("SELECT * FROM ejecuciones ORDER BY id")]
+        return [dict(fila) for fila in conexion.execute("SELECT * FROM ejecuciones WHERE suite = ? ORDER BY id",
+                                                        (suite,))]
+    finally:
+        conexion.close()
+
+
+def cargar_ejecucion(ejecucion, ruta=RUTA_HISTORIAL):
+    """(metadatos, {algoritmo: {n: Medicion}}) de una ejecución, reconstruidas desde sus muestras."""
+    conexion = abrir_historial(ruta)
+    try:
+        fila = conexion.execute("SELECT * FROM ejecuciones WHERE id = ?", (ejecucion,)).fetchone()
+        if fila is None:
+            raise ValueError(f"No existe la ejecución {ejecucion}")
+        mediciones = {}
+        for m in conexion.execute("SELECT * FROM mediciones WHERE ejecucion = ? AND muestras IS NOT NULL",
+                                  (ejecucion,)):
+            mediciones.setdefault(m["algoritmo"], {})[m["n"]] = Medicion(
+                json.loads(m["muestras"]), m["llamadas_por_muestra"], m["confianza"] or CONFIANZA_MEDICION,
+                m["memoria_pico"])
+        return dict(fila), mediciones
+    finally:
+        conexion.close()
+
+
+# =============================================================================
+# COMPARACIÓN ENTRE EJECUCIONES
+# =============================================================================
+def mann_whitney(a, b):
+    """p-valor bilateral de la prueba U de Mann-Whitney (aproximación normal con corrección por empates).
+
+    No supone normalidad, lo adecuado para tiempos con colas largas.
+    """
+    n1, n2 = len(a), len(b)
+    combinadas = sorted([(v, 0) for v in a] + [(v, 1) for v in b])
+    total = n1 + n2
+    suma_rangos_a = 0.0
+    empates = 0.0
+    i = 0
+    while i < total:
+        j = i
+        while j + 1 < total and combinadas[j + 1][0] == combinadas[i][0]:
+            j += 1
+        rango = (i + j) / 2 + 1
+        suma_rangos_a += rango * sum(1 for k in range(i, j + 1) if combinadas[k][1] == 0)
+        t = j - i + 1
+        empates += t ** 3 - t
+        i = j + 1
+    u = suma_rangos_a - n1 * (n1 + 1) / 2
+    varianza = n1 * n2 / 12 * ((total + 1) - empates / (total * (total - 1)))
+    if varianza <= 0:
+        return 1.0
+    z = (abs(u - n1 * n2 / 2) - 0.5) / math.sqrt(varianza)
+    return min(1.0, 2 * (1 - statistics.NormalDist().cdf(max(z, 0.0))))
+
+
+def comparar_ejecuciones(base, nueva, ruta=RUTA_HISTORIAL, alfa=ALFA_COMPARACION, cambio_minimo=CAMBIO_MINIMO):
+    """[(algoritmo, n, mediana base ns, mediana nueva ns, cambio relativo, p-valor, veredicto)].
+
+    Solo se comparan las celdas medidas en ambas ejecuciones. El veredicto
+    es "más lento" o "más rápido" si la diferencia es significativa al nivel
+    alfa y la mediana cambia al menos cambio_minimo, y "sin cambio" en otro caso.
+    """
+    _, anteriores = cargar_ejecucion(base, ruta)
+    _, actuales = cargar_ejecucion(nueva, ruta)
+    filas = []
+    for algoritmo in sorted(anteriores.keys() & actuales.keys()):
+        for n in sorted(anteriores[algoritmo].keys() & actuales[algoritmo].keys()):
+            antes, despues = anteriores[algoritmo][n], actuales[algoritmo][n]
+            cambio = despues.mediana / antes.mediana - 1
+            p = mann_whitney(antes.muestras, despues.muestras)
+            if p >= alfa or abs(cambio) < cambio_minimo:
+                veredicto = "sin cambio"
+            else:
+                veredicto = "más lento" if cambio > 0 else "más rápido"
+            filas.append((algoritmo, n, antes.mediana, despues.mediana, cambio, p, veredicto))
+    return filas
+
+
+# =============================================================================
+# LÍNEA DE COMANDOS
+# =============================================================================
+def _imprimir_ejecuciones(ejecuciones):
+    print(f"{'Id':>4}  {'Fecha (UTC)':<25} {'Suite':<8} {'Commit':<14} {'Python':<16} {'Núcleos':>7}  CPU")
+    for e in ejecuciones:
+        commit = (e["git_commit"] or "?")[:12] + ("+" if (e["git_commit"] or "").endswith("+cambios") else "")
+        print(f"{e['id']:>4}  {e['fecha']:<25} {e['suite']:<8} {commit:<14} {e['python'] or '?':<16} "
+              f"{e['nucleos'] or '?':>7}  {e['cpu'] or '?'}")
+
+
+def _imprimir_comparacion(base, nueva, filas, alfa):
+    print(f"\nEjecución {base} → {nueva} (Mann-Whitney, α = {alfa:g})")
+    print(f"{'Algoritmo':<26} {'n':>7} {'Base (ms)':>14} {'Nueva (ms)':>14} {'Cambio':>9} {'p':>8}  Veredicto")
+    print("-" * 100)
+    for algoritmo, n, antes, despues, cambio, p, veredicto in filas:
+        print(f"{algoritmo:<26} {n:>7} {antes / 1e6:>14.6f} {despues / 1e6:>14.6f} {cambio:>+9.1%} {p:>8.4f}  "
+              f"{veredicto}")
+    lentas = sum(1 for *_, veredicto in filas if veredicto == "más lento")
+    rapidas = sum(1 for *_, veredicto in filas if veredicto == "más rápido")
+    print("-" * 100)
+    print(f"{len(filas)} celdas comparadas: {lentas} más lentas, {rapidas} más rápidas, "
+          f"{len(filas) - lentas - rapidas} sin cambio significativo")
+
+
+def principal(argumentos=None):
+    parser = argparse.ArgumentParser(description="Historial de los análisis empíricos de rendimiento.")
+    parser.add_argument("--historial", default=RUTA_HISTORIAL, help="archivo SQLite del historial")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+    listar = subcomandos.add_parser("listar", help="muestra las ejecuciones registradas")
+    listar.add_argument("--suite", help="solo las ejecuciones de esta suite (rutas, lab7, ...)")
+    comparar = subcomandos.add_parser("comparar", help="compara dos ejecuciones celda a celda")
+    comparar.add_argument("ejecuciones", nargs="*", type=int, help="ids BASE y NUEVA (por defecto las dos últimas)")
+    comparar.add_argument("--suite", help="suite de la que tomar las dos últimas ejecuciones")
+    comparar.add_argument("--alfa", type=float, default=ALFA_COMPARACION, help="nivel de significación")
+    comparar.add_argument("--cambio-minimo", type=float, default=CAMBIO_MINIMO,
+                          help="cambio relativo mínimo de la mediana (0.05 = 5 %%)")
+    args = parser.parse_args(argumentos)
+
+    if not os.path.exists(args.historial):
+        print(f"No existe el historial '{args.historial}'", file=sys.stderr)
+        return 1
+    if args.comando == "listar":
+        _imprimir_ejecuciones(listar_ejecuciones(args.suite, args.historial))
+        return 0
+
+    if len(args.ejecuciones) == 2:
+        base, nueva = args.ejecuciones
+    elif not args.ejecuciones:
+        ejecuciones = listar_ejecuciones(args.suite, args.historial)
+        if len(ejecuciones) < 2:
+            print("Se necesitan al menos dos ejecuciones para comparar", file=sys.stderr)
+            return 1
+        base, nueva = ejecuciones[-2]["id"], ejecuciones[-1]["id"]
+    else:
+        parser.error("indique dos ejecuciones (BASE NUEVA) o ninguna")
+    try:
+        filas = comparar_ejecuciones(base, nueva, args.historial, args.alfa, args.cambio_minimo)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 1
+    _imprimir_comparacion(base, nueva, filas, args.alfa)
+    return 1 if any(veredicto == "más lento" for *_, veredicto in filas) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(principal())
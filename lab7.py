@@ -1,9 +1,15 @@
-import time
-import tracemalloc
 import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from ajuste_complejidad import ajustar_mediciones, comparar_con_linea_base
+from ejecucion_aislada import TIEMPO_LIMITE_CELDA, ejecutar_celdas
+from historial_rendimiento import RUTA_HISTORIAL, registrar_ejecucion
+from medicion_rendimiento import medir
+
+# Línea base con la que se comparan los análisis empíricos (se crea en el primero)
+LINEA_BASE_ANALISIS = 'linea_base_lab7.json'
+
 # =============================================================================
 # ALGORITMOS
 # =============================================================================
@@ -50,20 +56,6 @@ def suma_matriz(n):
             suma += matriz[i][j]
     return suma
 
-def medir_tiempo_memoria(funcion, *args):
-    """Mide el tiempo de ejecución y memoria de una función."""
-    tracemalloc.start()
-    mem_inicial, _ = tracemalloc.get_traced_memory()
-    inicio = time.time()
-    resultado = funcion(*args)
-    fin = time.time()
-    mem_final, mem_peak = tracemalloc.get_traced_memory()
-    tracemalloc.stop()
-    tiempo_s = fin - inicio
-    tiempo_ms = tiempo_s * 1000
-    memoria_kb = mem_peak / 1024
-    return tiempo_s, tiempo_ms, memoria_kb, resultado
-
 # =============================================================================
 # ANÁLISIS EMPÍRICO
 # =============================================================================
@@ -96,82 +88,105 @@ def analisis_empirico():
         'suma_matriz': []
     }
     
-    print("\nEjecutando análisis empírico...", flush=True)
-    print("ADVERTENCIA: Los algoritmos O(n²) pueden tardar con tamaños grandes\n", flush=True)
+    # Medición completa de cada celda (muestras, cuartiles, intervalo de confianza)
+    mediciones = {
+        'suma_elementos': [],
+        'max_min': [],
+        'contar_pares': [],
+        'suma_matriz': []
+    }
     
-    for n in tamaños:
-        print(f"Procesando tamaño n = {n}...", flush=True)
-        arr = list(range(n))
-        
-        # 1. Suma de Elementos
-        t_s, t_ms, mem, _ = medir_tiempo_memoria(suma_elementos, arr)
-        tiempos_s['suma_elementos'].append(t_s)
-        tiempos_ms['suma_elementos'].append(t_ms)
-        memorias['suma_elementos'].append(mem)
-        
-        # 2. Encontrar Max/Min
-        t_s, t_ms, mem, _ = medir_tiempo_memoria(encontrar_max_min, arr)
-        tiempos_s['max_min'].append(t_s)
-        tiempos_ms['max_min'].append(t_ms)
-        memorias['max_min'].append(mem)
-        
-        # 3. Contar Pares (solo hasta n=5000)
-        if n <= 5000:
-            t_s, t_ms, mem, _ = medir_tiempo_memoria(contar_pares, arr)
-            tiempos_s['contar_pares'].append(t_s)
-            tiempos_ms['contar_pares'].append(t_ms)
-            memorias['contar_pares'].append(mem)
-        else:
-            tiempos_s['contar_pares'].append(None)
-            tiempos_ms['contar_pares'].append(None)
-            memorias['contar_pares'].append(None)
-        
-        # 4. Suma de Matriz (solo hasta n=5000)
-        if n <= 5000:
-            t_s, t_ms, mem, _ = medir_tiempo_memoria(suma_matriz, n)
-            tiempos_s['suma_matriz'].append(t_s)
-            tiempos_ms['suma_matriz'].append(t_ms)
-            memorias['suma_matriz'].append(mem)
-        else:
-            tiempos_s['suma_matriz'].append(None)
-            tiempos_ms['suma_matriz'].append(None)
-            memorias['suma_matriz'].append(None)
+    # Cada celda (algoritmo, n) se mide en su propio proceso, fijado a un núcleo y
+    # con tiempo límite; las celdas independientes se reparten entre los núcleos.
+    # Las más costosas (O(n²), n grande) se lanzan primero para acortar el total.
+    algoritmos = [('contar_pares', contar_pares, True), ('suma_matriz', suma_matriz, False),
+                  ('suma_elementos', suma_elementos, True), ('max_min', encontrar_max_min, True)]
+    celdas = [((clave, n), funcion, (list(range(n)) if con_lista else n,))
+              for clave, funcion, con_lista in algoritmos for n in sorted(tamaños, reverse=True)]
     
-    # Imprimir resultados
-    print("\n" + "="*80, flush=True)
+    print(f"\nEjecutando análisis empírico: {len(celdas)} celdas en procesos aislados...", flush=True)
+    print("ADVERTENCIA: Los algoritmos O(n²) pueden tardar con tamaños grandes; "
+          f"cada celda tiene un límite de {TIEMPO_LIMITE_CELDA:g} s\n", flush=True)
+    
+    def progreso(clave, medicion, error):
+        estado = f"{medicion.mediana_ms:.6f} ms" if medicion is not None else f"sin medir: {error}"
+        print(f"  {clave[0]:<16} n = {clave[1]:<6} → {estado}", flush=True)
+    
+    resultados = ejecutar_celdas(celdas, progreso=progreso)
+    
+    for clave, _, _ in algoritmos:
+        for n in tamaños:
+            medicion, _ = resultados[(clave, n)]
+            mediciones[clave].append(medicion)
+            tiempos_s[clave].append(None if medicion is None else medicion.mediana_s)
+            tiempos_ms[clave].append(None if medicion is None else medicion.mediana_ms)
+            memorias[clave].append(None if medicion is None else medicion.memoria_kb)
+    
+    # Imprimir resultados (mediana de las muestras, su dispersión y la precisión alcanzada)
+    nombres = [('suma_elementos', 'Suma de Elementos'), ('max_min', 'Encontrar Max/Min'),
+               ('contar_pares', 'Contar Pares'), ('suma_matriz', 'Suma de Matriz')]
+    print("\n" + "="*110, flush=True)
     print("RESULTADOS DEL ANÁLISIS EMPÍRICO", flush=True)
-    print("="*80, flush=True)
-    print(f"{'Tamaño (n)':<12} {'Algoritmo':<25} {'Tiempo (s)':<15} {'Tiempo (ms)':<15} {'Memoria (KB)':<15}", flush=True)
-    print("-"*80, flush=True)
+    print("="*110, flush=True)
+    print(f"{'Tamaño (n)':<12} {'Algoritmo':<25} {'Tiempo (s)':<15} {'Tiempo (ms)':<15} {'IQR (ms)':<13} "
+          f"{'± IC 95%':<10} {'Memoria (KB)':<15}", flush=True)
+    print("-"*110, flush=True)
     
     for i, n in enumerate(tamaños):
-        print(f"{n:<12} {'Suma de Elementos':<25} {tiempos_s['suma_elementos'][i]:<15.9f} "
-              f"{tiempos_ms['suma_elementos'][i]:<15.6f} {memorias['suma_elementos'][i]:<15.2f}", flush=True)
-        print(f"{'':<12} {'Encontrar Max/Min':<25} {tiempos_s['max_min'][i]:<15.9f} "
-              f"{tiempos_ms['max_min'][i]:<15.6f} {memorias['max_min'][i]:<15.2f}", flush=True)
-        
-        if tiempos_s['contar_pares'][i] is not None:
-            print(f"{'':<12} {'Contar Pares':<25} {tiempos_s['contar_pares'][i]:<15.9f} "
-                  f"{tiempos_ms['contar_pares'][i]:<15.6f} {memorias['contar_pares'][i]:<15.2f}", flush=True)
-        else:
-            print(f"{'':<12} {'Contar Pares':<25} {'N/A':<15} {'N/A':<15} {'N/A':<15}", flush=True)
-        
-        if tiempos_s['suma_matriz'][i] is not None:
-            print(f"{'':<12} {'Suma de Matriz':<25} {tiempos_s['suma_matriz'][i]:<15.9f} "
-                  f"{tiempos_ms['suma_matriz'][i]:<15.6f} {memorias['suma_matriz'][i]:<15.2f}", flush=True)
-        else:
-            print(f"{'':<12} {'Suma de Matriz':<25} {'N/A':<15} {'N/A':<15} {'N/A':<15}", flush=True)
-        print("-"*80, flush=True)
+        for k, (clave, nombre) in enumerate(nombres):
+            columna_n = n if k == 0 else ''
+            medicion = mediciones[clave][i]
+            if medicion is None:
+                print(f"{columna_n:<12} {nombre:<25} {'N/A':<15} {'N/A':<15} {'N/A':<13} {'N/A':<10} {'N/A':<15}",
+                      flush=True)
+                continue
+            print(f"{columna_n:<12} {nombre:<25} {medicion.mediana_s:<15.9f} {medicion.mediana_ms:<15.6f} "
+                  f"{medicion.iqr / 1e6:<13.6f} {medicion.precision:<10.1%} {medicion.memoria_kb:<15.2f}", flush=True)
+        print("-"*110, flush=True)
+    
+    for (clave, n), (_, error) in resultados.items():
+        if error is not None:
+            print(f"N/A en {clave} con n = {n}: {error}", flush=True)
+    print("="*110 + "\n", flush=True)
     
-    print("="*80 + "\n", flush=True)
+    # Modelo de complejidad que mejor explica cada algoritmo y comparación con la línea base
+    por_algoritmo = {clave: dict(zip(tamaños, mediciones[clave])) for clave in mediciones}
+    ajustes = ajustar_mediciones(por_algoritmo)
+    print("COMPLEJIDAD AJUSTADA (mínimos cuadrados en escala logarítmica)", flush=True)
+    print("-"*110, flush=True)
+    for clave, nombre in nombres:
+        tiempo, memoria = ajustes[clave]
+        print(f"{nombre:<25} Tiempo: {str(tiempo or 'N/A'):<30} Memoria: {memoria or 'N/A'}", flush=True)
+    print("-"*110, flush=True)
     
-    generar_graficas_interactivas(tamaños, tiempos_s, memorias)
-    return tamaños, tiempos_s, tiempos_ms, memorias
+    regresiones, hay_linea_base = comparar_con_linea_base(LINEA_BASE_ANALISIS, por_algoritmo, ajustes)
+    if not hay_linea_base:
+        print(f"Línea base guardada en '{LINEA_BASE_ANALISIS}' (bórrela para tomar una nueva).", flush=True)
+    elif regresiones:
+        print(f"REGRESIONES respecto a '{LINEA_BASE_ANALISIS}':", flush=True)
+        for clave, n, descripcion in regresiones:
+            print(f"  {clave}{'' if n is None else f' con n = {n}'}: {descripcion}", flush=True)
+    else:
+        print(f"Sin regresiones respecto a '{LINEA_BASE_ANALISIS}'.", flush=True)
+    
+    errores = {clave: error for clave, (_, error) in resultados.items() if error is not None}
+    ejecucion = registrar_ejecucion('lab7', por_algoritmo, errores)
+    print(f"Ejecución #{ejecucion} registrada en '{RUTA_HISTORIAL}' "
+          f"(compárela con: python historial_rendimiento.py comparar --suite lab7)", flush=True)
+    print("="*110 + "\n", flush=True)
+    
+    generar_graficas_interactivas(tamaños, tiempos_s, memorias, ajustes)
+    return tamaños, tiempos_s, tiempos_ms, memorias, mediciones, ajustes
 
 # =============================================================================
 # GENERACIÓN DE GRÁFICAS
 # =============================================================================
-def generar_graficas_interactivas(tamaños, tiempos, memorias):
+def generar_graficas_interactivas(tamaños, tiempos, memorias, ajustes=None):
+    def etiqueta(clave, nombre, teorico):
+        """Nombre de la curva con su complejidad teórica y, si se ajustó, la empírica."""
+        ajuste = (ajustes or {}).get(clave, (None, None))[0]
+        return f"{nombre} {teorico}" if ajuste is None else f"{nombre} {teorico} · empírico O({ajuste.modelo})"
+    
     fig = make_subplots(
         rows=1, cols=2,
         subplot_titles=('<b>Complejidad Temporal</b>', '<b>Complejidad Espacial</b>'),
@@ -184,7 +199,7 @@ def generar_graficas_interactivas(tamaños, tiempos, memorias):
             x=tamaños, 
             y=tiempos['suma_elementos'],
             mode='lines+markers',
-            name='Suma de Elementos O(n)',
+            name=etiqueta('suma_elementos', 'Suma de Elementos', 'O(n)'),
             line=dict(color='blue', width=3),
             marker=dict(size=10),
             legendgroup='suma',
@@ -198,7 +213,7 @@ def generar_graficas_interactivas(tamaños, tiempos, memorias):
             x=tamaños, 
             y=tiempos['max_min'],
             mode='lines+markers',
-            name='Encontrar Max/Min O(n)',
+            name=etiqueta('max_min', 'Encontrar Max/Min', 'O(n)'),
             line=dict(color='green', width=3),
             marker=dict(size=10),
             legendgroup='maxmin',
@@ -214,7 +229,7 @@ def generar_graficas_interactivas(tamaños, tiempos, memorias):
             x=tamaños_pares, 
             y=tiempos_pares,
             mode='lines+markers',
-            name='Contar Pares O(n²)',
+            name=etiqueta('contar_pares', 'Contar Pares', 'O(n²)'),
             line=dict(color='red', width=3),
             marker=dict(size=10),
             legendgroup='pares',
@@ -230,7 +245,7 @@ def generar_graficas_interactivas(tamaños, tiempos, memorias):
             x=tamaños_matriz, 
             y=tiempos_matriz,
             mode='lines+markers',
-            name='Suma de Matriz O(n²)',
+            name=etiqueta('suma_matriz', 'Suma de Matriz', 'O(n²)'),
             line=dict(color='purple', width=3),
             marker=dict(size=10),
             legendgroup='matriz',
@@ -245,7 +260,7 @@ def generar_graficas_interactivas(tamaños, tiempos, memorias):
             x=tamaños, 
             y=memorias['suma_elementos'],
             mode='lines+markers',
-            name='Suma de Elementos O(n)',
+            name=etiqueta('suma_elementos', 'Suma de Elementos', 'O(n)'),
             line=dict(color='blue', width=3),
             marker=dict(size=10),
             legendgroup='suma',
@@ -260,7 +275,7 @@ def generar_graficas_interactivas(tamaños, tiempos, memorias):
             x=tamaños, 
             y=memorias['max_min'],
             mode='lines+markers',
-            name='Encontrar Max/Min O(n)',
+            name=etiqueta('max_min', 'Encontrar Max/Min', 'O(n)'),
             line=dict(color='green', width=3),
             marker=dict(size=10),
             legendgroup='maxmin',
@@ -276,7 +291,7 @@ def generar_graficas_interactivas(tamaños, tiempos, memorias):
             x=tamaños_pares, 
             y=memorias_pares,
             mode='lines+markers',
-            name='Contar Pares O(n²)',
+            name=etiqueta('contar_pares', 'Contar Pares', 'O(n²)'),
             line=dict(color='red', width=3),
             marker=dict(size=10),
             legendgroup='pares',
@@ -292,7 +307,7 @@ def generar_graficas_interactivas(tamaños, tiempos, memorias):
             x=tamaños_matriz, 
             y=memorias_matriz,
             mode='lines+markers',
-            name='Suma de Matriz O(n²)',
+            name=etiqueta('suma_matriz', 'Suma de Matriz', 'O(n²)'),
             line=dict(color='purple', width=3),
             marker=dict(size=10),
             legendgroup='matriz',
@@ -517,36 +532,40 @@ def menu():
             print("\n--- ALGORITMO 1: SUMA DE ELEMENTOS ---", flush=True)
             print("Complejidad Teórica: O(n)", flush=True)
             arr_test = list(range(1000))
-            t_s, t_ms, mem, resultado = medir_tiempo_memoria(suma_elementos, arr_test)
+            medicion = medir(suma_elementos, arr_test)
+            resultado = medicion.resultado
             print(f"Resultado: La suma es {resultado}", flush=True)
-            print(f"Tiempo: {t_s:.9f} segundos ({t_ms:.6f} milisegundos)", flush=True)
-            print(f"Memoria: {mem:.2f} KB", flush=True)
+            print(f"Tiempo: {medicion.mediana_s:.9f} segundos ({medicion.mediana_ms:.6f} milisegundos)", flush=True)
+            print(f"Medición: {medicion.resumen()}", flush=True)
             
         elif opcion == '2':
             print("\n--- ALGORITMO 2: ENCONTRAR MÁXIMO Y MÍNIMO ---", flush=True)
             print("Complejidad Teórica: O(n)", flush=True)
             arr_test = list(range(1000))
-            t_s, t_ms, mem, resultado = medir_tiempo_memoria(encontrar_max_min, arr_test)
+            medicion = medir(encontrar_max_min, arr_test)
+            resultado = medicion.resultado
             print(f"Resultado: Max={resultado[0]}, Min={resultado[1]}", flush=True)
-            print(f"Tiempo: {t_s:.9f} segundos ({t_ms:.6f} milisegundos)", flush=True)
-            print(f"Memoria: {mem:.2f} KB", flush=True)
+            print(f"Tiempo: {medicion.mediana_s:.9f} segundos ({medicion.mediana_ms:.6f} milisegundos)", flush=True)
+            print(f"Medición: {medicion.resumen()}", flush=True)
             
         elif opcion == '3':
             print("\n--- ALGORITMO 3: CONTAR PARES DE ELEMENTOS ---", flush=True)
             print("Complejidad Teórica: O(n²)", flush=True)
             arr_test = list(range(100))
-            t_s, t_ms, mem, resultado = medir_tiempo_memoria(contar_pares, arr_test)
+            medicion = medir(contar_pares, arr_test)
+            resultado = medicion.resultado
             print(f"Resultado: {resultado} pares encontrados", flush=True)
-            print(f"Tiempo: {t_s:.9f} segundos ({t_ms:.6f} milisegundos)", flush=True)
-            print(f"Memoria: {mem:.2f} KB", flush=True)
+            print(f"Tiempo: {medicion.mediana_s:.9f} segundos ({medicion.mediana_ms:.6f} milisegundos)", flush=True)
+            print(f"Medición: {medicion.resumen()}", flush=True)
             
         elif opcion == '4':
             print("\n--- ALGORITMO 4: SUMA DE MATRIZ ---", flush=True)
             print("Complejidad Teórica: O(n²)", flush=True)
-            t_s, t_ms, mem, resultado = medir_tiempo_memoria(suma_matriz, 100)
+            medicion = medir(suma_matriz, 100)
+            resultado = medicion.resultado
             print(f"Resultado: Suma de matriz = {resultado}", flush=True)
-            print(f"Tiempo: {t_s:.9f} segundos ({t_ms:.6f} milisegundos)", flush=True)
-            print(f"Memoria: {mem:.2f} KB", flush=True)
+            print(f"Tiempo: {medicion.mediana_s:.9f} segundos ({medicion.mediana_ms:.6f} milisegundos)", flush=True)
+            print(f"Medición: {medicion.resumen()}", flush=True)
             
         elif opcion == '5':
             analisis_empirico()
@@ -0,0 +1,211 @@
+"""Ejecución por lotes de escenarios de asignación y consulta, sin menús.
+
+Uso:
+    python lote_escenarios.py escenarios.jsonl [más archivos...] -o resultados.jsonl -p 4
+
+Cada línea de un archivo .jsonl (o cada elemento de un .json con una lista)
+es un escenario:
+
+    {"id": "noche-001",
+     "matriz": {"archivo": "red.mat"}                       # o .csv de aristas con "n"
+               | {"n": 200, "minimo": 1, "maximo": 20, "semilla": 7},
+     "ediciones": [[i, j, km], ...],                         # opcional
+     "capacidad": 10, "total_paquetes": 35,
+     "modo": "catalogo" | "cvrp",                            # por defecto "catalogo"
+     "rutas": [3, 1, 2, 4],                                  # catálogo: ruta de cada conductor
+     "demandas": [0, 2, 1, ...],                             # cvrp: paquetes por punto
+     "consultas": [[origen, destino], ...]}                  # opcional: mejores rutas
+
+Los resultados se escriben como JSON Lines, uno por escenario y en el mismo
+orden, con "error" en lugar de resultados si el escenario no es válido.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from asignacion_rutas import (construir_asignacion, demandas_uniformes, numeros_ruta, optimizar_asignacion,
+                              reparto_paquetes)
+from caminos_minimos import completar_matriz
+from matriz_distancias import MatrizDistancias, abrir_matriz, costear_rutas, importar_aristas
+from motor_cvrp import resolver_cvrp
+from motor_rutas import resolver_ruta
+
+# Escenarios que se envían juntos a cada proceso trabajador
+ESCENARIOS_POR_ENVIO = 8
+
+# Matrices abiertas desde archivo en este proceso, reutilizadas entre escenarios
+_matrices_abiertas = {}
+
+
+# =============================================================================
+# LECTURA DE ESCENARIOS
+# =============================================================================
+def leer_escenarios(rutas_archivo):
+    """Genera los escenarios de los archivos en orden; las rutas relativas se resuelven junto al archivo."""
+    for ruta_archivo in rutas_archivo:
+        base = os.path.dirname(os.path.abspath(ruta_archivo))
+        with open(ruta_archivo, encoding="utf-8") as archivo:
+            if ruta_archivo.lower().endswith(".json"):
+                contenido = json.load(archivo)
+                lineas = contenido if isinstance(contenido, list) else [contenido]
+            else:
+                lineas = (json.loads(linea) for linea in archivo if linea.strip())
+            for k, escenario in enumerate(lineas):
+                escenario.setdefault("id", f"{os.path.basename(ruta_archivo)}:{k + 1}")
+                fuente = escenario.get("matriz", {})
+                if "archivo" in fuente:
+                    fuente["archivo"] = os.path.join(base, fuente["archivo"])
+                yield escenario
+
+
+def _cargar_matriz(fuente, editable):
+    """Matriz del escenario; se copia a memoria si el escenario la edita.
+
+    Los pares que faltan en un CSV de aristas se completan con su camino
+    mínimo por la red (ver caminos_minimos.completar_matriz).
+    """
+    if "archivo" not in fuente:
+        return MatrizDistancias.aleatoria(int(fuente["n"]), fuente.get("minimo", 1), fuente.get("maximo", 20),
+                                          fuente.get("semilla"))
+    archivo = fuente["archivo"]
+    clave = (archivo, fuente.get("n"), fuente.get("simetrica", True))
+    if clave not in _matrices_abiertas:
+        if archivo.lower().endswith((".csv", ".txt")):
+            matriz = MatrizDistancias.vacia(int(fuente["n"]))
+            importar_aristas(archivo, matriz, fuente.get("simetrica", True))
+            completar_matriz(matriz)
+        else:
+            matriz = abrir_matriz(archivo, "r")
+        _matrices_abiertas[clave] = matriz
+    matriz = _matrices_abiertas[clave]
+    if editable:
+        return MatrizDistancias.desde_arreglo(matriz.datos.copy(), matriz.simetrica)
+    return matriz
+
+
+# =============================================================================
+# EJECUCIÓN DE UN ESCENARIO
+# =============================================================================
+def _es_entero(valor):
+    return isinstance(valor, int) and not isinstance(valor, bool)
+
+
+def _validar_puntos(que, i, j, n):
+    if not (_es_entero(i) and _es_entero(j) and 0 <= i < n and 0 <= j < n):
+        raise ValueError(f"{que} inválida: ({i}, {j})")
+
+
+def ejecutar_escenario(escenario, trabajadores=1):
+    """Resultado (dict serializable a JSON) de un escenario; nunca lanza excepciones.
+
+    Cualquier fallo del escenario (datos inválidos o un error inesperado de
+    los motores) queda en "error" para que el resto del lote siga adelante.
+    """
+    inicio = time.perf_counter()
+    resultado = {"id": escenario.get("id") if isinstance(escenario, dict) else None}
+    try:
+        ediciones = escenario.get("ediciones", [])
+        matriz = _cargar_matriz(escenario["matriz"], editable=bool(ediciones))
+        n = len(matriz)
+        if n < 1:
+            raise ValueError("La matriz debe tener al menos un punto")
+        for i, j, valor in ediciones:
+            _validar_puntos("Edición", i, j, n)
+            if i == j:
+                raise ValueError(f"Edición inválida: ({i}, {j})")
+            if not _es_entero(valor):
+                raise ValueError(f"La distancia de la edición ({i}, {j}) debe ser un entero: {valor}")
+            matriz.editar(i, j, valor)
+
+        capacidad = int(escenario["capacidad"])
+        total_paquetes = int(escenario["total_paquetes"])
+        if escenario.get("modo", "catalogo") == "cvrp":
+            demandas = escenario.get("demandas") or demandas_uniformes(n, total_paquetes)
+            rutas, paquetes = resolver_cvrp(matriz, demandas, capacidad)
+            numeros = [None] * len(rutas)
+        else:
+            paquetes = reparto_paquetes(capacidad, total_paquetes)
+            numeros = numeros_ruta(len(paquetes), n, escenario.get("rutas"))
+            asignacion = optimizar_asignacion(construir_asignacion(numeros, n), matriz, trabajadores)
+            rutas = [ruta.seq for ruta in asignacion]
+
+        distancias = costear_rutas(matriz, rutas)
+        resultado["conductores"] = [
+            {"conductor": c + 1, "ruta_num": num, "paquetes": p, "ruta": list(map(int, ruta)), "distancia": int(d)}
+            for c, (num, p, ruta, d) in enumerate(zip(numeros, paquetes, rutas, distancias))
+        ]
+        resultado["distancia_total"] = int(sum(distancias))
+
+        consultas = []
+        for origen, destino in escenario.get("consultas", []):
+            _validar_puntos("Consulta", origen, destino, n)
+            ruta, distancia, brecha = resolver_ruta(origen, destino, matriz)
+            consultas.append({"origen": origen, "destino": destino, "ruta": ruta,
+                              "distancia": int(distancia), "brecha": brecha})
+        if consultas:
+            resultado["consultas"] = consultas
+    except Exception as error:
+        resultado["error"] = f"{type(error).__name__}: {error}"
+    resultado["segundos"] = round(time.perf_counter() - inicio, 6)
+    return resultado
+
+
+# =============================================================================
+# EJECUCIÓN DEL LOTE
+# =============================================================================
+def ejecutar_lote(escenarios, salida, procesos=1, progreso=None):
+    """Ejecuta los escenarios y escribe una línea JSON por resultado en salida.
+
+    Con procesos > 1 los escenarios se reparten entre procesos trabajadores
+    (cada uno optimiza sus rutas en un solo hilo para no competir por los
+    núcleos). Devuelve (escenarios, errores, segundos).
+    """
+    inicio = time.perf_counter()
+    total = errores = 0
+    if procesos > 1:
+        grupo = ProcessPoolExecutor(procesos)
+        resultados = grupo.map(ejecutar_escenario, escenarios, chunksize=ESCENARIOS_POR_ENVIO)
+    else:
+        grupo = None
+        resultados = (ejecutar_escenario(e, trabajadores=None) for e in escenarios)
+    try:
+        for resultado in resultados:
+            salida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+            total += 1
+            errores += "error" in resultado
+            if progreso is not None and total % 100 == 0:
+                progreso(total, time.perf_counter() - inicio)
+    finally:
+        if grupo is not None:
+            grupo.shutdown(cancel_futures=True)
+    return total, errores, time.perf_counter() - inicio
+
+
+def principal(argumentos=None):
+    parser = argparse.ArgumentParser(description="Ejecuta escenarios de rutas de entrega sin interacción.")
+    parser.add_argument("escenarios", nargs="+", help="archivos .jsonl (un escenario por línea) o .json")
+    parser.add_argument("-o", "--salida", default="-", help="archivo JSON Lines de resultados (- para stdout)")
+    parser.add_argument("-p", "--procesos", type=int, default=1,
+                        help="procesos trabajadores (0 para uno por núcleo)")
+    args = parser.parse_args(argumentos)
+    procesos = args.procesos or os.cpu_count() or 1
+
+    def progreso(hechos, segundos):
+        print(f"  {hechos} escenarios ({hechos / max(segundos, 1e-9):,.1f} escenarios/s)", file=sys.stderr)
+
+    salida = sys.stdout if args.salida == "-" else open(args.salida, "w", encoding="utf-8")
+    try:
+        total, errores, segundos = ejecutar_lote(leer_escenarios(args.escenarios), salida, procesos, progreso)
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+    print(f"{total} escenarios en {segundos:.2f} s ({total / max(segundos, 1e-9):,.1f} escenarios/s), "
+          f"{errores} con error", file=sys.stderr)
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(principal())
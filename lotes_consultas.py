@@ -0,0 +1,140 @@
+import asyncio
+import math
+from collections import defaultdict
+
+from caminos_minimos import SIN_CONEXION, camino_desde_previos, caminos_desde
+from grafo_disperso import GrafoDisperso, reconstruir_camino
+
+# Tiempo que espera un lote a que lleguen más consultas antes de resolverse,
+# y tamaño con el que se resuelve sin esperar.
+VENTANA_LOTE = 0.002
+TAMANO_MAXIMO_LOTE = 256
+
+# Hasta este tamaño los orígenes de un lote se resuelven juntos con Dijkstra
+# denso; por encima, un Dijkstra de uno a todos por origen sobre el grafo CSR.
+LIMITE_DIJKSTRA_DENSO = 2000
+
+
+# =============================================================================
+# AGRUPACIÓN DE CONSULTAS CONCURRENTES
+# =============================================================================
+class AgrupadorConsultas:
+    """Capa de micro-lotes delante de los motores de ruta.
+
+    - Rutas completas: las consultas idénticas (origen, destino, versión de la
+      matriz y tiempo límite) que llegan mientras otra igual se está resolviendo esperan el
+      mismo resultado en lugar de resolverse de nuevo.
+    - Caminos mínimos: las consultas que llegan dentro de VENTANA_LOTE se
+      agrupan por origen y cada origen se resuelve una sola vez de uno a
+      todos; cada consulta toma su destino del resultado.
+    calcular es una corrutina calcular(funcion, *args) que ejecuta el cálculo
+    fuera del bucle de eventos (ServicioRutas._calcular).
+    """
+
+    def __init__(self, calcular, ventana=VENTANA_LOTE, tamano_maximo=TAMANO_MAXIMO_LOTE):
+        self._calcular = calcular
+        self.ventana = ventana
+        self.tamano_maximo = tamano_maximo
+        self._en_curso = {}  # (matriz, origen, destino, versión, tiempo límite) → asyncio.Future
+        self._pendientes = []  # (matriz, origen, destino, futuro) del lote abierto
+        self._temporizador = None
+        self._grafo = None  # (matriz, versión, GrafoDisperso) para matrices grandes
+        self.consultas = 0
+        self.resoluciones = 0
+        self.lotes = 0
+
+    def estadisticas(self):
+        return {"consultas": self.consultas, "resoluciones": self.resoluciones, "lotes": self.lotes}
+
+    # -------------------------------------------------------------------------
+    # RUTAS COMPLETAS: FUSIÓN DE CONSULTAS IDÉNTICAS
+    # -------------------------------------------------------------------------
+    async def ruta(self, matriz, origen, destino, resolver, tiempo_limite=None):
+        """Resultado de resolver() compartido por todas las consultas idénticas en curso.
+
+        tiempo_limite forma parte de la clave: una consulta con más tiempo no
+        recibe la ruta calculada para otra con menos.
+        """
+        self.consultas += 1
+        clave = (id(matriz), origen, destino, matriz.version, tiempo_limite)
+        futuro = self._en_curso.get(clave)
+        if futuro is None:
+            self.resoluciones += 1
+            futuro = asyncio.ensure_future(self._calcular(resolver))
+            self._en_curso[clave] = futuro
+            futuro.add_done_callback(lambda _: self._en_curso.pop(clave, None))
+        # shield: si un cliente se desconecta, el resto sigue esperando el resultado
+        return await asyncio.shield(futuro)
+
+    # -------------------------------------------------------------------------
+    # CAMINOS MÍNIMOS: LOTES AGRUPADOS POR ORIGEN
+    # -------------------------------------------------------------------------
+    async def camino(self, matriz, origen, destino):
+        """(camino, distancia) mínimos de origen a destino; (None, None) si no hay conexión."""
+        self.consultas += 1
+        futuro = asyncio.get_running_loop().create_future()
+        self._pendientes.append((matriz, origen, destino, futuro))
+        if len(self._pendientes) >= self.tamano_maximo:
+            self._despachar_lote()
+        elif self._temporizador is None:
+            self._temporizador = asyncio.get_running_loop().call_later(self.ventana, self._despachar_lote)
+        return await futuro
+
+    def _despachar_lote(self):
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+            self._temporizador = None
+        lote, self._pendientes = self._pendientes, []
+        if lote:
+            self.lotes += 1
+            asyncio.ensure_future(self._resolver_lote(lote))
+
+    async def _resolver_lote(self, lote):
+        por_matriz = defaultdict(list)
+        for consulta in lote:
+            por_matriz[id(consulta[0])].append(consulta)
+        for consultas in por_matriz.values():
+            matriz = consultas[0][0]
+            origenes = sorted({origen for _, origen, _, _ in consultas})
+            self.resoluciones += len(origenes)
+            try:
+                resultados = await self._calcular(self._uno_a_todos, matriz, origenes,
+                                                  [(o, d) for _, o, d, _ in consultas])
+            except Exception as error:
+                for *_, futuro in consultas:
+                    if not futuro.done():
+                        futuro.set_exception(error)
+                continue
+            for (*_, futuro), resultado in zip(consultas, resultados):
+                if not futuro.done():
+                    futuro.set_result(resultado)
+
+    def _uno_a_todos(self, matriz, origenes, pares):
+        """Resuelve cada origen una vez y responde todos los pares (origen, destino)."""
+        fila_de = {origen: k for k, origen in enumerate(origenes)}
+        resultados = []
+        if len(matriz) <= LIMITE_DIJKSTRA_DENSO:
+            distancias, previos = caminos_desde(matriz, origenes)
+            for origen, destino in pares:
+                k = fila_de[origen]
+                distancia = distancias.item(k, destino)
+                if distancia >= SIN_CONEXION:
+                    resultados.append((None, None))
+                else:
+                    resultados.append((camino_desde_previos(previos[k], origen, destino), distancia))
+            return resultados
+
+        grafo = self._grafo_vigente(matriz)
+        arboles = [grafo.dijkstra(origen) for origen in origenes]
+        for origen, destino in pares:
+            distancias, previos = arboles[fila_de[origen]]
+            if math.isinf(distancias[destino]):
+                resultados.append((None, None))
+            else:
+                resultados.append((reconstruir_camino(previos, origen, destino), distancias[destino]))
+        return resultados
+
+    def _grafo_vigente(self, matriz):
+        if self._grafo is None or self._grafo[0] is not matriz or self._grafo[1] != matriz.version:
+            self._grafo = (matriz, matriz.version, GrafoDisperso.desde_matriz(matriz))
+        return self._grafo[2]
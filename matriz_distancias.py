@@ -0,0 +1,494 @@
+import operator
+import struct
+import time
+import warnings
+from itertools import islice
+
+import numpy as np
+
+
+# =============================================================================
+# MATRIZ DE DISTANCIAS RESPALDADA POR NUMPY
+# =============================================================================
+def tipo_minimo(minimo, maximo):
+    """Tipo entero más compacto (int16 o int32) que admite el rango [minimo, maximo]."""
+    if np.iinfo(np.int16).min <= minimo and maximo <= np.iinfo(np.int16).max:
+        return np.int16
+    if np.iinfo(np.int32).min <= minimo and maximo <= np.iinfo(np.int32).max:
+        return np.int32
+    return np.int64
+
+
+class _Fila:
+    """Vista de una fila que permite seguir usando matriz[i][j] como en una lista."""
+
+    __slots__ = ("_matriz", "_i")
+
+    def __init__(self, matriz, i):
+        self._matriz = matriz
+        self._i = i
+
+    def __getitem__(self, j):
+        return self._matriz.datos.item(self._i, j)
+
+    def __setitem__(self, j, valor):
+        self._matriz.editar_tipo(valor, valor)
+        self._matriz.datos[self._i, j] = valor
+        self._matriz.version += 1
+
+    def __len__(self):
+        return self._matriz.datos.shape[1]
+
+    def __iter__(self):
+        return iter(self._matriz.datos[self._i].tolist())
+
+
+class MatrizDistancias:
+    """Matriz n x n de distancias enteras guardada en un único ndarray contiguo.
+
+    Sustituye a la lista de listas: ocupa 2 o 4 bytes por celda en lugar de un
+    objeto int por celda. Admite matriz[i, j] (acceso directo) y matriz[i][j]
+    (compatible con el código que trabajaba con listas); las lecturas devuelven
+    int de Python. version aumenta con cada modificación hecha a través de
+    editar o asignar_bloque, para invalidar los resultados derivados.
+    """
+
+    def __init__(self, datos, simetrica=False):
+        datos = np.asarray(datos)
+        if datos.ndim != 2 or datos.shape[0] != datos.shape[1]:
+            raise ValueError("La matriz de distancias debe ser cuadrada")
+        if datos.size and not np.issubdtype(datos.dtype, np.integer):
+            raise ValueError("Las distancias deben ser enteras")
+        tipo = tipo_minimo(int(datos.min()), int(datos.max())) if datos.size else np.int16
+        self.datos = np.ascontiguousarray(datos, dtype=tipo)
+        self.simetrica = simetrica
+        self.version = 0
+
+    @classmethod
+    def desde_arreglo(cls, datos, simetrica=False):
+        """Envuelve un arreglo cuadrado ya válido (p. ej. un memmap) sin copiarlo ni recorrerlo."""
+        matriz = cls.__new__(cls)
+        matriz.datos = datos
+        matriz.simetrica = simetrica
+        matriz.version = 0
+        return matriz
+
+    @classmethod
+    def vacia(cls, n, dtype=np.int16):
+        """Matriz n x n en memoria con todas las distancias en 0."""
+        return cls.desde_arreglo(np.zeros((n, n), dtype=dtype))
+
+    @classmethod
+    def aleatoria(cls, n, minimo=1, maximo=20, semilla=None):
+        """Genera distancias aleatorias en [minimo, maximo] con diagonal 0, de forma vectorizada."""
+        rng = np.random.default_rng(semilla)
+        datos = rng.integers(minimo, maximo, size=(n, n), endpoint=True,
+                             dtype=tipo_minimo(min(minimo, 0), maximo))
+        np.fill_diagonal(datos, 0)
+        return cls.desde_arreglo(datos)
+
+    def __len__(self):
+        return self.datos.shape[0]
+
+    def __getitem__(self, indice):
+        if isinstance(indice, tuple):
+            return self.datos.item(indice)
+        # Como en una lista: índices negativos desde el final e IndexError fuera de rango
+        n = len(self)
+        i = operator.index(indice)
+        if not -n <= i < n:
+            raise IndexError(f"Índice de fila fuera de rango: {indice}")
+        return _Fila(self, i % n)
+
+    def __iter__(self):
+        return (_Fila(self, i) for i in range(len(self)))
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is None or dtype == self.datos.dtype:
+            return self.datos.copy() if copy else self.datos
+        return self.datos.astype(dtype)
+
+    @property
+    def en_disco(self):
+        """True si los datos están mapeados desde un archivo."""
+        return isinstance(self.datos, np.memmap)
+
+    def editar(self, i, j, valor):
+        """Actualiza la distancia entre i y j en ambos sentidos (matriz simétrica).
+
+        Devuelve los valores anteriores (i → j, j → i) para reparar los
+        resultados derivados sin recalcularlos.
+        """
+        anteriores = (self.datos.item(i, j), self.datos.item(j, i))
+        self.editar_tipo(valor, valor)
+        self.datos[i, j] = valor
+        self.datos[j, i] = valor
+        self.version += 1
+        return anteriores
+
+    def asignar_bloque(self, origenes, destinos, valores, simetrica=False):
+        """Escribe muchas distancias a la vez (mismas reglas de tipo que editar)."""
+        if len(valores):
+            self.editar_tipo(int(valores.min()), int(valores.max()))
+            self.datos[origenes, destinos] = valores
+            if simetrica:
+                self.datos[destinos, origenes] = valores
+            self.version += 1
+
+    def editar_tipo(self, minimo, maximo):
+        """Amplía el tipo de los datos si [minimo, maximo] no cabe en el actual."""
+        if minimo < np.iinfo(np.int64).min or maximo > np.iinfo(np.int64).max:
+            raise ValueError(f"La distancia {maximo if maximo > 0 else minimo} no cabe en un entero de 64 bits")
+        tipo = tipo_minimo(minimo, maximo)
+        if np.iinfo(tipo).bits > np.iinfo(self.datos.dtype).bits:
+            if self.en_disco:
+                raise ValueError(f"La distancia {maximo} no cabe en el tipo {self.datos.dtype} del archivo")
+            self.datos = self.datos.astype(tipo)
+
+    def costo_ruta(self, ruta):
+        """Distancia total de una ruta mediante indexación avanzada de sus tramos."""
+        ruta = np.asarray(ruta, dtype=np.intp)
+        if len(ruta) < 2:
+            return 0
+        return self.datos[ruta[:-1], ruta[1:]].sum(dtype=np.int64).item()
+
+
+# =============================================================================
+# ALMACENAMIENTO EN DISCO CON MAPEO EN MEMORIA
+# =============================================================================
+# Cabecera de 64 bytes (los datos quedan alineados):
+#   firma (8s) | versión (H) | n (Q) | dtype de NumPy, p. ej. "<i2" (8s) | simétrica (?)
+FIRMA_ARCHIVO = b"MATDIST\x00"
+VERSION_ARCHIVO = 1
+FORMATO_CABECERA = "<8sHQ8s?"
+TAMANO_CABECERA = 64
+
+
+def guardar_matriz(matriz, ruta_archivo, simetrica=None):
+    """Escribe la matriz en el formato binario con cabecera (n, dtype, simetría).
+
+    Si simetrica es None se detecta comparando la matriz con su traspuesta.
+    """
+    datos = np.asarray(matriz)
+    if simetrica is None:
+        simetrica = bool(np.array_equal(datos, datos.T))
+    cabecera = struct.pack(FORMATO_CABECERA, FIRMA_ARCHIVO, VERSION_ARCHIVO, len(datos),
+                           datos.dtype.str.encode("ascii"), simetrica)
+    with open(ruta_archivo, "wb") as f:
+        f.write(cabecera.ljust(TAMANO_CABECERA, b"\x00"))
+        # Por filas para no duplicar en memoria matrices grandes
+        for fila in datos:
+            f.write(np.ascontiguousarray(fila).tobytes())
+
+
+def leer_cabecera(ruta_archivo):
+    """Devuelve (n, dtype, simetrica) a partir de la cabecera del archivo."""
+    with open(ruta_archivo, "rb") as f:
+        crudo = f.read(TAMANO_CABECERA)
+    if len(crudo) < TAMANO_CABECERA:
+        raise ValueError(f"'{ruta_archivo}' no es un archivo de matriz de distancias")
+    firma, version, n, tipo, simetrica = struct.unpack_from(FORMATO_CABECERA, crudo)
+    if firma != FIRMA_ARCHIVO:
+        raise ValueError(f"'{ruta_archivo}' no es un archivo de matriz de distancias")
+    if version != VERSION_ARCHIVO:
+        raise ValueError(f"Versión de archivo no soportada: {version}")
+    return n, np.dtype(tipo.rstrip(b"\x00").decode("ascii")), simetrica
+
+
+def abrir_matriz(ruta_archivo, modo="r"):
+    """Abre un archivo de matriz mediante np.memmap, sin copiar los datos.
+
+    Las páginas se cargan bajo demanda, por lo que abrir una matriz de
+    50.000 x 50.000 es inmediato. Con modo "r+" las ediciones se escriben
+    directamente en el archivo.
+    """
+    n, tipo, simetrica = leer_cabecera(ruta_archivo)
+    datos = np.memmap(ruta_archivo, dtype=tipo, mode=modo, offset=TAMANO_CABECERA, shape=(n, n))
+    return MatrizDistancias.desde_arreglo(datos, simetrica)
+
+
+def crear_matriz_archivo(ruta_archivo, n, dtype=np.int16, simetrica=False):
+    """Crea un archivo de matriz n x n lleno de ceros y lo devuelve abierto en modo "r+"."""
+    dtype = np.dtype(dtype)
+    cabecera = struct.pack(FORMATO_CABECERA, FIRMA_ARCHIVO, VERSION_ARCHIVO, n,
+                           dtype.str.encode("ascii"), simetrica)
+    with open(ruta_archivo, "wb") as f:
+        f.write(cabecera.ljust(TAMANO_CABECERA, b"\x00"))
+        f.truncate(TAMANO_CABECERA + n * n * dtype.itemsize)
+    return abrir_matriz(ruta_archivo, "r+")
+
+
+# =============================================================================
+# IMPORTACIÓN POR BLOQUES DESDE CSV / LISTA DE ARISTAS
+# =============================================================================
+TAMANO_BLOQUE_IMPORTACION = 100_000
+
+
+def _leer_bloques(archivo, tamano_bloque):
+    """Genera (número de la primera línea, líneas) sin cargar el archivo completo."""
+    numero_linea = 1
+    while True:
+        lineas = list(islice(archivo, tamano_bloque))
+        if not lineas:
+            return
+        yield numero_linea, lineas
+        numero_linea += len(lineas)
+
+
+def _linea_de_fila(lineas, fila, primera_linea):
+    """Número de línea de la fila de datos fila (np.loadtxt omite las líneas vacías y los comentarios)."""
+    for desplazamiento, linea in enumerate(lineas):
+        if linea.split("#", 1)[0].strip():
+            if fila == 0:
+                return primera_linea + desplazamiento
+            fila -= 1
+    return primera_linea
+
+
+def _es_encabezado(linea, separador):
+    campos = linea.strip().split(separador)
+    try:
+        [float(c) for c in campos]
+    except ValueError:
+        return True
+    return False
+
+
+def leer_aristas(ruta_archivo, n, separador=",", tamano_bloque=TAMANO_BLOQUE_IMPORTACION):
+    """Genera por bloques (origenes, destinos, valores, descartadas) de un CSV "origen,destino,km".
+
+    El texto se procesa de tamano_bloque líneas a la vez, de modo que nunca
+    está completo en memoria, y cada bloque se valida con operaciones
+    vectorizadas: las filas con índices fuera de 0..n-1, origen igual al
+    destino o distancias negativas se descartan (descartadas las cuenta).
+    Un índice no entero (p. ej. 3.7) lanza ValueError con su número de línea.
+    """
+    with open(ruta_archivo, "r", encoding="utf-8") as archivo:
+        for numero_linea, lineas in _leer_bloques(archivo, tamano_bloque):
+            primera_linea = numero_linea
+            if numero_linea == 1 and _es_encabezado(lineas[0], separador):
+                lineas = lineas[1:]
+                primera_linea += 1
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", UserWarning)  # bloques solo con comentarios
+                try:
+                    bloque = np.loadtxt(lineas, delimiter=separador, dtype=np.float64,
+                                        usecols=(0, 1, 2), ndmin=2)
+                except ValueError as e:
+                    raise ValueError(f"Error en el bloque que empieza en la línea {numero_linea}: {e}")
+            if not bloque.size:
+                continue
+
+            # Un índice como 3.7 no se trunca a 3: el archivo está mal formado
+            indices = bloque[:, :2]
+            no_enteros = ~np.isfinite(indices) | (indices != np.floor(indices))
+            if no_enteros.any():
+                fila, columna = map(int, np.argwhere(no_enteros)[0])
+                raise ValueError(f"Línea {_linea_de_fila(lineas, fila, primera_linea)}: el "
+                                 f"{'origen' if columna == 0 else 'destino'} {indices[fila, columna]:g} "
+                                 f"no es un índice entero")
+
+            origenes = bloque[:, 0].astype(np.int64)
+            destinos = bloque[:, 1].astype(np.int64)
+            valores = np.rint(bloque[:, 2]).astype(np.int64)
+            validas = ((origenes >= 0) & (origenes < n) & (destinos >= 0) & (destinos < n)
+                       & (origenes != destinos) & (valores >= 0))
+            yield origenes[validas], destinos[validas], valores[validas], len(validas) - int(validas.sum())
+
+
+def importar_aristas(ruta_archivo, matriz, simetrica=False, separador=",",
+                     tamano_bloque=TAMANO_BLOQUE_IMPORTACION, progreso=None):
+    """Carga un CSV/lista de aristas "origen,destino,km" en la matriz, por bloques.
+
+    Cada bloque de leer_aristas se escribe con una sola asignación
+    vectorizada (directamente en el archivo si la matriz está mapeada en
+    modo "r+"). Con simetrica=True cada arista se escribe también en
+    sentido inverso, como en editar_matriz. Los pares que no aparecen en el
+    archivo conservan su valor actual.
+
+    progreso, si se da, se llama tras cada bloque con (filas_leidas, segundos).
+    Devuelve (filas_importadas, filas_descartadas, segundos).
+    """
+    importadas = descartadas = 0
+    inicio = time.perf_counter()
+    for origenes, destinos, valores, descartadas_bloque in leer_aristas(ruta_archivo, len(matriz), separador,
+                                                                         tamano_bloque):
+        matriz.asignar_bloque(origenes, destinos, valores, simetrica)
+        importadas += len(valores)
+        descartadas += descartadas_bloque
+        if progreso is not None:
+            progreso(importadas + descartadas, time.perf_counter() - inicio)
+
+    if matriz.en_disco:
+        matriz.datos.flush()
+    return importadas, descartadas, time.perf_counter() - inicio
+
+
+def leer_coordenadas(ruta_archivo, n, separador=","):
+    """Coordenadas (x, y) de los n puntos desde un CSV "x,y" con una línea por punto, en orden."""
+    with open(ruta_archivo, "r", encoding="utf-8") as archivo:
+        encabezado = _es_encabezado(archivo.readline(), separador)
+        archivo.seek(0)
+        coordenadas = np.loadtxt(archivo, delimiter=separador, dtype=np.float64, usecols=(0, 1), ndmin=2,
+                                 skiprows=1 if encabezado else 0)
+    if len(coordenadas) != n:
+        raise ValueError(f"Se esperaban {n} coordenadas (una por punto) y el archivo tiene {len(coordenadas)}")
+    return coordenadas
+
+
+# =============================================================================
+# COSTEO VECTORIZADO DE RUTAS
+# =============================================================================
+def tipo_puntos(n):
+    """Tipo entero sin signo más pequeño para los índices de puntos 0..n-1."""
+    return np.uint16 if n <= np.iinfo(np.uint16).max + 1 else np.uint32
+
+
+class RutasCompactas:
+    """Secuencias de muchas rutas en un único arreglo de puntos con desplazamientos.
+
+    La ruta k es la vista puntos[inicios[k]:inicios[k + 1]]: 2 bytes por
+    punto (4 con más de 65536 puntos) en lugar de una lista de int de Python
+    por ruta. Se costean y se consultan sin materializar listas.
+    """
+
+    __slots__ = ("puntos", "inicios")
+
+    def __init__(self, puntos, inicios):
+        self.puntos = puntos
+        self.inicios = inicios
+
+    @classmethod
+    def desde_secuencias(cls, secuencias, n=None):
+        """Empaqueta listas o arreglos de puntos (devuelve secuencias tal cual si ya es RutasCompactas)."""
+        if isinstance(secuencias, cls):
+            return secuencias
+        inicios = np.zeros(len(secuencias) + 1, dtype=np.int64)
+        np.cumsum([len(r) for r in secuencias], out=inicios[1:])
+        if not inicios[-1]:
+            return cls(np.zeros(0, dtype=tipo_puntos(n or 0)), inicios)
+        partes = [np.asarray(r) for r in secuencias]
+        if n is None:
+            n = max(int(parte.max()) for parte in partes if len(parte)) + 1
+        puntos = np.empty(int(inicios[-1]), dtype=tipo_puntos(n))
+        for parte, inicio in zip(partes, inicios[:-1].tolist()):
+            puntos[inicio:inicio + len(parte)] = parte
+        return cls(puntos, inicios)
+
+    def __len__(self):
+        return len(self.inicios) - 1
+
+    def __getitem__(self, k):
+        return self.puntos[self.inicios[k]:self.inicios[k + 1]]
+
+    def __iter__(self):
+        limites = self.inicios.tolist()
+        return (self.puntos[a:b] for a, b in zip(limites, limites[1:]))
+
+    @property
+    def nbytes(self):
+        return self.puntos.nbytes + self.inicios.nbytes
+
+    def como_listas(self):
+        """Secuencias como listas de int (solo para serializarlas, p. ej. a JSON)."""
+        return [ruta.tolist() for ruta in self]
+
+    def costos(self, matriz):
+        """Distancia de cada ruta con un único gather de todos los tramos.
+
+        Los tramos que unen el final de una ruta con el inicio de la siguiente
+        se anulan y el costo de cada ruta sale de una suma acumulada entre
+        sus desplazamientos.
+        """
+        if not len(self):
+            return []
+        d = np.asarray(matriz)
+        tramos = d[self.puntos[:-1], self.puntos[1:]].astype(np.int64)
+        inicios, fines = self.inicios[:-1], self.inicios[1:]
+        uniones = fines[:-1] - 1  # tramos entre rutas consecutivas
+        tramos[uniones[(uniones >= 0) & (uniones < len(tramos))]] = 0
+        acumulado = np.concatenate(([0], np.cumsum(tramos)))
+        # Las rutas vacías (fin == inicio) cuestan 0; se acotan sus índices
+        # porque una vacía al final apunta una posición más allá de acumulado.
+        ultimos = np.minimum(np.maximum(fines - 1, inicios), len(acumulado) - 1)
+        return np.where(fines > inicios, acumulado[ultimos] - acumulado[np.minimum(inicios, len(acumulado) - 1)],
+                        0).tolist()
+
+    def usos_tramo(self, u, v):
+        """Veces que cada ruta recorre el tramo u → v (un barrido vectorizado del arreglo plano)."""
+        p = self.puntos
+        posiciones = np.flatnonzero((p[:-1] == u) & (p[1:] == v))
+        rutas = np.searchsorted(self.inicios, posiciones, side="right") - 1
+        # Descarta los "tramos" formados por el final de una ruta y el inicio de la siguiente
+        dentro = posiciones + 1 < self.inicios[rutas + 1]
+        return np.bincount(rutas[dentro], minlength=len(self))
+
+
+def costear_rutas(matriz, rutas):
+    """Distancia de cada ruta de rutas (listas, arreglos o RutasCompactas), ver RutasCompactas.costos."""
+    return RutasCompactas.desde_secuencias(rutas, len(matriz)).costos(matriz)
+
+
+def costos_rutas_sin_punto(matriz):
+    """Costo de las n rutas 0 → [0..n-1 sin i] → 0 en O(n) total.
+
+    Se suman una sola vez los tramos consecutivos k → k+1; omitir el punto i
+    solo cambia los dos tramos que lo tocan por el atajo (i-1) → (i+1).
+    """
+    d = np.asarray(matriz)
+    n = len(d)
+    if n <= 2:
+        return costear_rutas(d, [[0] + [p for p in range(n) if p != i] + [0] for i in range(n)])
+
+    puntos = np.arange(n)
+    consecutivos = d[puntos[:-1], puntos[1:]].astype(np.int64)  # k → k+1
+    total = consecutivos.sum()
+
+    costos = np.empty(n, dtype=np.int64)
+    medios = puntos[1:-1]
+    costos[1:-1] = (total - consecutivos[medios - 1] - consecutivos[medios]
+                    + d[medios - 1, medios + 1])
+    costos[0] = total - consecutivos[0]
+    costos[-1] = total - consecutivos[-1]
+
+    # Tramos de salida y regreso al depósito
+    primeros = np.where(puntos == 0, 1, 0)
+    ultimos = np.where(puntos == n - 1, n - 2, n - 1)
+    costos += d[0, primeros].astype(np.int64) + d[ultimos, 0]
+    return costos.tolist()
+
+
+class TotalesRutas:
+    """Distancia total de cada ruta, reparable tras la edición de un tramo.
+
+    Las rutas se guardan empaquetadas (RutasCompactas); al editar la
+    distancia entre i y j un barrido vectorizado encuentra las rutas que usan
+    ese tramo y solo se ajustan sus totales, sin volver a costearlas todas
+    ni mantener un índice por tramo.
+    """
+
+    def __init__(self, matriz, rutas):
+        self.matriz = matriz
+        self.version = matriz.version
+        self.rutas = RutasCompactas.desde_secuencias(rutas, len(matriz))
+        self.totales = self.rutas.costos(matriz)
+
+    def vigente(self, matriz):
+        return self.matriz is matriz and self.version == matriz.version
+
+    def reparar_arista(self, matriz, i, j, anteriores):
+        """Aplica la edición (i, j) de MatrizDistancias.editar a los totales.
+
+        Solo es válido si la caché estaba al día justo antes de esa edición;
+        devuelve False (sin tocar nada) en caso contrario.
+        """
+        if self.matriz is not matriz or self.version != matriz.version - 1:
+            return False
+        for (u, v), anterior in zip(((i, j), (j, i)), anteriores):
+            diferencia = matriz[u, v] - anterior
+            if diferencia:
+                usos = self.rutas.usos_tramo(u, v)
+                for r in np.flatnonzero(usos).tolist():
+                    self.totales[r] += int(usos[r]) * diferencia
+        self.version = matriz.version
+        return True
@@ -0,0 +1,181 @@
+import gc
+import math
+import statistics
+import time
+import tracemalloc
+
+# Confianza del intervalo de la mediana y semiancho relativo con el que se da
+# por buena una medición (±5 % de la mediana al 95 %).
+CONFIANZA_MEDICION = 0.95
+PRECISION_MEDICION = 0.05
+
+# Muestras mínimas y máximas por medición y segundos que puede durar cada una;
+# si se agota el tiempo antes de alcanzar la precisión se informa la obtenida.
+MIN_MUESTRAS = 5
+MAX_MUESTRAS = 1000
+TIEMPO_MAXIMO_MEDICION = 2.0
+
+# Llamadas de calentamiento antes de medir (cachés, asignador, bytecode)
+CALENTAMIENTO = 2
+
+# Duración mínima de cada muestra: las funciones más rápidas se repiten varias
+# veces dentro de una misma muestra para que la resolución del reloj no pese.
+DURACION_MINIMA_MUESTRA_NS = 200_000
+
+# Factor de Tukey para marcar muestras atípicas fuera de [Q1 - k·IQR, Q3 + k·IQR]
+FACTOR_ATIPICOS = 1.5
+
+
+# =============================================================================
+# ESTADÍSTICAS DE UNA MEDICIÓN
+# =============================================================================
+def intervalo_mediana(ordenadas, confianza=CONFIANZA_MEDICION):
+    """Intervalo de confianza de la mediana por estadísticos de orden (sin suponer normalidad)."""
+    k = len(ordenadas)
+    z = statistics.NormalDist().inv_cdf((1 + confianza) / 2)
+    margen = z * math.sqrt(k) / 2
+    return ordenadas[max(0, math.floor(k / 2 - margen))], ordenadas[min(k - 1, math.ceil(k / 2 + margen))]
+
+
+class Medicion:
+    """Resultado de medir una función: muestras de tiempo, estadísticas y memoria pico.
+
+    muestras son los nanosegundos por llamada de cada muestra (cada una
+    promedia llamadas_por_muestra llamadas). La memoria pico, en bytes, se
+    mide en una pasada aparte con tracemalloc para no inflar los tiempos;
+    resultado es lo que devolvió la función en esa pasada.
+    """
+
+    __slots__ = ("muestras", "llamadas_por_muestra", "confianza", "memoria_pico", "resultado",
+                 "mediana", "q1", "q3", "intervalo", "atipicos")
+
+    def __init__(self, muestras, llamadas_por_muestra=1, confianza=CONFIANZA_MEDICION,
+                 memoria_pico=None, resultado=None):
+        self.muestras = list(muestras)
+        self.llamadas_por_muestra = llamadas_por_muestra
+        self.confianza = confianza
+        self.memoria_pico = memoria_pico
+        self.resultado = resultado
+        ordenadas = sorted(self.muestras)
+        self.mediana = statistics.median(ordenadas)
+        if len(ordenadas) > 1:
+            self.q1, _, self.q3 = statistics.quantiles(ordenadas, n=4, method="inclusive")
+        else:
+            self.q1 = self.q3 = self.mediana
+        self.intervalo = intervalo_mediana(ordenadas, confianza)
+        iqr = self.q3 - self.q1
+        bajo, alto = self.q1 - FACTOR_ATIPICOS * iqr, self.q3 + FACTOR_ATIPICOS * iqr
+        self.atipicos = sum(1 for m in ordenadas if m < bajo or m > alto)
+
+    def __repr__(self):
+        return f"Medicion({self.resumen()})"
+
+    @property
+    def iqr(self):
+        return self.q3 - self.q1
+
+    @property
+    def precision(self):
+        """Semiancho del intervalo de la mediana relativo a la mediana."""
+        bajo, alto = self.intervalo
+        return (alto - bajo) / 2 / self.mediana if self.mediana else 0.0
+
+    @property
+    def mediana_ms(self):
+        return self.mediana / 1e6
+
+    @property
+    def mediana_s(self):
+        return self.mediana / 1e9
+
+    @property
+    def memoria_kb(self):
+        return None if self.memoria_pico is None else self.memoria_pico / 1024
+
+    @property
+    def memoria_mb(self):
+        return None if self.memoria_pico is None else self.memoria_pico / (1024 * 1024)
+
+    def muestras_ms(self):
+        return [m / 1e6 for m in self.muestras]
+
+    def resumen(self):
+        texto = (f"mediana {self.mediana_ms:.6f} ms ±{self.precision:.1%} "
+                 f"(IQR {self.iqr / 1e6:.6f} ms, {len(self.muestras)} muestras, {self.atipicos} atípicas)")
+        if self.memoria_pico is not None:
+            texto += f", memoria pico {self.memoria_kb:.2f} KB"
+        return texto
+
+
+# =============================================================================
+# MEDICIÓN
+# =============================================================================
+def memoria_pico(funcion, *args):
+    """(bytes pico asignados durante una llamada, resultado), medido con tracemalloc."""
+    gc.collect()
+    ya_activo = tracemalloc.is_tracing()
+    if not ya_activo:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        resultado = funcion(*args)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        if not ya_activo:
+            tracemalloc.stop()
+    return max(pico - base, 0), resultado
+
+
+def medir(funcion, *args, confianza=CONFIANZA_MEDICION, precision=PRECISION_MEDICION,
+          min_muestras=MIN_MUESTRAS, max_muestras=MAX_MUESTRAS, tiempo_maximo=TIEMPO_MAXIMO_MEDICION,
+          calentamiento=CALENTAMIENTO, desactivar_gc=True, con_memoria=True):
+    """Mide funcion(*args) y devuelve una Medicion.
+
+    1. Calentamiento: calentamiento llamadas sin medir (una si ya supera
+       tiempo_maximo); la más rápida fija cuántas llamadas entran en cada
+       muestra (DURACION_MINIMA_MUESTRA_NS).
+    2. Tiempo: muestras con perf_counter_ns y el recolector de basura
+       desactivado, hasta que el intervalo de confianza de la mediana quede
+       dentro de ±precision, se alcancen max_muestras o pasen tiempo_maximo
+       segundos (siempre al menos min_muestras).
+    3. Memoria: una llamada más con tracemalloc, separada de la de tiempos.
+    """
+    reloj = time.perf_counter_ns
+    mas_rapida = None
+    for _ in range(max(calentamiento, 1)):
+        inicio = reloj()
+        funcion(*args)
+        duracion = reloj() - inicio
+        mas_rapida = duracion if mas_rapida is None else min(mas_rapida, duracion)
+        if duracion >= tiempo_maximo * 1e9:
+            break  # una sola llamada ya agota el tiempo: basta como calentamiento
+    llamadas = max(1, math.ceil(DURACION_MINIMA_MUESTRA_NS / max(mas_rapida, 1)))
+    repeticiones = range(llamadas)
+
+    muestras = []
+    gc_activo = gc.isenabled()
+    gc.collect()
+    if desactivar_gc:
+        gc.disable()
+    try:
+        limite = reloj() + int(tiempo_maximo * 1e9)
+        while len(muestras) < max_muestras:
+            inicio = reloj()
+            for _ in repeticiones:
+                funcion(*args)
+            muestras.append((reloj() - inicio) / llamadas)
+            if len(muestras) < min_muestras:
+                continue
+            if reloj() >= limite:
+                break
+            ordenadas = sorted(muestras)
+            bajo, alto = intervalo_mediana(ordenadas, confianza)
+            if alto - bajo <= 2 * precision * statistics.median(ordenadas):
+                break
+    finally:
+        if gc_activo:
+            gc.enable()
+
+    pico, resultado = memoria_pico(funcion, *args) if con_memoria else (None, None)
+    return Medicion(muestras, llamadas, confianza, pico, resultado)
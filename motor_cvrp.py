@@ -0,0 +1,192 @@
+from collections import deque
+
+import numpy as np
+
+from motor_rutas import listas_vecinos
+
+# Hasta este número de puntos se evalúan los ahorros de todos los pares;
+# por encima solo los de cada punto con sus vecinos cercanos.
+LIMITE_AHORROS_COMPLETOS = 1500
+VECINOS_AHORROS = 40
+
+
+# =============================================================================
+# RUTEO DE VEHÍCULOS CON CAPACIDAD (CVRP)
+# =============================================================================
+def _pares_ahorro(d, vecinos):
+    """Pares (i, j) candidatos a unirse y su ahorro d[i,0] + d[0,j] - d[i,j], de mayor a menor."""
+    n = len(d)
+    if n - 1 <= LIMITE_AHORROS_COMPLETOS:
+        i, j = np.nonzero(~np.eye(n - 1, dtype=bool))
+        i, j = i + 1, j + 1
+    else:
+        vec = np.asarray(vecinos)
+        i = np.repeat(np.arange(n), vec.shape[1])
+        j = vec.ravel()
+        validos = (i != 0) & (j != 0)
+        i, j = i[validos], j[validos]
+    ahorros = d[i, 0].astype(np.int64) + d[0, j] - d[i, j]
+    orden = np.argsort(-ahorros, kind="stable")
+    positivos = ahorros[orden] > 0
+    return i[orden][positivos].tolist(), j[orden][positivos].tolist()
+
+
+def _ahorros_clarke_wright(d, demandas, capacidad, vecinos):
+    """Construcción paralela de Clarke-Wright sobre listas enlazadas.
+
+    Cada punto empieza en su propia ruta 0 → i → 0; se recorren los pares por
+    ahorro decreciente y se une la ruta que termina en i con la que empieza
+    en j si la carga conjunta no supera la capacidad. Los sentidos se
+    respetan, por lo que sirve también para matrices no simétricas.
+    """
+    n = len(d)
+    anterior = [0] * n
+    siguiente = [0] * n
+    ruta_de = list(range(n))
+    miembros = {r: [r] for r in range(1, n)}
+    carga = {r: demandas[r] for r in range(1, n)}
+
+    for i, j in zip(*_pares_ahorro(d, vecinos)):
+        ri, rj = ruta_de[i], ruta_de[j]
+        if ri == rj or siguiente[i] != 0 or anterior[j] != 0:
+            continue
+        if carga[ri] + carga[rj] > capacidad:
+            continue
+        siguiente[i] = j
+        anterior[j] = i
+        # Se reetiqueta la ruta más corta para que el total de reetiquetados sea O(n log n)
+        mayor, menor = (ri, rj) if len(miembros[ri]) >= len(miembros[rj]) else (rj, ri)
+        for punto in miembros[menor]:
+            ruta_de[punto] = mayor
+        miembros[mayor].extend(miembros.pop(menor))
+        carga[mayor] += carga.pop(menor)
+    return anterior, siguiente, ruta_de, carga
+
+
+def _mejora_entre_rutas(d, demandas, capacidad, vecinos, anterior, siguiente, ruta_de, carga):
+    """Búsqueda local con reubicación y el intercambio de puntos entre rutas.
+
+    - Reubicar: mover u justo después o justo antes de un vecino v (de otra
+      ruta con capacidad disponible, o de la misma ruta).
+    - Intercambiar: u y v, de rutas distintas, pasan cada uno a la posición
+      del otro si ambas cargas siguen dentro de la capacidad.
+    Los movimientos se buscan solo entre vecinos cercanos y con bits "no
+    mirar", como en motor_rutas._busqueda_local.
+    """
+    dist = d.item
+    cola = deque(range(1, len(d)))
+    activo = [True] * len(d)
+
+    def activar(*puntos):
+        for punto in puntos:
+            if punto != 0 and not activo[punto]:
+                activo[punto] = True
+                cola.append(punto)
+
+    def desenlazar(u):
+        p, s = anterior[u], siguiente[u]
+        if p:
+            siguiente[p] = s
+        if s:
+            anterior[s] = p
+
+    def enlazar(u, p, s):
+        anterior[u], siguiente[u] = p, s
+        if p:
+            siguiente[p] = u
+        if s:
+            anterior[s] = u
+
+    def reubicar(u):
+        p, s = anterior[u], siguiente[u]
+        quitar = dist(p, u) + dist(u, s) - dist(p, s)
+        for v in vecinos[u]:
+            if v == 0 or v == u:
+                continue
+            misma = ruta_de[v] == ruta_de[u]
+            if not misma and carga[ruta_de[v]] + demandas[u] > capacidad:
+                continue
+            # después de v (x = v) o antes de v (y = v)
+            for x, y in ((v, siguiente[v]), (anterior[v], v)):
+                if x == u or y == u or (x == p and y == s):
+                    continue
+                if dist(x, u) + dist(u, y) - dist(x, y) - quitar < -1e-9:
+                    origen, destino = ruta_de[u], ruta_de[v]
+                    desenlazar(u)
+                    enlazar(u, x, y)  # x o y pueden ser 0: el depósito de la ruta de v
+                    if origen != destino:
+                        carga[origen] -= demandas[u]
+                        carga[destino] += demandas[u]
+                        ruta_de[u] = destino
+                    activar(p, s, x, y, v)
+                    return True
+        return False
+
+    def intercambiar(u):
+        pu, su = anterior[u], siguiente[u]
+        for v in vecinos[u]:
+            if v == 0 or ruta_de[v] == ruta_de[u]:
+                continue
+            ru, rv = ruta_de[u], ruta_de[v]
+            if (carga[ru] - demandas[u] + demandas[v] > capacidad
+                    or carga[rv] - demandas[v] + demandas[u] > capacidad):
+                continue
+            pv, sv = anterior[v], siguiente[v]
+            delta = (dist(pu, v) + dist(v, su) - dist(pu, u) - dist(u, su)
+                     + dist(pv, u) + dist(u, sv) - dist(pv, v) - dist(v, sv))
+            if delta < -1e-9:
+                enlazar(v, pu, su)
+                enlazar(u, pv, sv)
+                carga[ru] += demandas[v] - demandas[u]
+                carga[rv] += demandas[u] - demandas[v]
+                ruta_de[u], ruta_de[v] = rv, ru
+                activar(pu, su, pv, sv, v)
+                return True
+        return False
+
+    while cola:
+        u = cola.popleft()
+        activo[u] = False
+        if reubicar(u) or intercambiar(u):
+            activar(u)
+
+
+def resolver_cvrp(matriz, demandas, capacidad, vecinos=None):
+    """Rutas de reparto desde el depósito 0 respetando la capacidad de cada vehículo.
+
+    demandas[i] son los paquetes que hay que entregar en el punto i
+    (demandas[0], el depósito, se ignora). Construye las rutas con los
+    ahorros de Clarke-Wright y las mejora con movimientos entre rutas.
+    Devuelve (rutas, cargas): cada ruta es [0, ..., 0] y cargas[k] los
+    paquetes que lleva la ruta k.
+    """
+    d = np.asarray(matriz)
+    n = len(d)
+    if len(demandas) != n:
+        raise ValueError(f"Se esperaban {n} demandas (una por punto, incluido el depósito)")
+    demandas = [0] + [int(x) for x in demandas[1:]]
+    if any(x < 0 for x in demandas):
+        raise ValueError("Las demandas no pueden ser negativas")
+    excedidos = [i for i in range(1, n) if demandas[i] > capacidad]
+    if excedidos:
+        raise ValueError(f"La demanda del punto {excedidos[0]} supera la capacidad del vehículo")
+    if n <= 1:
+        return [], []
+
+    if vecinos is None:
+        vecinos = listas_vecinos(d, VECINOS_AHORROS if n - 1 > LIMITE_AHORROS_COMPLETOS else 10)
+    anterior, siguiente, ruta_de, carga = _ahorros_clarke_wright(d, demandas, capacidad, vecinos)
+    _mejora_entre_rutas(d, demandas, capacidad, vecinos, anterior, siguiente, ruta_de, carga)
+
+    rutas, cargas = [], []
+    for inicio in range(1, n):
+        if anterior[inicio] == 0:
+            ruta = [0]
+            punto = inicio
+            while punto:
+                ruta.append(punto)
+                punto = siguiente[punto]
+            ruta.append(0)
+            rutas.append(ruta)
+            cargas.append(carga[ruta_de[inicio]])
+    return rutas, cargas
@@ -0,0 +1,436 @@
+import time
+from collections import deque
+
+import numpy as np
+
+# Presupuesto de tiempo por defecto (segundos) para consultas interactivas
+TIEMPO_LIMITE_CONSULTA = 2.0
+
+
+# =============================================================================
+# UTILIDADES COMUNES
+# =============================================================================
+def _como_arreglo(matriz):
+    """Convierte la matriz de distancias (lista de listas o arreglo) a ndarray."""
+    return np.asarray(matriz)
+
+
+def _tipo_acumulador(d, num_tramos):
+    """Elige el tipo más compacto capaz de acumular num_tramos distancias sin desbordar."""
+    if np.issubdtype(d.dtype, np.integer):
+        maximo = int(d.max()) if d.size else 0
+        if maximo * (num_tramos + 1) < 2 ** 30:
+            return np.int32, 2 ** 30
+        return np.int64, 2 ** 62
+    return np.float64, np.inf
+
+
+# =============================================================================
+# MOTOR EXACTO I - PROGRAMACIÓN DINÁMICA DE HELD-KARP
+# =============================================================================
+def ruta_held_karp(origen, destino, matriz):
+    """Camino hamiltoniano óptimo origen → destino con la DP de Held-Karp.
+
+    El estado dp[mascara, j] guarda la distancia mínima que sale de origen,
+    visita exactamente los puntos intermedios de mascara y termina en el
+    intermedio j. La tabla es un único arreglo contiguo de 2^k x k y se llena
+    por capas de igual cardinalidad, de forma vectorizada. La ruta se
+    reconstruye recorriendo la tabla hacia atrás, sin tabla de predecesores.
+    Complejidad O(2^k · k²) en tiempo y O(2^k · k) en memoria.
+    """
+    d = _como_arreglo(matriz)
+    n = len(d)
+    intermedios = [i for i in range(n) if i != origen and i != destino]
+    k = len(intermedios)
+
+    if k == 0:
+        return [origen, destino], d[origen, destino].item()
+
+    tipo, infinito = _tipo_acumulador(d, n)
+    idx = np.array(intermedios)
+    sub = d[np.ix_(idx, idx)].astype(tipo)   # sub[i, j] = distancia intermedio i → j
+    desde_origen = d[origen, idx].astype(tipo)
+    hacia_destino = d[idx, destino].astype(tipo)
+
+    total = 1 << k
+    dp = np.full((total, k), infinito, dtype=tipo)
+    bits = 1 << np.arange(k)
+    dp[bits, np.arange(k)] = desde_origen
+
+    mascaras = np.arange(total, dtype=np.int64)
+    cardinalidad = np.zeros(total, dtype=np.uint8)
+    for b in range(k):
+        cardinalidad += ((mascaras >> b) & 1).astype(np.uint8)
+
+    for tam in range(2, k + 1):
+        capa = mascaras[cardinalidad == tam]
+        for j in range(k):
+            sel = capa[(capa >> j) & 1 == 1]
+            previas = sel ^ (1 << j)
+            dp[sel, j] = (dp[previas] + sub[:, j]).min(axis=1)
+
+    completa = total - 1
+    finales = dp[completa] + hacia_destino
+    ultimo = int(finales.argmin())
+    menor_distancia = finales[ultimo].item()
+
+    # Reconstrucción: en cada paso se busca el predecesor que explica el valor óptimo
+    orden = [ultimo]
+    mascara = completa
+    while mascara != (1 << ultimo):
+        previa = mascara ^ (1 << ultimo)
+        candidatos = dp[previa] + sub[:, ultimo]
+        anterior = int(np.flatnonzero(candidatos == dp[mascara, ultimo])[0])
+        orden.append(anterior)
+        mascara, ultimo = previa, anterior
+    orden.reverse()
+
+    mejor_ruta = [origen] + [intermedios[i] for i in orden] + [destino]
+    return mejor_ruta, menor_distancia
+
+
+# =============================================================================
+# MOTOR EXACTO II - RAMIFICACIÓN Y ACOTACIÓN CON PRESUPUESTO DE TIEMPO
+# =============================================================================
+def _cota_matriz_reducida(d, actual, pendientes, destino):
+    """Cota inferior del resto del camino por reducción de filas y columnas.
+
+    Filas: el punto actual y los pendientes (cada uno debe tener un sucesor).
+    Columnas: los pendientes y el destino (cada uno debe tener un predecesor).
+    """
+    if not pendientes:
+        return float(d[actual, destino])
+    m = len(pendientes)
+    reducida = d[np.ix_([actual] + pendientes, pendientes + [destino])].astype(np.float64)
+    reducida[np.arange(1, m + 1), np.arange(m)] = np.inf  # sin lazos
+    reducida[0, m] = np.inf  # no se puede ir directo al destino con pendientes
+    minimos_fila = reducida.min(axis=1)
+    if np.isinf(minimos_fila).any():
+        return np.inf
+    reducida -= minimos_fila[:, None]
+    return float(minimos_fila.sum() + reducida.min(axis=0).sum())
+
+
+def _ruta_vecino_mas_cercano(d, origen, destino):
+    """Camino inicial origen → destino eligiendo siempre el pendiente más cercano."""
+    pendientes = set(range(len(d))) - {origen, destino}
+    ruta = [origen]
+    while pendientes:
+        actual = ruta[-1]
+        siguiente = min(pendientes, key=lambda p: d[actual, p])
+        pendientes.remove(siguiente)
+        ruta.append(siguiente)
+    ruta.append(destino)
+    return ruta
+
+
+def ruta_branch_and_bound(origen, destino, matriz, tiempo_limite=None, ruta_inicial=None):
+    """Camino hamiltoniano origen → destino por ramificación y acotación.
+
+    Explora en profundidad, primero el hijo de menor cota, y poda con la cota
+    de matriz reducida. Si se agota tiempo_limite (segundos) devuelve la mejor
+    ruta encontrada hasta ese momento junto con la brecha de optimalidad
+    demostrada: (distancia - cota_inferior) / distancia. Con búsqueda completa
+    la brecha es 0. ruta_inicial, si se da, sirve como primera cota superior
+    en lugar del vecino más cercano.
+    """
+    d = _como_arreglo(matriz)
+    inicio = time.perf_counter()
+
+    mejor_ruta = ruta_inicial or _ruta_vecino_mas_cercano(d, origen, destino)
+    mejor_distancia = float(d[mejor_ruta[:-1], mejor_ruta[1:]].sum())
+
+    todos = set(range(len(d))) - {origen, destino}
+    raiz = _cota_matriz_reducida(d, origen, sorted(todos), destino)
+    pila = [(raiz, 0.0, [origen])]
+    agotado = False
+
+    while pila:
+        if tiempo_limite is not None and time.perf_counter() - inicio > tiempo_limite:
+            agotado = True
+            break
+        cota, costo, ruta = pila.pop()
+        if cota >= mejor_distancia:
+            continue
+        actual = ruta[-1]
+        pendientes = sorted(todos.difference(ruta))
+        if not pendientes:
+            total = costo + float(d[actual, destino])
+            if total < mejor_distancia:
+                mejor_distancia = total
+                mejor_ruta = ruta + [destino]
+            continue
+
+        hijos = []
+        for p in pendientes:
+            costo_hijo = costo + float(d[actual, p])
+            resto = [q for q in pendientes if q != p]
+            cota_hijo = costo_hijo + _cota_matriz_reducida(d, p, resto, destino)
+            if cota_hijo < mejor_distancia:
+                hijos.append((cota_hijo, costo_hijo, ruta + [p]))
+        hijos.sort(key=lambda h: h[0], reverse=True)
+        pila.extend(hijos)
+
+    cota_inferior = mejor_distancia
+    if agotado and pila:
+        cota_inferior = min(mejor_distancia, min(nodo[0] for nodo in pila))
+    brecha = (mejor_distancia - cota_inferior) / mejor_distancia if mejor_distancia > 0 else 0.0
+
+    return mejor_ruta, d[mejor_ruta[:-1], mejor_ruta[1:]].sum().item(), brecha
+
+
+# =============================================================================
+# MOTOR HEURÍSTICO - VECINO MÁS CERCANO + 2-OPT / OR-OPT
+# =============================================================================
+VECINOS_POR_PUNTO = 8
+
+# Filas procesadas por bloque al calcular las listas de vecinos
+BLOQUE_VECINOS = 1024
+
+
+def listas_vecinos(matriz, k=VECINOS_POR_PUNTO):
+    """Para cada punto, sus k vecinos más cercanos (ida + vuelta), ordenados por cercanía."""
+    d = _como_arreglo(matriz)
+    n = len(d)
+    k = min(k, n - 1)
+    if k <= 0:
+        return [[] for _ in range(n)]
+    vecinos = np.empty((n, k), dtype=np.int64)
+    for a in range(0, n, BLOQUE_VECINOS):
+        b = min(n, a + BLOQUE_VECINOS)
+        cercania = d[a:b].astype(np.float64) + d[:, a:b].T
+        cercania[np.arange(b - a), np.arange(a, b)] = np.inf
+        candidatos = np.argpartition(cercania, k - 1, axis=1)[:, :k]
+        orden = np.take_along_axis(cercania, candidatos, axis=1).argsort(axis=1)
+        vecinos[a:b] = np.take_along_axis(candidatos, orden, axis=1)
+    return vecinos.tolist()
+
+
+# Con semilla, cada paso elige al azar entre estos pendientes más cercanos
+CANDIDATOS_ALEATORIOS = 3
+
+
+def _construir_vecino_mas_cercano(d, origen, destino, vecinos, rng=None):
+    """Camino inicial origen → destino; consulta primero la lista de vecinos.
+
+    Con rng la construcción es aleatorizada (vecino más cercano "con ruido"),
+    para que varios arranques exploren soluciones distintas.
+    """
+    n = len(d)
+    visitado = np.zeros(n, dtype=bool)
+    visitado[origen] = visitado[destino] = True
+    ruta = [origen]
+    for _ in range(n - len({origen, destino})):
+        actual = ruta[-1]
+        if rng is None:
+            siguiente = next((v for v in vecinos[actual] if not visitado[v]), None)
+        else:
+            candidatos = [v for v in vecinos[actual] if not visitado[v]][:CANDIDATOS_ALEATORIOS]
+            siguiente = candidatos[rng.integers(len(candidatos))] if candidatos else None
+        if siguiente is None:
+            siguiente = int(np.where(visitado, np.inf, d[actual]).argmin())
+        visitado[siguiente] = True
+        ruta.append(siguiente)
+    ruta.append(destino)
+    return ruta
+
+
+def _busqueda_local(d, ruta, vecinos):
+    """Mejora la ruta in situ con movimientos 2-opt y Or-opt (extremos fijos).
+
+    Solo se evalúan movimientos que crean una arista hacia alguno de los
+    vecinos cercanos, y cada punto lleva un bit "no mirar": sale de la cola
+    cuando no produce mejora y vuelve a entrar cuando cambia una de sus
+    aristas. Los prefijos de costo hacia adelante (F) y hacia atrás (B)
+    permiten evaluar en O(1) la inversión de un tramo aunque la matriz no
+    sea simétrica.
+    """
+    dist = d.item  # escalares de Python: sin desbordes de enteros pequeños
+    ultimo = len(ruta) - 1
+    pos = [0] * len(d)
+    for idx, punto in enumerate(ruta):
+        pos[punto] = idx
+    pos[ruta[0]] = 0
+
+    def prefijos():
+        r = np.array(ruta)
+        adelante = np.concatenate(([0.0], np.cumsum(d[r[:-1], r[1:]], dtype=np.float64)))
+        atras = np.concatenate(([0.0], np.cumsum(d[r[1:], r[:-1]], dtype=np.float64)))
+        return adelante.tolist(), atras.tolist()
+
+    def reubicar(desde, hasta):
+        for idx in range(desde, hasta + 1):
+            pos[ruta[idx]] = idx
+        pos[ruta[0]] = 0
+
+    F, B = prefijos()
+    cola = deque(ruta[1:ultimo])
+    activo = [False] * len(d)
+    for punto in cola:
+        activo[punto] = True
+
+    def activar(*puntos):
+        for punto in puntos:
+            if not activo[punto]:
+                activo[punto] = True
+                cola.append(punto)
+
+    def dos_opt(a):
+        nonlocal F, B
+        i = pos[a]
+        # a queda antes del tramo invertido: nueva arista a → c
+        if i < ultimo - 1:
+            b = ruta[i + 1]
+            for c in vecinos[a]:
+                j = pos[c]
+                if j <= i + 1 or j >= ultimo:
+                    continue
+                e = ruta[j + 1]
+                delta = (dist(a, c) + dist(b, e) - dist(a, b) - dist(c, e)
+                         + (B[j] - B[i + 1]) - (F[j] - F[i + 1]))
+                if delta < -1e-9:
+                    ruta[i + 1:j + 1] = ruta[j:i:-1]
+                    reubicar(i + 1, j)
+                    F, B = prefijos()
+                    activar(a, b, c, e)
+                    return True
+        # a queda después del tramo invertido: nueva arista c → a
+        j = pos[a] - 1
+        if j >= 1:
+            fin = ruta[j]
+            for c in vecinos[a]:
+                p = pos[c]
+                if p < 1 or p >= j:
+                    continue
+                inicio = ruta[p - 1]
+                delta = (dist(inicio, fin) + dist(c, a) - dist(inicio, c) - dist(fin, a)
+                         + (B[j] - B[p]) - (F[j] - F[p]))
+                if delta < -1e-9:
+                    ruta[p:j + 1] = ruta[j:p - 1:-1]
+                    reubicar(p, j)
+                    F, B = prefijos()
+                    activar(a, c, inicio, fin)
+                    return True
+        return False
+
+    def or_opt(a):
+        nonlocal F, B
+        s = pos[a]
+        if s < 1:
+            return False
+        for largo in (1, 2, 3):
+            e = s + largo - 1
+            if e > ultimo - 1:
+                break
+            p, q, fin = ruta[s - 1], ruta[e + 1], ruta[e]
+            ahorro = dist(p, a) + dist(fin, q) - dist(p, q)
+            for c in vecinos[a]:
+                pc = pos[c]
+                # Insertar entre x e y, con x = c (tras c) o y = c (antes de c)
+                for px in (pc, pc - 1):
+                    if px < 0 or px >= ultimo or s - 1 <= px <= e:
+                        continue
+                    x, y = ruta[px], ruta[px + 1]
+                    if dist(x, a) + dist(fin, y) - dist(x, y) - ahorro < -1e-9:
+                        tramo = ruta[s:e + 1]
+                        del ruta[s:e + 1]
+                        destino_idx = px + 1 if px < s else px + 1 - largo
+                        ruta[destino_idx:destino_idx] = tramo
+                        reubicar(min(s, destino_idx), max(e, destino_idx + largo - 1))
+                        F, B = prefijos()
+                        activar(a, fin, p, q, x, y)
+                        return True
+        return False
+
+    while cola:
+        a = cola.popleft()
+        activo[a] = False
+        if dos_opt(a) or or_opt(a):
+            activar(a)
+    return ruta
+
+
+def ruta_heuristica(origen, destino, matriz, vecinos=None, semilla=None):
+    """Camino origen → destino por todos los puntos, escalable a miles de puntos.
+
+    Construye con vecino más cercano y mejora con 2-opt y Or-opt restringidos
+    a listas de vecinos. No garantiza el óptimo. Con semilla la construcción
+    es aleatorizada (ver optimizacion_paralela.multiarranque_ruta).
+    """
+    d = _como_arreglo(matriz)
+    if vecinos is None:
+        vecinos = listas_vecinos(d)
+    rng = None if semilla is None else np.random.default_rng(semilla)
+    ruta = _construir_vecino_mas_cercano(d, origen, destino, vecinos, rng)
+    _busqueda_local(d, ruta, vecinos)
+    return ruta, d[ruta[:-1], ruta[1:]].sum().item()
+
+
+def optimizar_secuencia(secuencia, matriz, tiempo_limite=TIEMPO_LIMITE_CONSULTA):
+    """Reordena los puntos interiores de una secuencia conservando sus extremos.
+
+    Los puntos repetidos (p. ej. la copia del depósito al inicio de las
+    rutas del catálogo) se visitan una sola vez: una copia gratuita del
+    depósito partiría la ruta en dos viajes. Resuelve sobre la submatriz de
+    los puntos de la secuencia con el motor que corresponda a su tamaño (ver
+    resolver_ruta). Devuelve una lista, o un arreglo del mismo tipo si
+    secuencia es un ndarray.
+    """
+    compacta = isinstance(secuencia, np.ndarray)
+    if len(secuencia) <= 3:
+        return secuencia.copy() if compacta else list(secuencia)
+    arreglo = np.asarray(secuencia)
+    inicio, fin = arreglo[0], arreglo[-1]
+    cerrada = inicio == fin
+    interiores = arreglo[1:-1]
+    _, primeros = np.unique(interiores, return_index=True)
+    interiores = interiores[np.sort(primeros)]
+    interiores = interiores[(interiores != inicio) & (interiores != fin)]
+    puntos = np.concatenate(([inicio], interiores) if cerrada else ([inicio], interiores, [fin])).astype(arreglo.dtype)
+    if len(puntos) <= 2:
+        ruta = np.append(puntos, fin) if cerrada else puntos
+        return ruta if compacta else ruta.tolist()
+    sub = _como_arreglo(matriz)[np.ix_(puntos, puntos)]
+    ruta_local, _, _ = resolver_ruta(0, 0 if cerrada else len(puntos) - 1, sub, tiempo_limite)
+    ruta = puntos[ruta_local]
+    return ruta if compacta else ruta.tolist()
+
+
+# =============================================================================
+# SELECCIÓN DEL MOTOR DE RUTAS
+# =============================================================================
+# Held-Karp guarda 2^k · k estados; por encima de este número de intermedios
+# la tabla ya no cabe cómodamente en memoria.
+LIMITE_HELD_KARP = 20
+
+# Por encima de este número de intermedios la ramificación y acotación ya no
+# reduce la brecha en tiempo interactivo y se usa solo el motor heurístico.
+LIMITE_BRANCH_AND_BOUND = 60
+
+# Por debajo de este número de puntos una ruta heurística tarda menos que
+# publicar la matriz y repartir los arranques entre procesos: se calcula
+# un solo arranque determinista en este proceso.
+MIN_PUNTOS_MULTIARRANQUE = 1000
+
+
+def resolver_ruta(origen, destino, matriz, tiempo_limite=TIEMPO_LIMITE_CONSULTA, arranques=1):
+    """Elige el motor según el número de puntos y devuelve (ruta, distancia, brecha).
+
+    La brecha es 0 si la ruta es óptima, la brecha demostrada si la
+    ramificación y acotación agotó el tiempo, o None para rutas heurísticas.
+    Con arranques > 1 y al menos MIN_PUNTOS_MULTIARRANQUE puntos, la ruta
+    heurística es la mejor entre el arranque determinista y arranques - 1
+    arranques aleatorizados ejecutados en paralelo.
+    """
+    intermedios = len(matriz) - len({origen, destino})
+    if intermedios <= LIMITE_HELD_KARP:
+        ruta, distancia = ruta_held_karp(origen, destino, matriz)
+        return ruta, distancia, 0.0
+    if arranques > 1 and len(matriz) >= MIN_PUNTOS_MULTIARRANQUE:
+        from optimizacion_paralela import multiarranque_ruta
+        ruta, distancia = multiarranque_ruta(origen, destino, matriz, range(arranques - 1))
+    else:
+        ruta, distancia = ruta_heuristica(origen, destino, matriz)
+    if intermedios <= LIMITE_BRANCH_AND_BOUND:
+        return ruta_branch_and_bound(origen, destino, matriz, tiempo_limite, ruta_inicial=ruta)
+    return ruta, distancia, None
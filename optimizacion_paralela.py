@@ -0,0 +1,159 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from motor_rutas import LIMITE_HELD_KARP, listas_vecinos, optimizar_secuencia, ruta_heuristica
+
+# Arreglos compartidos adjuntados en cada proceso trabajador (se llenan en el inicializador)
+_compartidos = {}
+
+
+# =============================================================================
+# ARREGLOS COMPARTIDOS ENTRE PROCESOS
+# =============================================================================
+def publicar_arreglo(arreglo):
+    """Hace accesible un ndarray a otros procesos sin serializarlo.
+
+    Si el arreglo ya está mapeado desde un archivo (np.memmap) los
+    trabajadores abren el mismo archivo; si no, se copia una sola vez a un
+    bloque de memoria compartida. Devuelve (bloque o None, descriptor); el
+    llamador debe pasar el bloque a liberar_bloque al terminar.
+    """
+    if isinstance(arreglo, np.memmap) and arreglo.filename is not None:
+        return None, ("archivo", arreglo.filename, arreglo.offset, arreglo.shape, arreglo.dtype.str)
+    bloque = shared_memory.SharedMemory(create=True, size=max(arreglo.nbytes, 1))
+    destino = np.ndarray(arreglo.shape, dtype=arreglo.dtype, buffer=bloque.buf)
+    destino[...] = arreglo
+    return bloque, ("memoria", bloque.name, 0, arreglo.shape, arreglo.dtype.str)
+
+
+def adjuntar_arreglo(descriptor):
+    """Vista ndarray (sin copia) de un arreglo publicado con publicar_arreglo."""
+    tipo, nombre, desplazamiento, forma, dtype = descriptor
+    if tipo == "archivo":
+        return None, np.memmap(nombre, dtype=dtype, mode="r", offset=desplazamiento, shape=forma)
+    bloque = shared_memory.SharedMemory(name=nombre)
+    return bloque, np.ndarray(forma, dtype=dtype, buffer=bloque.buf)
+
+
+def arreglo_compartible(matriz):
+    """ndarray de la matriz conservando el np.memmap si está mapeada desde un archivo.
+
+    np.asarray devuelve un ndarray simple aunque los datos sean un memmap, y
+    publicar_arreglo los copiaría enteros a memoria compartida.
+    """
+    datos = getattr(matriz, "datos", matriz)
+    return datos if isinstance(datos, np.ndarray) else np.asarray(datos)
+
+
+def liberar_bloque(bloque):
+    if bloque is not None:
+        bloque.close()
+        bloque.unlink()
+
+
+def _inicializar_trabajador(descriptores):
+    for clave, descriptor in descriptores.items():
+        _compartidos[clave] = adjuntar_arreglo(descriptor)
+    if "vecinos" in _compartidos:
+        _compartidos["vecinos_listas"] = _compartidos["vecinos"][1].tolist()
+
+
+# =============================================================================
+# MULTIARRANQUE EN UN GRUPO DE PROCESOS
+# =============================================================================
+def _arranque(origen, destino, semilla):
+    d = _compartidos["matriz"][1]
+    return ruta_heuristica(origen, destino, d, _compartidos["vecinos_listas"], semilla=semilla)
+
+
+def multiarranque_ruta(origen, destino, matriz, semillas, trabajadores=None):
+    """Mejor ruta heurística de varios arranques aleatorizados en paralelo.
+
+    Cada semilla es un arranque independiente de motor_rutas.ruta_heuristica
+    y se reparte entre trabajadores procesos (por defecto, uno por núcleo).
+    El arranque determinista (semilla None) se incluye siempre: la ruta
+    nunca es peor que la de un solo arranque.
+    La matriz y las listas de vecinos se comparten por memoria compartida (o
+    por el propio archivo si la matriz está mapeada), por lo que no se
+    serializan para cada tarea. Devuelve (ruta, distancia).
+    """
+    semillas = [None] + [semilla for semilla in semillas if semilla is not None]
+    d = arreglo_compartible(matriz)
+    vecinos = np.asarray(listas_vecinos(d), dtype=np.int32)
+    trabajadores = min(trabajadores or os.cpu_count() or 1, len(semillas))
+
+    bloques = []
+    try:
+        descriptores = {}
+        for clave, arreglo in (("matriz", d), ("vecinos", vecinos)):
+            bloque, descriptores[clave] = publicar_arreglo(arreglo)
+            bloques.append(bloque)
+        with ProcessPoolExecutor(trabajadores, initializer=_inicializar_trabajador,
+                                 initargs=(descriptores,)) as grupo:
+            resultados = list(grupo.map(_arranque, [origen] * len(semillas),
+                                        [destino] * len(semillas), semillas))
+    finally:
+        for bloque in bloques:
+            liberar_bloque(bloque)
+    return min(resultados, key=lambda resultado: resultado[1])
+
+
+# =============================================================================
+# RUTAS DE VARIOS CONDUCTORES
+# =============================================================================
+def _optimizar_en_proceso(secuencia, tiempo_limite):
+    return optimizar_secuencia(secuencia, _compartidos["matriz"][1], tiempo_limite)
+
+
+def _optimizar_en_procesos(secuencias, d, tiempo_limite, trabajadores):
+    """{clave: secuencia optimizada} repartiendo las secuencias entre procesos que comparten la matriz."""
+    bloque, descriptor = publicar_arreglo(d)
+    try:
+        with ProcessPoolExecutor(trabajadores, initializer=_inicializar_trabajador,
+                                 initargs=({"matriz": descriptor},)) as grupo:
+            optimizadas = grupo.map(_optimizar_en_proceso, secuencias.values(), [tiempo_limite] * len(secuencias))
+            return dict(zip(secuencias, optimizadas))
+    finally:
+        liberar_bloque(bloque)
+
+
+def optimizar_secuencias(secuencias, matriz, tiempo_limite=0, trabajadores=None):
+    """Optimiza varias secuencias a la vez con motor_rutas.optimizar_secuencia.
+
+    secuencias es un dict {clave: secuencia}. Las secuencias de tamaño
+    Held-Karp se resuelven en hilos: la matriz se comparte sin copiarla y
+    sus núcleos (submatriz con np.ix_, capas de Held-Karp) son operaciones
+    de NumPy que liberan el GIL. Las mayores pasan por la búsqueda local en
+    Python puro, que no libera el GIL, y se reparten entre procesos que
+    comparten la matriz con publicar_arreglo. Devuelve {clave: secuencia
+    optimizada}.
+    """
+    resultados = dict.fromkeys(secuencias)
+    d = arreglo_compartible(matriz)
+    # El trabajo es de cálculo: más hilos o procesos que núcleos solo añaden contención
+    trabajadores = trabajadores or os.cpu_count() or 1
+
+    grandes = {clave: secuencia for clave, secuencia in secuencias.items()
+               if len(secuencia) - 2 > LIMITE_HELD_KARP}
+    if trabajadores > 1 and len(grandes) > 1:
+        resultados.update(_optimizar_en_procesos(grandes, d, tiempo_limite, min(trabajadores, len(grandes))))
+        pendientes = [clave for clave in secuencias if clave not in grandes]
+    else:
+        pendientes = list(secuencias)
+
+    def optimizar(clave):
+        resultados[clave] = optimizar_secuencia(secuencias[clave], d, tiempo_limite)
+
+    trabajadores = min(trabajadores, max(len(pendientes), 1))
+    if trabajadores == 1:
+        for clave in pendientes:
+            optimizar(clave)
+        return resultados
+    # Cada hilo escribe en la casilla de su clave: no hace falta bloqueo
+    with ThreadPoolExecutor(trabajadores) as grupo:
+        # list() propaga la primera excepción de cualquier hilo
+        list(grupo.map(optimizar, pendientes))
+    return resultados
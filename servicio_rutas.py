@@ -0,0 +1,392 @@
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+from asignacion_rutas import RutaAsignada, demandas_uniformes
+from lotes_consultas import AgrupadorConsultas
+from matriz_distancias import MatrizDistancias, abrir_matriz
+from motor_cvrp import resolver_cvrp
+from motor_rutas import TIEMPO_LIMITE_CONSULTA, resolver_ruta
+from sesion_rutas import SesionRutas
+
+PUERTO_SERVICIO = 8765
+FLOTA_PREDETERMINADA = "principal"
+
+# Cálculos de ruta simultáneos; las peticiones que superan también la cola
+# de espera se rechazan con 503 para que la latencia del resto siga acotada.
+CALCULOS_SIMULTANEOS = 4
+CALCULOS_EN_ESPERA = 64
+
+TAMANO_MAXIMO_CUERPO = 16 * 1024 * 1024
+
+MENSAJES_HTTP = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                 409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error",
+                 503: "Service Unavailable"}
+
+
+class ErrorPeticion(Exception):
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+# =============================================================================
+# ESTADO DEL SERVICIO
+# =============================================================================
+class _Flota:
+    """Sesión de una flota con su cerrojo de lectores / escritor y su agrupador de consultas."""
+
+    __slots__ = ("sesion", "agrupador", "lectores", "escribiendo", "cambio")
+
+    def __init__(self, calcular):
+        self.sesion = SesionRutas()
+        self.agrupador = AgrupadorConsultas(calcular)
+        self.lectores = 0
+        self.escribiendo = False
+        self.cambio = asyncio.Condition()
+
+
+class ServicioRutas:
+    """Servicio asyncio de consultas de ruta, asignación y edición de la matriz.
+
+    Atiende HTTP/1.1 con cuerpos JSON (ver RUTAS más abajo). Cada petición
+    indica su flota ("flota" en el cuerpo o en la consulta de la URL; por
+    defecto FLOTA_PREDETERMINADA) y cada flota tiene su propia SesionRutas,
+    así que un proceso atiende muchas flotas independientes. Los cálculos se
+    ejecutan en un ThreadPoolExecutor compartido para no bloquear el bucle de
+    eventos; la matriz se comparte entre hilos sin copiarla. Las ediciones de
+    una flota esperan a que terminen sus cálculos en curso y bloquean los
+    nuevos mientras se aplican, como un cerrojo de lectores y escritor.
+    """
+
+    def __init__(self, trabajadores=CALCULOS_SIMULTANEOS, en_espera=CALCULOS_EN_ESPERA):
+        self.flotas = {}
+        self._ejecutor = ThreadPoolExecutor(trabajadores)
+        self._cupos = asyncio.Semaphore(trabajadores + en_espera)
+
+    def cerrar(self):
+        self._ejecutor.shutdown(wait=False, cancel_futures=True)
+
+    def _flota(self, datos, crear=False):
+        nombre = str(datos.get("flota", FLOTA_PREDETERMINADA))
+        flota = self.flotas.get(nombre)
+        if flota is None:
+            if not crear:
+                raise ErrorPeticion(404, f"No existe la flota '{nombre}'; use POST /matriz")
+            flota = self.flotas[nombre] = _Flota(lambda funcion, *args: self._calcular(flota, funcion, *args))
+        return flota
+
+    # -------------------------------------------------------------------------
+    # CERROJO LECTORES / ESCRITOR
+    # -------------------------------------------------------------------------
+    async def _calcular(self, flota, funcion, *args):
+        """Ejecuta funcion(*args) en el ejecutor mientras la matriz de la flota no se edita."""
+        if self._cupos.locked():
+            raise ErrorPeticion(503, "Servicio saturado; reintente en unos segundos")
+        async with self._cupos:
+            async with flota.cambio:
+                await flota.cambio.wait_for(lambda: not flota.escribiendo)
+                flota.lectores += 1
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self._ejecutor, funcion, *args)
+            finally:
+                async with flota.cambio:
+                    flota.lectores -= 1
+                    flota.cambio.notify_all()
+
+    async def _modificar(self, flota, funcion, *args):
+        """Ejecuta funcion(*args) en el ejecutor sin ningún cálculo en curso sobre la matriz de la flota.
+
+        La reparación de los resultados derivados (caminos mínimos, totales)
+        tras una edición puede ser larga; fuera del bucle de eventos no
+        detiene las peticiones de las demás flotas.
+        """
+        async with flota.cambio:
+            await flota.cambio.wait_for(lambda: not flota.escribiendo)
+            flota.escribiendo = True
+            await flota.cambio.wait_for(lambda: flota.lectores == 0)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._ejecutor, funcion, *args)
+        finally:
+            async with flota.cambio:
+                flota.escribiendo = False
+                flota.cambio.notify_all()
+
+    def _matriz_requerida(self, datos):
+        flota = self._flota(datos)
+        if flota.sesion.matriz is None:
+            raise ErrorPeticion(409, "No hay matriz cargada; use POST /matriz")
+        return flota, flota.sesion.matriz
+
+    # -------------------------------------------------------------------------
+    # OPERACIONES
+    # -------------------------------------------------------------------------
+    async def estado(self, datos):
+        flota = self._flota(datos)
+        matriz = flota.sesion.matriz
+        return {
+            "puntos": None if matriz is None else len(matriz),
+            "version": None if matriz is None else matriz.version,
+            "rutas": len(flota.sesion.rutas or ()),
+            "cache": flota.sesion.cache.estadisticas(),
+            "lotes": flota.agrupador.estadisticas(),
+        }
+
+    async def listar_flotas(self, _):
+        return {"flotas": {nombre: {"puntos": flota.sesion.n, "rutas": len(flota.sesion.rutas or ())}
+                           for nombre, flota in self.flotas.items()}}
+
+    async def cargar_matriz(self, datos):
+        """{"n", "minimo", "maximo", "semilla"} genera una matriz; {"archivo"} la abre desde disco."""
+        if "archivo" in datos:
+            if not isinstance(datos["archivo"], str):
+                raise ErrorPeticion(400, "El campo 'archivo' debe ser una ruta")
+
+            def cargar():
+                return abrir_matriz(datos["archivo"], "r+" if datos.get("editable") else "r")
+        else:
+            n = _entero(datos, "n")
+            minimo, maximo = _entero(datos, "minimo", 1), _entero(datos, "maximo", 20)
+            semilla = _entero(datos, "semilla", None)
+
+            def cargar():
+                return MatrizDistancias.aleatoria(n, minimo, maximo, semilla)
+
+        try:
+            nueva = await asyncio.get_running_loop().run_in_executor(self._ejecutor, cargar)
+        except (OSError, ValueError) as error:
+            raise ErrorPeticion(400, f"No se pudo cargar la matriz: {error}")
+        flota = self._flota(datos, crear=True)
+        await self._modificar(flota, flota.sesion.usar_matriz, nueva)
+        return await self.estado(datos)
+
+    async def consultar_ruta(self, datos):
+        """Mejor ruta de origen a destino pasando por todos los puntos."""
+        flota, matriz = self._matriz_requerida(datos)
+        origen, destino = _entero(datos, "origen"), _entero(datos, "destino")
+        if not (0 <= origen < len(matriz) and 0 <= destino < len(matriz)):
+            raise ErrorPeticion(400, f"Los puntos deben estar entre 0 y {len(matriz) - 1}")
+        tiempo_limite = _segundos(datos, "tiempo_limite", TIEMPO_LIMITE_CONSULTA)
+
+        cache = flota.sesion.cache
+        resultado = cache.buscar(origen, destino, matriz, tiempo_limite)
+        en_cache = resultado is not None
+        if not en_cache:
+            def resolver():
+                version = matriz.version
+                return version, resolver_ruta(origen, destino, matriz, tiempo_limite)
+            version, resultado = await flota.agrupador.ruta(matriz, origen, destino, resolver, tiempo_limite)
+            cache.guardar(origen, destino, matriz, version, resultado, tiempo_limite)
+        ruta, distancia, brecha = resultado
+        return {"ruta": ruta, "distancia": distancia, "brecha": brecha, "cache": en_cache}
+
+    async def camino_mas_corto(self, datos):
+        """Camino mínimo entre dos puntos (sin visitar todos), resuelto en lotes por origen."""
+        flota, matriz = self._matriz_requerida(datos)
+        origen, destino = _entero(datos, "origen"), _entero(datos, "destino")
+        if not (0 <= origen < len(matriz) and 0 <= destino < len(matriz)):
+            raise ErrorPeticion(400, f"Los puntos deben estar entre 0 y {len(matriz) - 1}")
+        camino, distancia = await flota.agrupador.camino(matriz, origen, destino)
+        return {"camino": camino, "distancia": distancia}
+
+    async def asignar(self, datos):
+        """Rutas de reparto con capacidad (motor_cvrp) desde el depósito 0."""
+        flota, matriz = self._matriz_requerida(datos)
+        capacidad = _entero(datos, "capacidad")
+        demandas = datos.get("demandas")
+        if demandas is not None and not (isinstance(demandas, list)
+                                         and all(isinstance(x, int) for x in demandas)):
+            raise ErrorPeticion(400, "El campo 'demandas' debe ser una lista de enteros")
+        if demandas is None:
+            demandas = demandas_uniformes(len(matriz), _entero(datos, "total_paquetes"))
+
+        def calcular():
+            rutas, cargas = resolver_cvrp(matriz, demandas, capacidad)
+            return [RutaAsignada(c + 1, None, ruta, carga) for c, (ruta, carga) in enumerate(zip(rutas, cargas))]
+
+        def guardar(registros):
+            # Las rutas se calcularon como lector; se guardan en la sesión como
+            # escritor, salvo que entretanto se haya cargado otra matriz.
+            if flota.sesion.matriz is not matriz:
+                raise ErrorPeticion(409, "La matriz cambió durante el cálculo; repita la asignación")
+            return flota.sesion.asignar(registros)
+
+        try:
+            registros = await self._calcular(flota, calcular)
+        except ValueError as error:
+            raise ErrorPeticion(400, str(error))
+        distancias = await self._modificar(flota, guardar, registros)
+        return {"rutas": [ruta.seq.tolist() for ruta in registros], "cargas": [ruta.paquetes for ruta in registros],
+                "distancias": distancias}
+
+    async def editar(self, datos):
+        """Cambia la distancia entre i y j; invalida la caché de consultas (versión nueva)."""
+        flota, matriz = self._matriz_requerida(datos)
+        i, j, valor = _entero(datos, "i"), _entero(datos, "j"), _entero(datos, "valor")
+        if not (0 <= i < len(matriz) and 0 <= j < len(matriz)) or i == j:
+            raise ErrorPeticion(400, "Tramo inválido")
+        try:
+            anteriores = await self._modificar(flota, flota.sesion.editar, i, j, valor)
+        except ValueError as error:
+            raise ErrorPeticion(400, str(error))
+        return {"version": matriz.version, "anteriores": list(anteriores)}
+
+    async def rutas_asignadas(self, datos):
+        flota = self._flota(datos)
+        if not flota.sesion.rutas:
+            raise ErrorPeticion(409, "No hay rutas asignadas; use POST /asignacion")
+
+        # Como lector: las ediciones y asignaciones se aplican fuera del bucle de eventos
+        def leer():
+            return flota.sesion.secuencias().como_listas(), flota.sesion.totales_vigentes()
+
+        rutas, distancias = await self._calcular(flota, leer)
+        return {"rutas": rutas, "distancias": distancias}
+
+    RUTAS = {
+        ("GET", "/estado"): estado,
+        ("GET", "/flotas"): listar_flotas,
+        ("POST", "/matriz"): cargar_matriz,
+        ("POST", "/ruta"): consultar_ruta,
+        ("POST", "/camino"): camino_mas_corto,
+        ("POST", "/asignacion"): asignar,
+        ("GET", "/asignacion"): rutas_asignadas,
+        ("POST", "/matriz/editar"): editar,
+    }
+
+    # -------------------------------------------------------------------------
+    # PROTOCOLO HTTP
+    # -------------------------------------------------------------------------
+    async def atender(self, lector, escritor):
+        """Atiende las peticiones de una conexión (con keep-alive) hasta que el cliente la cierra."""
+        try:
+            while True:
+                try:
+                    peticion = await _leer_peticion(lector)
+                except ErrorPeticion as error:
+                    await _responder(escritor, error.estado, {"error": str(error)}, cerrar=True)
+                    return
+                if peticion is None:
+                    return
+                metodo, ruta, consulta, cabeceras, cuerpo = peticion
+                estado, respuesta = await self._despachar(metodo, ruta, consulta, cuerpo)
+                cerrar = cabeceras.get("connection", "").lower() == "close"
+                await _responder(escritor, estado, respuesta, cerrar)
+                if cerrar:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    async def _despachar(self, metodo, ruta, consulta, cuerpo):
+        manejador = self.RUTAS.get((metodo, ruta))
+        if manejador is None:
+            if any(r == ruta for _, r in self.RUTAS):
+                return 405, {"error": f"Método {metodo} no permitido en {ruta}"}
+            return 404, {"error": f"No existe {ruta}"}
+        try:
+            datos = json.loads(cuerpo) if cuerpo else {}
+            if not isinstance(datos, dict):
+                raise ErrorPeticion(400, "El cuerpo debe ser un objeto JSON")
+            datos = {**dict(parse_qsl(consulta)), **datos}
+            return 200, await manejador(self, datos)
+        except json.JSONDecodeError as error:
+            return 400, {"error": f"JSON inválido: {error}"}
+        except ErrorPeticion as error:
+            return error.estado, {"error": str(error)}
+        except Exception as error:
+            # Un fallo inesperado responde 500 en lugar de cortar la conexión
+            return 500, {"error": f"Error interno: {type(error).__name__}: {error}"}
+
+    async def servir(self, host="127.0.0.1", puerto=PUERTO_SERVICIO):
+        """Arranca el servidor y devuelve el asyncio.Server (puerto 0 elige uno libre)."""
+        return await asyncio.start_server(self.atender, host, puerto)
+
+
+_OBLIGATORIO = object()
+
+
+def _entero(datos, campo, predeterminado=_OBLIGATORIO):
+    """datos[campo] como entero (o predeterminado si falta); ErrorPeticion 400 si no lo es."""
+    if campo not in datos or datos[campo] is None:
+        if predeterminado is _OBLIGATORIO:
+            raise ErrorPeticion(400, f"Falta el campo '{campo}'")
+        return predeterminado
+    valor = datos[campo]
+    if isinstance(valor, bool) or isinstance(valor, float) and not valor.is_integer():
+        raise ErrorPeticion(400, f"El campo '{campo}' debe ser un entero")
+    try:
+        return int(valor)
+    except (TypeError, ValueError, OverflowError):
+        raise ErrorPeticion(400, f"El campo '{campo}' debe ser un entero")
+
+
+def _segundos(datos, campo, predeterminado):
+    """datos[campo] como número de segundos positivo y finito; ErrorPeticion 400 si no lo es."""
+    valor = datos.get(campo, predeterminado)
+    try:
+        segundos = float(valor)
+    except (TypeError, ValueError):
+        raise ErrorPeticion(400, f"El campo '{campo}' debe ser un número de segundos")
+    if isinstance(valor, bool) or not 0 < segundos < float("inf"):
+        raise ErrorPeticion(400, f"El campo '{campo}' debe ser un número de segundos positivo")
+    return segundos
+
+
+async def _leer_peticion(lector):
+    """(método, ruta, consulta, cabeceras, cuerpo) de la siguiente petición, o None si se cerró la conexión."""
+    linea = await lector.readline()
+    if not linea.strip():
+        return None
+    try:
+        metodo, destino, _ = linea.decode("latin-1").split()
+    except ValueError:
+        raise ErrorPeticion(400, "Línea de petición inválida")
+    cabeceras = {}
+    while True:
+        linea = await lector.readline()
+        if linea in (b"\r\n", b"\n", b""):
+            break
+        nombre, _, valor = linea.decode("latin-1").partition(":")
+        cabeceras[nombre.strip().lower()] = valor.strip()
+    try:
+        longitud = int(cabeceras.get("content-length", 0) or 0)
+    except ValueError:
+        raise ErrorPeticion(400, "Cabecera Content-Length inválida")
+    if longitud < 0:
+        raise ErrorPeticion(400, "Cabecera Content-Length inválida")
+    if longitud > TAMANO_MAXIMO_CUERPO:
+        raise ErrorPeticion(413, "Cuerpo demasiado grande")
+    cuerpo = await lector.readexactly(longitud) if longitud else b""
+    url = urlsplit(destino)
+    return metodo.upper(), url.path.rstrip("/") or "/", url.query, cabeceras, cuerpo
+
+
+async def _responder(escritor, estado, datos, cerrar=False):
+    cuerpo = json.dumps(datos, ensure_ascii=False).encode()
+    escritor.write((f"HTTP/1.1 {estado} {MENSAJES_HTTP.get(estado, '')}\r\n"
+                    "Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(cuerpo)}\r\n"
+                    f"Connection: {'close' if cerrar else 'keep-alive'}\r\n\r\n").encode() + cuerpo)
+    await escritor.drain()
+
+
+async def principal(puerto=PUERTO_SERVICIO):
+    servicio = ServicioRutas()
+    servidor = await servicio.servir(puerto=puerto)
+    print(f"Servicio de rutas escuchando en http://127.0.0.1:{puerto}")
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        servicio.cerrar()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(principal(int(sys.argv[1]) if len(sys.argv) > 1 else PUERTO_SERVICIO))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,91 @@
+from cache_rutas import CAPACIDAD_CACHE_RUTAS, CacheRutas
+from caminos_minimos import caminos_vigentes
+from grafo_disperso import GrafoDisperso
+from matriz_distancias import RutasCompactas, TotalesRutas
+
+
+# =============================================================================
+# SESIÓN DE UNA FLOTA
+# =============================================================================
+class SesionRutas:
+    """Estado de una flota: matriz de distancias, rutas asignadas y cachés derivadas.
+
+    Sustituye a las variables globales del menú, de modo que un mismo proceso
+    puede atender varias flotas independientes. Las cachés (caminos mínimos,
+    totales de las rutas, grafo CSR y consultas de ruta) se ligan a la
+    versión de la matriz y se reparan o descartan tras cada edición.
+    """
+
+    __slots__ = ("matriz", "rutas", "compactas", "caminos", "totales", "cache", "_grafo")
+
+    def __init__(self, matriz=None, capacidad_cache=CAPACIDAD_CACHE_RUTAS):
+        self.matriz = matriz
+        self.rutas = None  # lista de asignacion_rutas.RutaAsignada
+        self.compactas = None  # secuencias de self.rutas empaquetadas (matriz_distancias.RutasCompactas)
+        self.caminos = None  # caminos_minimos.CaminosMinimos
+        self.totales = None  # matriz_distancias.TotalesRutas
+        self.cache = CacheRutas(capacidad_cache)
+        self._grafo = None  # (versión, GrafoDisperso)
+
+    @property
+    def n(self):
+        return None if self.matriz is None else len(self.matriz)
+
+    def usar_matriz(self, matriz):
+        """Cambia de matriz y descarta las rutas y todo lo calculado sobre la anterior."""
+        self.matriz = matriz
+        self.rutas = self.compactas = self.caminos = self.totales = self._grafo = None
+        self.cache.limpiar()
+
+    def asignar(self, rutas):
+        """Guarda las rutas asignadas y calcula sus distancias totales en una sola pasada.
+
+        Las secuencias se empaquetan en un único arreglo y la seq de cada
+        RutaAsignada pasa a ser una vista de ese arreglo.
+        """
+        self.compactas = RutasCompactas.desde_secuencias([ruta.seq for ruta in rutas], len(self.matriz))
+        for ruta, seq in zip(rutas, self.compactas):
+            ruta.seq = seq
+        self.rutas = rutas
+        self.totales = TotalesRutas(self.matriz, self.compactas)
+        return self.totales.totales
+
+    def secuencias(self):
+        return self.compactas if self.compactas is not None else RutasCompactas.desde_secuencias([])
+
+    def editar(self, i, j, valor):
+        """Edita el tramo (i, j) de la matriz y repara las cachés derivadas."""
+        anteriores = self.matriz.editar(i, j, valor)
+        self.reparar_derivados(i, j, anteriores)
+        return anteriores
+
+    def reparar_derivados(self, i, j, anteriores):
+        """Repara de forma incremental las cachés tras editar (i, j).
+
+        Si alguna caché no puede repararse (estaba desactualizada) se descarta y
+        se recalculará completa en la siguiente consulta.
+        """
+        if self.caminos is not None and not self.caminos.reparar_arista(self.matriz, i, j, anteriores):
+            self.caminos = None
+        if self.totales is not None and not self.totales.reparar_arista(self.matriz, i, j, anteriores):
+            self.totales = None
+
+    # -------------------------------------------------------------------------
+    # CACHÉS VIGENTES
+    # -------------------------------------------------------------------------
+    def totales_vigentes(self):
+        """Distancia total de cada ruta asignada para la versión actual de la matriz."""
+        if self.totales is None or not self.totales.vigente(self.matriz):
+            self.totales = TotalesRutas(self.matriz, self.secuencias())
+        return self.totales.totales
+
+    def caminos_vigentes(self):
+        """Caminos mínimos entre todos los pares (Floyd-Warshall), recalculados solo si hace falta."""
+        self.caminos = caminos_vigentes(self.caminos, self.matriz)
+        return self.caminos
+
+    def grafo_vigente(self):
+        """Grafo CSR de la matriz para Dijkstra/A*, reconstruido tras cada edición."""
+        if self._grafo is None or self._grafo[0] != self.matriz.version:
+            self._grafo = (self.matriz.version, GrafoDisperso.desde_matriz(self.matriz))
+        return self._grafo[1]
@@ -0,0 +1,48 @@
+import pytest
+
+import optimizacion_paralela
+from asignacion_rutas import ruta_catalogo
+from matriz_distancias import MatrizDistancias, abrir_matriz, guardar_matriz
+from optimizacion_paralela import arreglo_compartible, multiarranque_ruta, optimizar_secuencias, publicar_arreglo
+
+
+@pytest.fixture
+def matriz_en_disco(tmp_path):
+    ruta = str(tmp_path / "red.mat")
+    guardar_matriz(MatrizDistancias.aleatoria(60, 1, 20, 3), ruta)
+    return abrir_matriz(ruta, "r")
+
+
+@pytest.fixture
+def descriptores(monkeypatch):
+    """Tipo de cada arreglo que publican las funciones paralelas ("archivo" o "memoria")."""
+    publicados = []
+
+    def publicar(arreglo):
+        bloque, descriptor = publicar_arreglo(arreglo)
+        publicados.append(descriptor[0])
+        return bloque, descriptor
+
+    monkeypatch.setattr(optimizacion_paralela, "publicar_arreglo", publicar)
+    return publicados
+
+
+def test_matriz_en_disco_se_comparte_por_archivo(matriz_en_disco):
+    bloque, descriptor = publicar_arreglo(arreglo_compartible(matriz_en_disco))
+    assert bloque is None
+    assert descriptor[0] == "archivo"
+
+
+def test_optimizar_secuencias_no_copia_la_matriz_en_disco(matriz_en_disco, descriptores):
+    secuencias = {num: ruta_catalogo(num, 60) for num in (1, 2)}
+    optimizadas = optimizar_secuencias(secuencias, matriz_en_disco, trabajadores=2)
+    assert descriptores == ["archivo"]
+    for num, secuencia in optimizadas.items():
+        assert secuencia[0] == secuencia[-1] == 0
+        assert sorted(secuencia[1:-1]) == sorted(set(ruta_catalogo(num, 60)) - {0})
+
+
+def test_multiarranque_no_copia_la_matriz_en_disco(matriz_en_disco, descriptores):
+    ruta, _ = multiarranque_ruta(0, 59, matriz_en_disco, range(2), trabajadores=2)
+    assert descriptores == ["archivo", "memoria"]  # la matriz por archivo; las listas de vecinos en memoria
+    assert sorted(ruta) == list(range(60))